@@ -0,0 +1,34 @@
+"""Add composite indexes for hot per-user queries.
+
+Revision ID: 0001_composite_indexes
+Revises:
+Create Date: 2026-10-19
+
+Tables are still created by init_db(); this revision only adds the
+secondary indexes to databases created before they were declared.
+"""
+from alembic import op
+
+revision = "0001_composite_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_memories_user_created", "memories", ["user_id", "created_at"]),
+    ("ix_memories_user_importance", "memories", ["user_id", "importance"]),
+    ("ix_milestones_user_status_completed", "milestones", ["user_id", "status", "completed_at"]),
+    ("ix_milestones_roadmap", "milestones", ["roadmap_id"]),
+    ("ix_applications_user_applied", "applications", ["user_id", "applied_date"]),
+    ("ix_roadmaps_user_active_generated", "roadmaps", ["user_id", "is_active", "generated_at"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
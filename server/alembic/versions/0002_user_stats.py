@@ -0,0 +1,50 @@
+"""Add materialized dashboard statistics tables.
+
+Revision ID: 0002_user_stats
+Revises: 0001_composite_indexes
+Create Date: 2026-10-19
+
+Rows are backfilled lazily from the source tables the first time a user's
+dashboard is read or written, so no data migration is needed here.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_user_stats"
+down_revision = "0001_composite_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.String(), primary_key=True),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("total_memories", sa.Integer()),
+        sa.Column("memory_type_counts", sa.JSON()),
+        sa.Column("high_importance_memories", sa.Integer()),
+        sa.Column("feedback_by_day", sa.JSON()),
+        sa.Column("oldest_memory_at", sa.DateTime(), nullable=True),
+        sa.Column("newest_memory_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_milestones", sa.Integer()),
+        sa.Column("total_applications", sa.Integer()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "user_weekly_stats",
+        sa.Column("user_id", sa.String(), primary_key=True),
+        sa.Column("week_start", sa.DateTime(), primary_key=True),
+        sa.Column("milestones_completed", sa.Integer()),
+        sa.Column("applications_submitted", sa.Integer()),
+        sa.Column("interviews_attended", sa.Integer()),
+        sa.Column("hours_invested", sa.Integer()),
+        sa.Column("new_skills", sa.JSON()),
+        sa.Column("achievements", sa.JSON()),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_weekly_stats", if_exists=True)
+    op.drop_table("user_stats", if_exists=True)
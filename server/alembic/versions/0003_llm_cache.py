@@ -0,0 +1,34 @@
+"""Add the durable LLM response cache table.
+
+Revision ID: 0003_llm_cache
+Revises: 0002_user_stats
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_llm_cache"
+down_revision = "0002_user_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_cache_entries",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("total_tokens", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_llm_cache_entries_expires_at", "llm_cache_entries", ["expires_at"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_llm_cache_entries_expires_at", table_name="llm_cache_entries", if_exists=True)
+    op.drop_table("llm_cache_entries", if_exists=True)
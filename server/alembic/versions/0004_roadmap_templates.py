@@ -0,0 +1,36 @@
+"""Add the roadmap template store.
+
+Revision ID: 0004_roadmap_templates
+Revises: 0003_llm_cache
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_roadmap_templates"
+down_revision = "0003_llm_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "roadmap_templates",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("skill_gaps", sa.JSON(), nullable=False),
+        sa.Column("timeline_weeks", sa.Integer(), nullable=False),
+        sa.Column("milestones", sa.JSON(), nullable=False),
+        sa.Column("hit_count", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_roadmap_templates_expires_at", "roadmap_templates", ["expires_at"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_roadmap_templates_expires_at", table_name="roadmap_templates", if_exists=True)
+    op.drop_table("roadmap_templates", if_exists=True)
@@ -0,0 +1,37 @@
+"""Add background task status tracking.
+
+Revision ID: 0005_background_tasks
+Revises: 0004_roadmap_templates
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_background_tasks"
+down_revision = "0004_roadmap_templates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "background_tasks",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("status", sa.String()),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_background_tasks_user_id", "background_tasks", ["user_id"], if_not_exists=True)
+    op.create_index("ix_background_tasks_created_at", "background_tasks", ["created_at"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_background_tasks_created_at", table_name="background_tasks", if_exists=True)
+    op.drop_index("ix_background_tasks_user_id", table_name="background_tasks", if_exists=True)
+    op.drop_table("background_tasks", if_exists=True)
@@ -0,0 +1,30 @@
+"""Add shared key-value state for multi-worker deployments.
+
+Revision ID: 0006_shared_state
+Revises: 0005_background_tasks
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_shared_state"
+down_revision = "0005_background_tasks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "shared_state",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("value", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_shared_state_expires_at", "shared_state", ["expires_at"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_shared_state_expires_at", table_name="shared_state", if_exists=True)
+    op.drop_table("shared_state", if_exists=True)
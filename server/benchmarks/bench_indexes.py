@@ -0,0 +1,229 @@
+"""
+Benchmark the hot per-user queries with and without composite indexes.
+
+Seeds a throwaway database with one heavy user (10k memories by default)
+plus background users, times each hot query without the secondary
+indexes, creates them, and times the queries again.
+
+Run from the server directory:
+    python benchmarks/bench_indexes.py
+    python benchmarks/bench_indexes.py --memories 10000 --json bench_indexes.json
+    python benchmarks/bench_indexes.py --database-url postgresql://user:pw@localhost/bench
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from database import (
+    Base, create_db_engine,
+    UserProfile, Memory, Milestone, Application, Roadmap
+)
+
+TARGET_USER = "bench_heavy_user"
+
+
+def seed(session, user_id: str, memories: int, embedding_dim: int) -> None:
+    """Insert a user with memories, roadmaps, milestones and applications."""
+    now = datetime.utcnow()
+    session.add(UserProfile(user_id=user_id, skills=[], career_goals=[]))
+    session.flush()
+
+    embedding = [round(random.random(), 4) for _ in range(embedding_dim)]
+    batch = []
+    for i in range(memories):
+        batch.append({
+            "id": f"{user_id}_m{i}",
+            "user_id": user_id,
+            "created_at": now - timedelta(minutes=i * 7),
+            "memory_type": random.choice(["episodic", "semantic", "feedback"]),
+            "content": f"Memory {i} for {user_id}",
+            "embedding": embedding,
+            "importance": random.random(),
+            "tags": [],
+            "meta_data": {},
+        })
+        if len(batch) >= 1000:
+            session.bulk_insert_mappings(Memory, batch)
+            batch = []
+    if batch:
+        session.bulk_insert_mappings(Memory, batch)
+
+    roadmaps = max(memories // 500, 1)
+    for r in range(roadmaps):
+        roadmap_id = f"{user_id}_r{r}"
+        session.add(Roadmap(
+            id=roadmap_id,
+            user_id=user_id,
+            target_role="Backend Engineer",
+            skill_gaps=[],
+            generated_at=now - timedelta(days=r),
+            is_active=(r == 0),
+            full_plan={},
+        ))
+        for k in range(5):
+            completed = random.random() < 0.5
+            session.add(Milestone(
+                id=f"{roadmap_id}_ms{k}",
+                user_id=user_id,
+                roadmap_id=roadmap_id,
+                title=f"Milestone {k}",
+                status="completed" if completed else "not_started",
+                skills_to_learn=[],
+                estimated_hours=20,
+                completed_at=now - timedelta(days=random.randint(0, 60)) if completed else None,
+                resources=[],
+            ))
+
+    for a in range(max(memories // 20, 1)):
+        session.add(Application(
+            id=f"{user_id}_a{a}",
+            user_id=user_id,
+            company=f"Company {a}",
+            position="Engineer",
+            status=random.choice(["applied", "interview", "rejected"]),
+            applied_date=now - timedelta(hours=a * 5),
+            interview_topics=[],
+        ))
+    session.commit()
+
+
+def hot_queries(session):
+    """The per-user queries issued by the API on every page view."""
+    now = datetime.utcnow()
+    week_start = now - timedelta(days=now.weekday())
+    week_end = week_start + timedelta(days=7)
+    active_roadmap_id = f"{TARGET_USER}_r0"
+
+    return {
+        "recent_memories": lambda: session.query(Memory.id).filter(
+            Memory.user_id == TARGET_USER,
+            Memory.created_at >= now - timedelta(days=7)
+        ).order_by(Memory.created_at.desc()).limit(10).all(),
+        "important_memories": lambda: session.query(Memory.id).filter(
+            Memory.user_id == TARGET_USER,
+            Memory.importance >= 0.7
+        ).order_by(Memory.importance.desc()).limit(10).all(),
+        "weekly_milestones": lambda: session.query(Milestone.id).filter(
+            Milestone.user_id == TARGET_USER,
+            Milestone.status == "completed",
+            Milestone.completed_at >= week_start,
+            Milestone.completed_at < week_end
+        ).all(),
+        "completed_milestone_count": lambda: session.query(Milestone).filter(
+            Milestone.user_id == TARGET_USER,
+            Milestone.status == "completed"
+        ).count(),
+        "roadmap_milestones": lambda: session.query(Milestone.id).filter(
+            Milestone.roadmap_id == active_roadmap_id
+        ).all(),
+        "weekly_applications": lambda: session.query(Application.id).filter(
+            Application.user_id == TARGET_USER,
+            Application.applied_date >= week_start,
+            Application.applied_date < week_end
+        ).all(),
+        "recent_applications": lambda: session.query(Application.id).filter(
+            Application.user_id == TARGET_USER
+        ).order_by(Application.applied_date.desc()).limit(5).all(),
+        "active_roadmap": lambda: session.query(Roadmap.id).filter(
+            Roadmap.user_id == TARGET_USER,
+            Roadmap.is_active == True
+        ).order_by(Roadmap.generated_at.desc()).first(),
+    }
+
+
+def time_queries(session, repeat: int):
+    """Return median latency in milliseconds for each hot query."""
+    results = {}
+    for name, run in hot_queries(session).items():
+        run()  # warm up
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(samples)
+    return results
+
+
+def set_indexes(engine, present: bool) -> None:
+    """Create or drop every secondary index declared on the models."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if present:
+                index.create(bind=engine, checkfirst=True)
+            else:
+                index.drop(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("ANALYZE"))
+        elif engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE memories, milestones, applications, roadmaps"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--memories", type=int, default=10000, help="Memories for the heavy user")
+    parser.add_argument("--background-users", type=int, default=3, help="Other users with the same volume")
+    parser.add_argument("--embedding-dim", type=int, default=768)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    url = args.database_url
+    if not url:
+        tmp_dir = tempfile.mkdtemp(prefix="bench_indexes_")
+        url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+    engine = create_db_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    print(f"Seeding {args.memories} memories x {args.background_users + 1} users ({engine.dialect.name})...")
+    seed(session, TARGET_USER, args.memories, args.embedding_dim)
+    for i in range(args.background_users):
+        seed(session, f"bench_user_{i}", args.memories, args.embedding_dim)
+
+    set_indexes(engine, present=False)
+    before = time_queries(session, args.repeat)
+    set_indexes(engine, present=True)
+    after = time_queries(session, args.repeat)
+    session.close()
+
+    print(f"\n{'query':<28}{'no index (ms)':>15}{'indexed (ms)':>15}{'speedup':>10}")
+    print("-" * 68)
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<28}{before[name]:>15.3f}{after[name]:>15.3f}{speedup:>9.1f}x")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "dialect": engine.dialect.name,
+                "memories_per_user": args.memories,
+                "users": args.background_users + 1,
+                "median_ms": {"before": before, "after": after},
+            }, f, indent=2)
+
+    engine.dispose()
+    if tmp_dir:
+        for name in os.listdir(tmp_dir):
+            os.remove(os.path.join(tmp_dir, name))
+        os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
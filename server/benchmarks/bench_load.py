@@ -0,0 +1,416 @@
+"""
+Offline load test: the real app against local fake Groq, Gemini and JSearch.
+
+Starts benchmarks/fake_services.py and the API (uvicorn, temporary SQLite
+database) on free local ports, then drives closed-loop mixed traffic:
+`--concurrency` virtual users each pick a scenario by weight, run it and
+repeat until `--duration` runs out. Every user first gets a profile from a
+resume upload (not measured), and requests started during `--warmup`
+are discarded.
+
+Scenarios (weights set with --mix):
+    chat       POST /agent/message
+    roadmap    POST /agent/roadmap/regenerate, GET /agent/roadmap/current
+    jobs       POST /agent/jobs/recommend (JSearch + embeddings)
+    resume     POST /agent/resume/parse (DOCX built from benchmarks/resumes/)
+    interview  POST /agent/interview/start, /submit x2, GET /agent/interview/report/{id}
+    progress   GET /agent/progress/weekly, GET /agent/memory/summary
+
+Reports throughput and p50/p95/p99 per endpoint. With --json the results
+are written along with the git commit and every setting, and --compare
+prints the change against such a file from an earlier commit.
+
+Run from the server directory:
+    python benchmarks/bench_load.py --duration 60 --concurrency 16
+    python benchmarks/bench_load.py --json load_main.json
+    python benchmarks/bench_load.py --compare load_main.json --llm-error-rate 0.02
+"""
+import argparse
+import asyncio
+import glob
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+from fake_services import add_service_arguments
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(SERVER_DIR, "benchmarks")
+DEFAULT_MIX = "chat=40,roadmap=10,jobs=10,resume=10,interview=15,progress=15"
+
+CHAT_MESSAGES = [
+    "How should I prepare for backend interviews?",
+    "Can you make me a learning plan for the next few months?",
+    "What skills am I missing for a platform engineering role?",
+    "Which jobs should I apply to this week?",
+    "I finished my Docker milestone, what next?",
+    "How do I explain a career gap on my resume?",
+]
+INTERVIEW_ANSWERS = [
+    "I would use a token bucket per API key stored in Redis, with a Lua script so refill and take are atomic.",
+    "I'd start with requirements, then sketch the data model, then discuss caching and failure modes.",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_revision() -> dict:
+    """Commit and dirty flag of the tree being measured, for comparing runs."""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=SERVER_DIR, capture_output=True, text=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "."))}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def resume_documents() -> list:
+    """DOCX uploads built from the text resumes used by bench_resume_parsing.py."""
+    from docx import Document
+
+    documents = []
+    for path in sorted(glob.glob(os.path.join(BENCH_DIR, "resumes", "*.txt"))):
+        document = Document()
+        for line in open(path, encoding="utf-8").read().splitlines():
+            document.add_paragraph(line)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        documents.append((os.path.basename(path).replace(".txt", ".docx"), buffer.getvalue()))
+    return documents
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class Recorder:
+    """Collects per-endpoint latencies after the warmup window."""
+
+    def __init__(self, measure_from: float):
+        self.measure_from = measure_from
+        self.samples = {}
+        self.errors = {}
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        finished_at = time.perf_counter()
+        if started_at >= self.measure_from:
+            self.samples.setdefault(name, []).append(finished_at - started_at)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        return response if ok else None
+
+
+# ---------------------------------------------------------------- scenarios
+
+async def chat(client, recorder, user_id, rng, ctx):
+    await recorder.call(client, "POST /agent/message", "POST", "/agent/message",
+                        json={"user_id": user_id, "message": rng.choice(CHAT_MESSAGES)})
+
+
+async def roadmap(client, recorder, user_id, rng, ctx):
+    await recorder.call(client, "POST /agent/roadmap/regenerate", "POST", "/agent/roadmap/regenerate",
+                        json={"user_id": user_id, "timeline_weeks": rng.choice([8, 12, 16])})
+    await recorder.call(client, "GET /agent/roadmap/current", "GET", "/agent/roadmap/current",
+                        params={"user_id": user_id})
+
+
+async def jobs(client, recorder, user_id, rng, ctx):
+    await recorder.call(client, "POST /agent/jobs/recommend", "POST", "/agent/jobs/recommend",
+                        json={"user_id": user_id, "limit": 5})
+
+
+async def resume(client, recorder, user_id, rng, ctx):
+    filename, content = rng.choice(ctx["resumes"])
+    await recorder.call(
+        client, "POST /agent/resume/parse", "POST", "/agent/resume/parse",
+        params={"user_id": user_id},
+        files={"file": (filename, content, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")},
+    )
+
+
+async def interview(client, recorder, user_id, rng, ctx):
+    response = await recorder.call(client, "POST /agent/interview/start", "POST", "/agent/interview/start",
+                                   json={"user_id": user_id, "target_role": "Backend Developer"})
+    if response is None:
+        return
+    session_id = response.json()["session_id"]
+    for answer in INTERVIEW_ANSWERS:
+        await recorder.call(client, "POST /agent/interview/submit", "POST", "/agent/interview/submit",
+                            json={"user_id": user_id, "session_id": session_id, "answer": answer})
+    await recorder.call(client, "GET /agent/interview/report/{id}", "GET", f"/agent/interview/report/{session_id}")
+
+
+async def progress(client, recorder, user_id, rng, ctx):
+    await recorder.call(client, "GET /agent/progress/weekly", "GET", "/agent/progress/weekly",
+                        params={"user_id": user_id})
+    await recorder.call(client, "GET /agent/memory/summary", "GET", "/agent/memory/summary",
+                        params={"user_id": user_id})
+
+
+SCENARIOS = {
+    "chat": chat,
+    "roadmap": roadmap,
+    "jobs": jobs,
+    "resume": resume,
+    "interview": interview,
+    "progress": progress,
+}
+
+
+# ---------------------------------------------------------------- processes
+
+def start_process(args_list, env=None) -> subprocess.Popen:
+    # stderr goes to a file, not a pipe: nothing reads it during the run, and
+    # a full pipe would stall the server on its next log line
+    log = tempfile.TemporaryFile(mode="w+")
+    process = subprocess.Popen(
+        args_list, cwd=SERVER_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=log, text=True
+    )
+    process.log = log
+    return process
+
+
+def process_output(process: subprocess.Popen, limit: int = 2000) -> str:
+    process.log.seek(0)
+    return process.log.read()[-limit:]
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"{url} exited during startup:\n{process_output(process)}")
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise SystemExit(f"{url} not ready after {timeout:.0f}s")
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    process.log.close()
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(recorder: Recorder, measured_seconds: float) -> dict:
+    endpoints = {}
+    for name, values in sorted(recorder.samples.items()):
+        values.sort()
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": recorder.errors.get(name, 0),
+            "rps": len(values) / measured_seconds,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+    everything = sorted(v for values in recorder.samples.values() for v in values)
+    endpoints["ALL"] = {
+        "requests": len(everything),
+        "errors": sum(recorder.errors.values()),
+        "rps": len(everything) / measured_seconds,
+        "p50_ms": percentile(everything, 50) * 1000,
+        "p95_ms": percentile(everything, 95) * 1000,
+        "p99_ms": percentile(everything, 99) * 1000,
+        "max_ms": everything[-1] * 1000 if everything else 0.0,
+    }
+    return endpoints
+
+
+async def seed_profiles(client: httpx.AsyncClient, users: list, resumes: list, concurrency: int) -> None:
+    """Upload a resume per user so profile-dependent endpoints (jobs) have data."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def seed(index: int, user_id: str):
+        filename, content = resumes[index % len(resumes)]
+        async with semaphore:
+            response = await client.post(
+                "/agent/resume/parse", params={"user_id": user_id},
+                files={"file": (filename, content, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")},
+            )
+        if response.status_code >= 400:
+            raise SystemExit(f"Seeding {user_id} failed: {response.status_code} {response.text[:200]}")
+
+    await asyncio.gather(*(seed(i, user_id) for i, user_id in enumerate(users)))
+
+
+async def run_load(args, base_url: str) -> dict:
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    ctx = {"resumes": resume_documents()}
+    users = [f"loadtest-user-{i}" for i in range(args.users)]
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await seed_profiles(client, users, ctx["resumes"], args.concurrency)
+
+    started_at = time.perf_counter()
+    recorder = Recorder(measure_from=started_at + args.warmup)
+    stop_at = started_at + args.warmup + args.duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        async def virtual_user(index: int):
+            rng = random.Random(args.seed * 1000 + index)
+            while time.perf_counter() < stop_at:
+                scenario = SCENARIOS[rng.choices(names, weights)[0]]
+                await scenario(client, recorder, rng.choice(users), rng, ctx)
+
+        await asyncio.gather(*(virtual_user(i) for i in range(args.concurrency)))
+
+    measured = time.perf_counter() - recorder.measure_from
+    return summarize(recorder, measured)
+
+
+async def main_async(args) -> dict:
+    fake_port, app_port = free_port(), free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+
+    fake_args = [sys.executable, os.path.join(BENCH_DIR, "fake_services.py"), "--port", str(fake_port),
+                 "--seed", str(args.seed)]
+    for name in ("llm", "embed", "jsearch"):
+        for suffix in ("median_ms", "p95_ms", "error_rate"):
+            fake_args += [f"--{name}-{suffix.replace('_', '-')}", str(getattr(args, f"{name}_{suffix}"))]
+
+    workdir = tempfile.mkdtemp(prefix="bench_load_")
+    env = dict(
+        os.environ,
+        DATABASE_URL=args.database_url or f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        GROQ_API_KEY="benchmark",
+        GOOGLE_API_KEY="benchmark",
+        JSEARCH_API_KEY="benchmark",
+        GROQ_BASE_URL=fake_url,
+        GEMINI_BASE_URL=fake_url,
+        JSEARCH_BASE_URL=fake_url,
+        LOG_LEVEL="WARNING",
+        DEBUG="false",
+        WEB_CONCURRENCY=str(args.workers),
+    )
+    if not args.keep_rate_limit:
+        # Measure the app, not the provider quota it is configured for
+        env["LLM_REQUESTS_PER_MINUTE"] = "0"
+    for assignment in args.env:
+        key, _, value = assignment.partition("=")
+        env[key] = value
+
+    app_args = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(app_port),
+                "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"]
+
+    fake = start_process(fake_args)
+    app = None
+    try:
+        await wait_ready(f"{fake_url}/stats", fake)
+        app = start_process(app_args, env=env)
+        await wait_ready(f"{app_url}/", app)
+        results = await run_load(args, app_url)
+        async with httpx.AsyncClient() as client:
+            provider_calls = (await client.get(f"{fake_url}/stats")).json()
+    finally:
+        if app is not None:
+            stop_process(app)
+        stop_process(fake)
+
+    return {
+        "git": git_revision(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("json_path", "compare")},
+        "provider_calls": provider_calls,
+        "endpoints": results,
+    }
+
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    header = f"{'endpoint':<36}{'reqs':>7}{'err':>5}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    if baseline:
+        header += f"{'Δrps':>8}{'Δp50':>8}{'Δp95':>8}{'Δp99':>8}"
+    print("\n" + header)
+    print("-" * len(header))
+    base_endpoints = (baseline or {}).get("endpoints", {})
+    for name, row in report["endpoints"].items():
+        line = (f"{name:<36}{row['requests']:>7}{row['errors']:>5}{row['rps']:>8.2f}"
+                f"{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}{row['p99_ms']:>9.0f}")
+        base = base_endpoints.get(name)
+        if base:
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+                change = (row[key] / base[key] - 1) if base[key] else 0.0
+                line += f"{change:>+8.0%}"
+        print(line)
+    calls = report["provider_calls"]
+    print("\nprovider calls: " + ", ".join(f"{name} {c['requests']} ({c['errors']} failed)" for name, c in calls.items()))
+    if baseline:
+        print(f"baseline: {baseline['git'].get('commit', '?')[:12]} ({baseline['timestamp']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of traffic excluded from results")
+    parser.add_argument("--concurrency", type=int, default=8, help="Virtual users running scenarios back to back")
+    parser.add_argument("--users", type=int, default=20, help="Distinct user ids the virtual users act as")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. chat=50,jobs=10")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request client timeout")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for traffic and fake-service randomness")
+    parser.add_argument("--database-url", default=None, help="Database for the app (default: temporary SQLite)")
+    parser.add_argument("--keep-rate-limit", action="store_true", help="Keep the app's LLM_REQUESTS_PER_MINUTE")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra app setting")
+    add_service_arguments(parser)
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results as JSON")
+    parser.add_argument("--compare", default=None, help="Earlier --json output to diff against")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    baseline = json.load(open(args.compare)) if args.compare else None
+    print_report(report, baseline)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Microbenchmarks for memory retrieval and scoring as memory volume grows.
+
+Seeds one user per size (100, 1k and 10k memories by default, each with a
+768-d embedding) into a throwaway database and times the MemoryManager
+paths the agent runs on every turn:
+
+    retrieve_relevant_memories  query embedding (stubbed) + scan + cosine scoring + top-k load
+    memory_summary_backfill     first /agent/memory/summary for a user: user_stats built by aggregate queries
+    memory_summary              later summaries: user_stats row read and rendered
+    get_recent_memories         last 7 days, newest first
+    cosine_similarity           _cosine_similarity over every candidate, no database
+
+Embeddings are a mix of the query vector and noise, so a realistic share
+of candidates clears MEMORY_SIMILARITY_THRESHOLD. The embedding provider
+is replaced by a fixed vector; only local work is measured.
+
+With --baseline the run is compared against an earlier --json output and
+exits with status 1 when any case's median is slower by more than
+--max-regression, so it can gate CI.
+
+Run from the server directory:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --sizes 100,1000,10000,100000 --json bench_memory.json
+    python benchmarks/bench_memory.py --baseline bench_memory.json --max-regression 0.2
+    python benchmarks/bench_memory.py --database-url postgresql://user:pw@localhost/bench
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database import Base, create_db_engine, UserProfile, Memory
+from memory import MemoryManager, memory_manager
+from stats import user_stats
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEMORY_TYPES = ["episodic", "semantic", "feedback"]
+
+
+class FixedEmbeddings:
+    """Embedding client stand-in that returns the benchmark's query vector."""
+
+    def __init__(self, vector):
+        self.vector = vector
+
+    def embed_query(self, text: str):
+        return self.vector
+
+    async def aembed_query(self, text: str):
+        return self.vector
+
+
+def synthesize(rng: np.random.Generator, query: np.ndarray, count: int) -> np.ndarray:
+    """
+    Unit vectors with a spread of similarity to `query`.
+
+    Each row is `a * query + noise` with `a` uniform in [0, 1), which puts
+    roughly a third of rows above the default 0.7 threshold.
+    """
+    noise = rng.standard_normal((count, query.shape[0]))
+    noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+    mix = rng.random((count, 1)) * 2.5
+    vectors = mix * query + noise
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.round(vectors, 5)
+
+
+def seed_user(session, rng, user_id: str, count: int, query: np.ndarray) -> list:
+    """Insert `count` memories spread over the last 90 days; return their embeddings."""
+    now = datetime.utcnow()
+    session.add(UserProfile(user_id=user_id, skills=[], career_goals=[]))
+    session.flush()
+
+    embeddings = synthesize(rng, query, count).tolist()
+    for start in range(0, count, 1000):
+        session.bulk_insert_mappings(Memory, [
+            {
+                "id": f"{user_id}_m{i}",
+                "user_id": user_id,
+                "created_at": now - timedelta(minutes=int(rng.integers(0, 90 * 24 * 60))),
+                "memory_type": MEMORY_TYPES[i % len(MEMORY_TYPES)],
+                "content": f"Memory {i} for {user_id}: practised system design and mock interviews",
+                "embedding": embeddings[i],
+                "importance": float(rng.random()),
+                "tags": [],
+                "meta_data": {},
+            }
+            for i in range(start, min(start + 1000, count))
+        ])
+        session.commit()
+    return embeddings
+
+
+def measure(run, repeat: int) -> dict:
+    """Median and p95 wall time of `run()` in milliseconds, after one warm-up call."""
+    run()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+        "runs": repeat,
+    }
+
+
+def cases(session, loop, user_id: str, query: list, embeddings: list):
+    """The measured calls for one seeded user."""
+    def summary_backfill():
+        # Build the stats row from the memories table, then roll back so the next run is cold again
+        user_stats._backfill(session, user_id)
+        session.rollback()
+
+    def summary():
+        # Drop the identity map so the row is read from the database, as on a new request
+        session.expunge_all()
+        return user_stats.memory_insights(user_stats.get_stats(session, user_id))
+
+    return {
+        "retrieve_relevant_memories": lambda: loop.run_until_complete(
+            memory_manager.retrieve_relevant_memories(session, user_id, "system design practice", top_k=5)
+        ),
+        # Runs before memory_summary, whose first call stores the row
+        "memory_summary_backfill": summary_backfill,
+        "memory_summary": summary,
+        "get_recent_memories": lambda: memory_manager.get_recent_memories(session, user_id),
+        "cosine_similarity": lambda: [MemoryManager._cosine_similarity(query, e) for e in embeddings],
+    }
+
+
+def repeat_for(size: int, repeat: int) -> int:
+    """Fewer repetitions for the largest users so a run stays in minutes."""
+    return max(3, min(repeat, repeat * 1000 // max(size, 1)))
+
+
+def git_revision() -> dict:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=SERVER_DIR, capture_output=True, text=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "."))}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def regressions(results: dict, baseline: dict, max_regression: float, noise_floor_ms: float) -> list:
+    """Cases whose median grew by more than `max_regression` (and by more than the noise floor)."""
+    failed = []
+    for key, row in results.items():
+        base = baseline.get("results", {}).get(key)
+        if not base:
+            continue
+        change = row["median_ms"] - base["median_ms"]
+        if change > noise_floor_ms and row["median_ms"] > base["median_ms"] * (1 + max_regression):
+            failed.append((key, base["median_ms"], row["median_ms"]))
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated memories per user")
+    parser.add_argument("--embedding-dim", type=int, default=768)
+    parser.add_argument("--repeat", type=int, default=30, help="Timed runs per case (scaled down above 1k)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Earlier --json output to check against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed median slowdown vs the baseline (0.25 = 25%%)")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.5,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    rng = np.random.default_rng(args.seed)
+    query = rng.standard_normal(args.embedding_dim)
+    query /= np.linalg.norm(query)
+    memory_manager.embedding_client = FixedEmbeddings(query.tolist())
+
+    tmp_dir = None
+    url = args.database_url
+    if not url:
+        tmp_dir = tempfile.mkdtemp(prefix="bench_memory_")
+        url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+    engine = create_db_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    loop = asyncio.new_event_loop()
+
+    results = {}
+    for size in sizes:
+        user_id = f"bench_user_{size}"
+        print(f"Seeding {size} memories ({engine.dialect.name}, {args.embedding_dim}-d)...")
+        embeddings = seed_user(session, rng, user_id, size, query)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE" if engine.dialect.name == "sqlite" else "ANALYZE memories"))
+
+        for name, run in cases(session, loop, user_id, query.tolist(), embeddings).items():
+            results[f"{name}[{size}]"] = measure(run, repeat_for(size, args.repeat))
+            # Results are ORM objects; keep the identity map from growing across runs
+            session.expunge_all()
+
+    loop.close()
+    session.close()
+    engine.dispose()
+    if tmp_dir:
+        for name in os.listdir(tmp_dir):
+            os.remove(os.path.join(tmp_dir, name))
+        os.rmdir(tmp_dir)
+
+    baseline = json.load(open(args.baseline)) if args.baseline else None
+    base_results = (baseline or {}).get("results", {})
+
+    header = f"\n{'case':<40}{'runs':>6}{'median ms':>12}{'p95 ms':>10}"
+    if baseline:
+        header += f"{'baseline':>10}{'change':>9}"
+    print(header)
+    print("-" * (len(header) - 1))
+    for key, row in results.items():
+        line = f"{key:<40}{row['runs']:>6}{row['median_ms']:>12.3f}{row['p95_ms']:>10.3f}"
+        base = base_results.get(key)
+        if base:
+            line += f"{base['median_ms']:>10.3f}{row['median_ms'] / base['median_ms'] - 1:>+9.0%}"
+        print(line)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "git": git_revision(),
+                "timestamp": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "dialect": engine.dialect.name,
+                "embedding_dim": args.embedding_dim,
+                "similarity_threshold": settings.MEMORY_SIMILARITY_THRESHOLD,
+                "results": results,
+            }, f, indent=2)
+
+    if baseline:
+        failed = regressions(results, baseline, args.max_regression, args.noise_floor_ms)
+        if failed:
+            print(f"\n{len(failed)} case(s) slower than baseline by more than {args.max_regression:.0%}:")
+            for key, before, after in failed:
+                print(f"  {key}: {before:.3f} ms -> {after:.3f} ms")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.max_regression:.0%} "
+              f"(baseline {baseline.get('git', {}).get('commit', '?')[:12]})")
+
+
+if __name__ == "__main__":
+    main()
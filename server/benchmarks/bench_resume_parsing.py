@@ -0,0 +1,205 @@
+"""
+Benchmark resume prompt size and parse latency with and without sectioning.
+
+For every resume in the corpus, compares three ways of sending it to the LLM:
+
+    baseline  - full extracted text in one prompt (previous behaviour)
+    compact   - skill pre-pass + section segmentation + token budget, one call
+    parallel  - the same sections extracted per group, calls run concurrently
+
+By default the LLM is simulated: each call sleeps for a fixed overhead plus
+a per-token prefill cost, so latency tracks prompt size without hitting a
+paid API. Pass --live to use the configured Groq model instead.
+
+Run from the server directory:
+    python benchmarks/bench_resume_parsing.py
+    python benchmarks/bench_resume_parsing.py --budget 1200 --json bench_resume.json
+    python benchmarks/bench_resume_parsing.py --live
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage
+
+from config import settings
+from resume_parser import ResumeParser, skill_prepass
+from resume_sections import segment, compact, estimate_tokens
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resumes")
+
+# The single-prompt extraction used before sectioning, kept as the baseline
+LEGACY_PROMPT = """Extract structured information from this resume. Return ONLY valid JSON with this exact structure:
+
+{{
+    "name": "Full Name",
+    "email": "email@example.com",
+    "phone": "phone number or null",
+    "education": [
+        {{
+            "degree": "Degree Name",
+            "institution": "University Name",
+            "year": "Graduation Year",
+            "field": "Field of Study"
+        }}
+    ],
+    "experience": [
+        {{
+            "title": "Job Title",
+            "company": "Company Name",
+            "duration": "Start - End",
+            "description": "Brief description"
+        }}
+    ],
+    "skills": ["skill1", "skill2", "skill3"],
+    "certifications": ["cert1", "cert2"],
+    "projects": [
+        {{
+            "name": "Project Name",
+            "description": "Brief description",
+            "technologies": ["tech1", "tech2"]
+        }}
+    ]
+}}
+
+Resume text:
+{text}
+
+Return ONLY the JSON object, no additional text."""
+
+
+class SimulatedLLM:
+    """Stands in for a gateway chat model; latency grows with prompt tokens."""
+    call_site = "resume_parser"
+
+    def __init__(self, base_ms: float, ms_per_1k_tokens: float):
+        self.base_ms = base_ms
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+        self.prompt_tokens = 0
+        self.calls = 0
+
+    async def ainvoke(self, prompt, **kwargs):
+        tokens = estimate_tokens(prompt if isinstance(prompt, str) else str(prompt))
+        self.prompt_tokens += tokens
+        self.calls += 1
+        await asyncio.sleep((self.base_ms + self.ms_per_1k_tokens * tokens / 1000) / 1000)
+        return AIMessage(content="{}")
+
+    async def discard(self, prompt, **kwargs):
+        pass
+
+
+class LiveLLM:
+    """Wraps the real gateway model, counting prompt tokens the same way."""
+
+    def __init__(self, llm):
+        self._llm = llm
+        self.call_site = llm.call_site
+        self.prompt_tokens = 0
+        self.calls = 0
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.prompt_tokens += estimate_tokens(prompt if isinstance(prompt, str) else str(prompt))
+        self.calls += 1
+        return await self._llm.ainvoke(prompt, **kwargs)
+
+    async def discard(self, prompt, **kwargs):
+        await self._llm.discard(prompt, **kwargs)
+
+
+async def run_mode(parser: ResumeParser, llm, text: str, mode: str) -> float:
+    """Parse one resume in the given mode; returns wall time in ms."""
+    parser.llm = llm
+    start = time.perf_counter()
+    if mode == "baseline":
+        await llm.ainvoke(LEGACY_PROMPT.format(text=text))
+    else:
+        settings.RESUME_PARALLEL_SECTIONS = mode == "parallel"
+        await parser.parse_text(text)
+    return (time.perf_counter() - start) * 1000
+
+
+def time_preprocessing(text: str, budget: int, repeat: int) -> float:
+    """Median ms for the local pre-pass, segmentation and compaction."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        llm_text, _ = skill_prepass(text)
+        compact(segment(llm_text), budget)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main_async(args) -> dict:
+    settings.RESUME_SKILL_PREPASS = True
+    settings.RESUME_LLM_TOKEN_BUDGET = args.budget
+    # Identical prompts must not be served from the response cache between modes
+    settings.LLM_CACHE_ENABLED = False
+
+    parser = ResumeParser()
+    live_llm = parser.llm
+    paths = sorted(glob.glob(os.path.join(args.corpus, "*.txt")))
+    if not paths:
+        raise SystemExit(f"No .txt resumes in {args.corpus}")
+
+    results = {}
+    for path in paths:
+        text = open(path, encoding="utf-8").read()
+        row = {"raw_tokens": estimate_tokens(text), "preprocess_ms": time_preprocessing(text, args.budget, args.repeat)}
+        for mode in ("baseline", "compact", "parallel"):
+            latencies = []
+            for _ in range(1 if args.live else args.latency_repeat):
+                llm = LiveLLM(live_llm) if args.live else SimulatedLLM(args.base_ms, args.ms_per_1k_tokens)
+                latencies.append(await run_mode(parser, llm, text, mode))
+            row[mode] = {
+                "prompt_tokens": llm.prompt_tokens,
+                "calls": llm.calls,
+                "latency_ms": statistics.median(latencies),
+            }
+        results[os.path.basename(path)] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Directory of .txt resumes")
+    parser.add_argument("--budget", type=int, default=settings.RESUME_LLM_TOKEN_BUDGET, help="Resume token budget")
+    parser.add_argument("--base-ms", type=float, default=300.0, help="Simulated per-call overhead")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=400.0, help="Simulated prefill cost")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs for local preprocessing timings")
+    parser.add_argument("--latency-repeat", type=int, default=3, help="Simulated parses per mode")
+    parser.add_argument("--live", action="store_true", help="Call the configured LLM instead of simulating")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print(f"\n{'resume':<34}{'raw':>6}{'base tok':>10}{'compact':>9}{'saved':>7}"
+          f"{'par tok':>9}{'calls':>6}{'prep ms':>9}{'base ms':>9}{'cmp ms':>8}{'par ms':>8}")
+    print("-" * 115)
+    for name, row in results.items():
+        base, comp, par = row["baseline"], row["compact"], row["parallel"]
+        saved = 1 - comp["prompt_tokens"] / base["prompt_tokens"] if base["prompt_tokens"] else 0.0
+        print(f"{name:<34}{row['raw_tokens']:>6}{base['prompt_tokens']:>10}{comp['prompt_tokens']:>9}{saved:>7.0%}"
+              f"{par['prompt_tokens']:>9}{par['calls']:>6}{row['preprocess_ms']:>9.2f}"
+              f"{base['latency_ms']:>9.0f}{comp['latency_ms']:>8.0f}{par['latency_ms']:>8.0f}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "live": args.live,
+                "budget": args.budget,
+                "simulated": None if args.live else {"base_ms": args.base_ms, "ms_per_1k_tokens": args.ms_per_1k_tokens},
+                "resumes": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Cold-start benchmark: how long until the API can serve its first request.
+
+Each measurement uses a fresh interpreter, so nothing is cached in
+sys.modules:
+
+    import main   `python -c "import main"`, timed inside the process
+    ready         spawn `uvicorn main:app` until GET / answers (includes
+                  interpreter start, imports, init_db and the startup hooks)
+
+GOOGLE_API_KEY is removed from the environment to check that the app starts
+without provider keys. --top lists the slowest imports (`python -X importtime`)
+so the cause of a regression is visible. --budget exits with status 1 when the
+median import time exceeds it.
+
+Run from the server directory:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --top 15 --json bench_startup.json
+    python benchmarks/bench_startup.py --budget 1.0
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def app_env(database_url: str) -> dict:
+    env = {key: value for key, value in os.environ.items() if key != "GOOGLE_API_KEY"}
+    env.update(DATABASE_URL=database_url, LOG_LEVEL="WARNING")
+    return env
+
+
+def time_import(env: dict) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=SERVER_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def time_ready(env: dict, timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn until GET / returns 200."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/"
+
+    started_at = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        while time.perf_counter() - started_at < timeout:
+            if process.poll() is not None:
+                raise SystemExit(f"uvicorn exited during startup:\n{process.stderr.read()[-2000:]}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started_at
+            except OSError:
+                time.sleep(0.01)
+        raise SystemExit(f"Server not ready after {timeout:.0f}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def slowest_imports(env: dict, top: int) -> list:
+    """Modules imported directly by main, by cumulative import time (`-X importtime`)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SERVER_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nesting is two spaces per level; keep what `import main` pulls in directly
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            packages[name.strip()] = int(cumulative) / 1e6
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list (0 = skip)")
+    parser.add_argument("--budget", type=float, default=None, help="Fail if median import exceeds this many seconds")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    env = app_env(f"sqlite:///{os.path.join(tmp_dir, 'startup.db')}")
+
+    imports = [time_import(env) for _ in range(args.repeat)]
+    ready = [time_ready(env) for _ in range(args.repeat)]
+    top = slowest_imports(env, args.top) if args.top else []
+
+    for name in os.listdir(tmp_dir):
+        os.remove(os.path.join(tmp_dir, name))
+    os.rmdir(tmp_dir)
+
+    print(f"\n{'measurement':<14}{'median s':>10}{'min s':>9}{'max s':>9}")
+    print("-" * 42)
+    for label, samples in (("import main", imports), ("ready", ready)):
+        print(f"{label:<14}{statistics.median(samples):>10.3f}{min(samples):>9.3f}{max(samples):>9.3f}")
+    if top:
+        print(f"\n{'slowest imports':<40}{'s':>8}")
+        for name, seconds in top:
+            print(f"{name:<40}{seconds:>8.3f}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "repeat": args.repeat,
+                "import_main_s": imports,
+                "ready_s": ready,
+                "slowest_imports": top,
+            }, f, indent=2)
+
+    if args.budget is not None and statistics.median(imports) > args.budget:
+        print(f"\nMedian import {statistics.median(imports):.3f}s exceeds budget {args.budget:.3f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
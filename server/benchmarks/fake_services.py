@@ -0,0 +1,309 @@
+"""
+Local stand-ins for Groq, Gemini embeddings and JSearch.
+
+One Starlette app speaks just enough of each provider's HTTP API for the
+SDKs the server uses:
+
+    POST /openai/v1/chat/completions                 Groq (JSON and SSE streaming)
+    POST /v1beta/models/{model}:batchEmbedContents   Gemini embeddings
+    GET  /search                                     JSearch
+
+Each service sleeps for a latency drawn from a log-normal distribution
+(given as median and p95) and fails a configurable fraction of requests
+with 429/503. Chat replies are canned but shaped like the real thing:
+the prompt is matched against the app's prompt templates so structured
+calls get JSON that validates.
+
+Run standalone (bench_load.py starts it for you):
+    python benchmarks/fake_services.py --port 9100 --llm-median-ms 600 --llm-p95-ms 1800
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+EMBEDDING_DIMENSION = 768
+Z_95 = 1.6449
+
+
+class ServiceProfile:
+    """Latency and error behaviour of one fake service."""
+
+    def __init__(self, median_ms: float, p95_ms: float, error_rate: float, rng: random.Random):
+        self.median_ms = median_ms
+        # log-normal: p95 = median * exp(z95 * sigma)
+        self.sigma = math.log(max(p95_ms, median_ms) / median_ms) / Z_95 if median_ms > 0 else 0.0
+        self.error_rate = error_rate
+        self.rng = rng
+        self.requests = 0
+        self.errors = 0
+
+    def latency(self) -> float:
+        """Seconds to wait for this request."""
+        if self.median_ms <= 0:
+            return 0.0
+        return self.median_ms * math.exp(self.rng.gauss(0.0, self.sigma)) / 1000
+
+    def failure(self):
+        """An error response, or None for a successful request."""
+        self.requests += 1
+        if self.rng.random() >= self.error_rate:
+            return None
+        self.errors += 1
+        status = self.rng.choice((429, 503))
+        return JSONResponse({"error": {"message": "injected failure", "type": "fake_error"}}, status_code=status)
+
+
+# ---------------------------------------------------------------- chat replies
+
+SKILLS = ["Python", "FastAPI", "PostgreSQL", "Docker", "Kubernetes", "AWS", "Redis", "React", "TypeScript", "GraphQL"]
+
+
+def _milestones(count: int = 5):
+    return [
+        {
+            "title": f"Build a production-ready {skill} project",
+            "description": f"Design, implement and deploy a small service that exercises {skill} end to end.",
+            "skills": [skill, SKILLS[(i + 3) % len(SKILLS)]],
+            "estimated_hours": 10 + 4 * i,
+        }
+        for i, skill in enumerate(SKILLS[:count])
+    ]
+
+
+def _intent(prompt: str) -> dict:
+    message = re.search(r'Message: "(.*?)"', prompt, re.S)
+    text = (message.group(1) if message else prompt).lower()
+    if "roadmap" in text or "plan" in text:
+        return {"intent": "roadmap_request", "requires_action": True, "action_type": "roadmap_generation"}
+    if "job" in text or "hiring" in text:
+        return {"intent": "job_search", "requires_action": True, "action_type": "job_search"}
+    if "skill" in text or "gap" in text:
+        return {"intent": "skill_assessment", "requires_action": True, "action_type": "skill_assessment"}
+    return {"intent": "general_advice", "requires_action": False, "action_type": None}
+
+
+def _jobs(prompt: str) -> list:
+    count = int(re.search(r"Generate (\d+) realistic job postings", prompt).group(1))
+    return [
+        {
+            "company": f"Company {i}",
+            "title": "Backend Engineer",
+            "location": "Remote",
+            "job_type": "Full-time",
+            "experience_required": "2-4 years",
+            "required_skills": SKILLS[i % 4:i % 4 + 4],
+            "preferred_skills": ["Kubernetes"],
+            "salary_range": {"min": 90000, "max": 140000, "currency": "USD"},
+            "description": "Build and operate APIs for a growing product team.",
+            "url": f"https://jobs.example.com/{i}",
+            "match_score": 70 + i % 25,
+            "posted_date": "2025-01-15",
+        }
+        for i in range(count)
+    ]
+
+
+# (pattern, reply builder) in the order the templates are checked; prompts that
+# embed user text (intent, mentor response) come first so that text cannot match later patterns
+CHAT_REPLIES = [
+    ("Analyze this user message and determine their intent", lambda p: json.dumps(_intent(p))),
+    ("You are an expert AI career mentor", lambda p: MENTOR_REPLY),
+    ("Based on these technical skills", lambda p: "Backend Developer"),
+    ("Analyze the skill gaps", lambda p: json.dumps(SKILLS[3:9])),
+    ("week learning roadmap for this user", lambda p: json.dumps({"role": "Backend Developer", "skill_gaps": SKILLS[3:9], "milestones": _milestones()})),
+    ("week learning roadmap for a", lambda p: json.dumps(_milestones())),
+    ("practical project ideas", lambda p: json.dumps([
+        {"name": f"Project {i}", "description": "A hands-on build.", "skills": SKILLS[i:i + 2], "estimated_hours": 12}
+        for i in range(3)
+    ])),
+    ("Extract structured information from this resume", lambda p: json.dumps({
+        "name": "Alex Candidate", "email": "alex@example.com", "phone": "555-010-2000",
+        "education": [{"degree": "BSc", "institution": "State University", "year": "2019", "field": "Computer Science"}],
+        "experience": [{"title": "Software Engineer", "company": "Acme", "duration": "2019 - Present", "description": "APIs"}],
+        "skills": SKILLS[:6], "certifications": [], "projects": [],
+    })),
+    ("Evaluate this interview answer", lambda p: json.dumps({
+        "score": 72, "feedback": "Clear structure and a relevant example. Missing trade-offs and failure modes."
+    })),
+    ("final interview feedback report", lambda p: json.dumps({
+        "summary": "Solid fundamentals with room to deepen system design.",
+        "strengths": ["Communication", "API design"], "improvements": ["Scalability trade-offs"],
+    })),
+    ("technical interviewer", lambda p: "How would you design a rate limiter for a public API, and where would you store its state?"),
+    ("Analyze the current job market", lambda p: json.dumps({
+        "role": "Backend Developer", "location": "Remote", "demand_level": "high",
+        "salary_range": {"min": 90000, "max": 150000, "currency": "USD"}, "top_skills": SKILLS[:5],
+        "growth_trajectory": "growing", "top_companies": ["Acme", "Globex", "Initech"], "remote_percentage": 45,
+        "entry_level_opportunities": "moderate", "key_trends": ["Platform engineering", "AI-assisted tooling"],
+    })),
+    ("realistic job postings", lambda p: json.dumps(_jobs(p))),
+    ("Recommend the best learning resources", lambda p: json.dumps([
+        {"title": f"Resource {i}", "type": "course", "platform": "YouTube", "url": f"https://learn.example.com/{i}",
+         "duration": "6 hours", "topics": SKILLS[i:i + 3], "prerequisites": [], "difficulty": "beginner"}
+        for i in range(5)
+    ])),
+]
+
+MENTOR_REPLY = (
+    "Great question. Based on your current skills, focus next on containerizing one of your projects with "
+    "Docker, then deploy it behind a managed PostgreSQL instance. Write down what broke along the way: that "
+    "story is excellent interview material. After that, pick one observability tool and add request metrics. "
+    "Spend about five hours a week and revisit your roadmap every Sunday to adjust the plan."
+)
+
+
+def chat_reply(messages: list) -> str:
+    prompt = "\n".join(
+        part if isinstance(part, str) else json.dumps(part)
+        for part in (message.get("content", "") for message in messages)
+    )
+    for pattern, build in CHAT_REPLIES:
+        if pattern in prompt:
+            return build(prompt)
+    return MENTOR_REPLY
+
+
+def _tokens(text: str) -> int:
+    return max(1, (len(text) + 3) // 4)
+
+
+# ---------------------------------------------------------------- endpoints
+
+def create_app(llm: ServiceProfile, embeddings: ServiceProfile, jsearch: ServiceProfile) -> Starlette:
+    async def chat_completions(request: Request):
+        body = await request.json()
+        delay = llm.latency()
+        failure = llm.failure()
+        if failure is not None:
+            await asyncio.sleep(delay * 0.2)
+            return failure
+
+        content = chat_reply(body.get("messages", []))
+        model = body.get("model", "fake")
+        usage = {
+            "prompt_tokens": sum(_tokens(str(m.get("content", ""))) for m in body.get("messages", [])),
+            "completion_tokens": _tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay)
+            return JSONResponse({
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        async def events():
+            pieces = [content[i:i + 24] for i in range(0, len(content), 24)] or [""]
+            # A quarter of the latency before the first token, the rest spread over the stream
+            await asyncio.sleep(delay * 0.25)
+            for i, piece in enumerate(pieces):
+                chunk = {
+                    "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece} if i == 0 else {"content": piece},
+                                 "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(delay * 0.75 / len(pieces))
+            final = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "x_groq": {"usage": usage},
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def batch_embed(request: Request):
+        body = await request.json()
+        await asyncio.sleep(embeddings.latency())
+        failure = embeddings.failure()
+        if failure is not None:
+            return failure
+        return JSONResponse({"embeddings": [
+            {"values": _vector(item["content"]["parts"][0].get("text", ""))} for item in body.get("requests", [])
+        ]})
+
+    async def search(request: Request):
+        await asyncio.sleep(jsearch.latency())
+        failure = jsearch.failure()
+        if failure is not None:
+            return failure
+        query = request.query_params.get("query", "Software Engineer")
+        return JSONResponse({"status": "OK", "data": [
+            {
+                "employer_name": f"Employer {i}",
+                "job_title": query.title(),
+                "job_city": "Remote",
+                "job_employment_type": "FULLTIME",
+                "job_required_skills": SKILLS[i % 5:i % 5 + 4],
+                "job_description": "Own services end to end, from design reviews to on-call. " * 4,
+                "job_apply_link": f"https://jobs.example.com/jsearch/{i}",
+                "job_posted_at_datetime_utc": "2025-01-15T00:00:00Z",
+            }
+            for i in range(10)
+        ]})
+
+    async def stats(request: Request):
+        return JSONResponse({
+            name: {"requests": profile.requests, "errors": profile.errors}
+            for name, profile in (("llm", llm), ("embeddings", embeddings), ("jsearch", jsearch))
+        })
+
+    return Starlette(routes=[
+        Route("/openai/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/v1beta/models/{model}:batchEmbedContents", batch_embed, methods=["POST"]),
+        Route("/search", search, methods=["GET"]),
+        Route("/stats", stats, methods=["GET"]),
+    ])
+
+
+def _vector(text: str) -> list:
+    """Deterministic unit vector per text, so repeated texts embed identically."""
+    rng = random.Random(hashlib.sha256(text.encode()).digest())
+    values = [rng.gauss(0.0, 1.0) for _ in range(EMBEDDING_DIMENSION)]
+    norm = math.sqrt(sum(v * v for v in values))
+    return [v / norm for v in values]
+
+
+def add_service_arguments(parser: argparse.ArgumentParser) -> None:
+    """Latency/error flags, shared with bench_load.py."""
+    for name, median, p95 in (("llm", 600, 1800), ("embed", 80, 200), ("jsearch", 400, 1200)):
+        parser.add_argument(f"--{name}-median-ms", type=float, default=median, help=f"Median {name} latency")
+        parser.add_argument(f"--{name}-p95-ms", type=float, default=p95, help=f"95th percentile {name} latency")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0, help=f"Fraction of {name} requests failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, default=1)
+    add_service_arguments(parser)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    app = create_app(
+        ServiceProfile(args.llm_median_ms, args.llm_p95_ms, args.llm_error_rate, rng),
+        ServiceProfile(args.embed_median_ms, args.embed_p95_ms, args.embed_error_rate, rng),
+        ServiceProfile(args.jsearch_median_ms, args.jsearch_p95_ms, args.jsearch_error_rate, rng),
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
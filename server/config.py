@@ -1,6 +1,6 @@
 """Configuration management for the Career Mentor API."""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -18,39 +18,165 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./career_mentor.db"
-    
+    DB_ECHO: bool = False  # SQL statement logging (independent of DEBUG)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite tuning (ignored for other backends)
+    SQLITE_WAL: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
     # Google Gemini (Legacy / Embeddings)
-    GOOGLE_API_KEY: str
+    GOOGLE_API_KEY: str = ""  # Embeddings; without it memory search falls back to recency
     GEMINI_MODEL: str = "gemini-pro"
     GEMINI_EMBEDDING_MODEL: str = "models/text-embedding-004"
+    GEMINI_BASE_URL: str = ""  # Empty = Google's endpoint; set for proxies or local stand-ins
     
     # Groq (Main LLM)
     GROQ_API_KEY: str = ""
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    GROQ_BASE_URL: str = ""  # Empty = api.groq.com
+    
+    # LLM gateway (shared clients + provider-level limits)
+    # Limits are for the whole deployment; each of WEB_CONCURRENCY workers enforces its share
+    LLM_MAX_CONCURRENCY: int = 8  # Concurrent provider requests
+    LLM_REQUESTS_PER_MINUTE: float = 60  # Token-bucket refill rate; 0 disables
+    LLM_RATE_LIMIT_BURST: int = 10  # Requests allowed back-to-back
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_REQUEST_TIMEOUT: float = 60.0
+    LLM_MAX_RETRIES: int = 2
     
+    # Per-task model routing: "small", "large" or an explicit model name.
+    # Tasks routed to the small model escalate to GROQ_MODEL when output fails validation.
+    LLM_SMALL_MODEL: str = "llama-3.1-8b-instant"
+    LLM_TASK_MODELS: Dict[str, str] = {
+        "role_inference": "small",
+        "intent": "small",
+        "answer_scoring": "small",
+        "skill_gaps": "small"
+    }
+    # Structured (JSON) outputs
+    LLM_JSON_MODE: bool = True  # Provider JSON mode for object-shaped outputs
+    LLM_STRUCTURED_MAX_REPAIRS: int = 1  # Re-asks after unparseable output
+
+    # USD per million tokens as [input, output], for cost accounting
+    LLM_MODEL_PRICES: Dict[str, List[float]] = {
+        "llama-3.3-70b-versatile": [0.59, 0.79],
+        "llama-3.1-8b-instant": [0.05, 0.08]
+    }
+    
+    # Deterministic LLM response cache (temperature 0 calls only)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 2048
+    LLM_CACHE_DURABLE: bool = False  # Also persist entries in the database
+
+    # Semantic cache for paraphrased /agent/message questions (opt-in)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.92  # Minimum cosine similarity for a hit
+    SEMANTIC_CACHE_SHARED: bool = False  # Share entries between users with the same context
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 5000
+    SEMANTIC_CACHE_AUDIT_RATE: float = 0.05  # Fraction of hits re-run to measure false hits
+    SEMANTIC_CACHE_SAMPLE_SIZE: int = 200  # Audited hits kept for inspection
+    # Return audited hits (other users' messages and answers) from GET /agent/cache/semantic
+    SEMANTIC_CACHE_EXPOSE_SAMPLES: bool = False
+    # Seconds per intent; 0 or missing = never cached
+    SEMANTIC_CACHE_INTENT_TTLS: Dict[str, int] = {
+        "general_advice": 86400,
+        "roadmap_request": 21600,
+        "skill_assessment": 21600,
+        "job_search": 3600,
+        "application_help": 3600,
+        "milestone_update": 0,
+        "other": 0
+    }
+
     # JSearch API (RapidAPI)
     JSEARCH_API_KEY: str = ""
     JSEARCH_API_HOST: str = "jsearch.p.rapidapi.com"
+    JSEARCH_BASE_URL: str = "https://jsearch.p.rapidapi.com"
     
     # LangSmith (Optional)
     LANGCHAIN_TRACING_V2: bool = False
     LANGCHAIN_API_KEY: str = ""
     LANGCHAIN_PROJECT: str = "career-mentor"
     
+    # OpenTelemetry tracing (spans for graph nodes, LLM, embedding, DB and JSearch calls)
+    TELEMETRY_ENABLED: bool = False  # Off = no tracer, no DB listeners
+    OTEL_SERVICE_NAME: str = "career-mentor-api"
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = "http://localhost:4318"  # OTLP/HTTP collector
+    TELEMETRY_SAMPLE_RATIO: float = 1.0  # Fraction of traces kept
+    
+    # Prometheus /metrics
+    METRICS_ENABLED: bool = True
+    # Shared directory for multi-worker aggregation; empty = this process only.
+    # Clear it before starting the server.
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_SNAPSHOT_INTERVAL_SECONDS: float = 5.0  # How often each worker publishes its values
+    
+    # Per-request sampling profiler (collapsed stacks for flamegraphs)
+    PROFILING_ENABLED: bool = False  # Off = middleware not installed
+    PROFILING_HEADER_TOKEN: str = ""  # Requests with "X-Profile: <token>" are profiled; empty = header ignored
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of all requests profiled
+    PROFILING_INTERVAL_MS: float = 5.0  # Stack sampling interval
+    PROFILING_BLOCKED_THRESHOLD_MS: float = 50.0  # Sync stretches this long are reported as loop-blocking
+    PROFILING_OUTPUT_DIR: str = "profiles"
+    
+    # Event-loop lag monitor (blocking calls inside async code)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 100.0  # Probe wakeup interval
+    LOOP_BLOCK_THRESHOLD_MS: float = 100.0  # Lag that counts as a block; its stack is logged
+    LOOP_LAG_WINDOW_SECONDS: float = 60.0  # Window for the lag quantile gauges
+    
     # Memory & Vector Store
     VECTOR_DIMENSION: int = 768  # Gemini text-embedding-004 is 768
     MEMORY_SIMILARITY_THRESHOLD: float = 0.7
     
+    # Resume parsing
+    RESUME_SKILL_PREPASS: bool = True  # Detect skills locally and drop skill-list lines from the LLM prompt
+    RESUME_LLM_TOKEN_BUDGET: int = 2000  # Approximate resume tokens per extraction prompt
+    RESUME_PARALLEL_SECTIONS: bool = False  # One smaller LLM call per section group, run concurrently
+    RESUME_MAX_UPLOAD_BYTES: int = 10485760  # 10 MB; larger uploads get 413
+    
+    # Background tasks (profile enrichment after resume parsing)
+    BACKGROUND_TASK_CONCURRENCY: int = 4  # Jobs running at once per process
+    BACKGROUND_TASK_TIMEOUT_SECONDS: int = 300  # Pending (since submission) or running (since start) longer than this = failed
+    BACKGROUND_TASK_RETENTION_HOURS: int = 24  # Finished tasks pruned at startup
+    
     # Agent
     MAX_ITERATIONS: int = 15
+    # "staged": role -> skill gaps -> plan as separate calls;
+    # "combined": one call returns role (if unset), gaps and milestones
+    ROADMAP_GENERATION_MODE: str = "staged"
+    # Reuse generated milestones for identical (role, skill gaps, timeline)
+    ROADMAP_TEMPLATES_ENABLED: bool = True
+    ROADMAP_TEMPLATE_TTL_DAYS: int = 30
+    ROADMAP_TEMPLATE_MAX_ENTRIES: int = 512  # In-process LRU size
     CHECKPOINT_ENABLED: bool = True
     
+    # Multi-worker deployment
+    WEB_CONCURRENCY: int = 1  # Worker processes; uvicorn --workers and gunicorn.conf.py read it too
+    # Where cross-request state lives (interview sessions): "database" is shared by
+    # all workers and survives restarts; "memory" is a per-process stand-in for one worker
+    SHARED_STATE_BACKEND: str = "database"
+    INTERVIEW_SESSION_TTL_HOURS: int = 24  # Sessions (and their reports) expire after this
+    
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
     # Logging
     LOG_LEVEL: str = "INFO"
     
+    # Startup: agent modules (LangGraph, LangChain, Gemini) are imported on first use.
+    # True = import them in a background thread right after startup so the first
+    # request does not pay for it; the server accepts connections either way.
+    PRELOAD_AGENT_MODULES: bool = True
+    
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins into a list."""
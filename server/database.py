@@ -1,9 +1,15 @@
 """Database models for persistent storage."""
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, JSON, Text, Boolean, ForeignKey
+from typing import Dict, Any, Optional
+from sqlalchemy import create_engine, event, Index, Column, String, Integer, Float, DateTime, JSON, Text, Boolean, ForeignKey
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, deferred
 from datetime import datetime
+import time
 from config import settings
+from metrics import registry
+from telemetry import instrument_engine
 
 Base = declarative_base()
 
@@ -41,6 +47,10 @@ class UserProfile(Base):
 class Memory(Base):
     """Episodic & semantic memory entries."""
     __tablename__ = "memories"
+    __table_args__ = (
+        Index("ix_memories_user_created", "user_id", "created_at"),
+        Index("ix_memories_user_importance", "user_id", "importance"),
+    )
     
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey("user_profiles.user_id"), nullable=False)
@@ -48,7 +58,8 @@ class Memory(Base):
     
     memory_type = Column(String)  # episodic, semantic, feedback
     content = Column(Text, nullable=False)
-    embedding = Column(JSON, nullable=True)  # Vector embedding for semantic search
+    # Deferred: only semantic search reads the vector, everything else skips it
+    embedding = deferred(Column(JSON, nullable=True))  # Vector embedding for semantic search
     
     # Metadata
     importance = Column(Float, default=0.5)  # 0-1 score
@@ -61,6 +72,10 @@ class Memory(Base):
 class Milestone(Base):
     """Roadmap milestones."""
     __tablename__ = "milestones"
+    __table_args__ = (
+        Index("ix_milestones_user_status_completed", "user_id", "status", "completed_at"),
+        Index("ix_milestones_roadmap", "roadmap_id"),
+    )
     
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey("user_profiles.user_id"), nullable=False)
@@ -78,7 +93,7 @@ class Milestone(Base):
     deadline = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     
-    resources = Column(JSON, default=list)
+    resources = deferred(Column(JSON, default=list))  # Loaded only for roadmap detail views
     reflection = Column(Text, nullable=True)
     
     user = relationship("UserProfile", back_populates="milestones")
@@ -88,6 +103,9 @@ class Milestone(Base):
 class Application(Base):
     """Job application tracking."""
     __tablename__ = "applications"
+    __table_args__ = (
+        Index("ix_applications_user_applied", "user_id", "applied_date"),
+    )
     
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey("user_profiles.user_id"), nullable=False)
@@ -112,6 +130,9 @@ class Application(Base):
 class Roadmap(Base):
     """Generated skill roadmaps."""
     __tablename__ = "roadmaps"
+    __table_args__ = (
+        Index("ix_roadmaps_user_active_generated", "user_id", "is_active", "generated_at"),
+    )
     
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey("user_profiles.user_id"), nullable=False)
@@ -125,20 +146,255 @@ class Roadmap(Base):
     estimated_completion_weeks = Column(Integer)
     is_active = Column(Boolean, default=True)
     
-    full_plan = Column(JSON)  # Complete roadmap data
+    full_plan = deferred(Column(JSON))  # Complete roadmap data, loaded on access
     
     user = relationship("UserProfile", back_populates="roadmaps")
     milestones = relationship("Milestone", back_populates="roadmap", cascade="all, delete-orphan")
 
 
+class UserStats(Base):
+    """Incrementally maintained dashboard counters (one row per user)."""
+    __tablename__ = "user_stats"
+    
+    # No foreign key: progress endpoints also serve users without a profile row
+    user_id = Column(String, primary_key=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Memory summary
+    total_memories = Column(Integer, default=0)
+    memory_type_counts = Column(JSON, default=dict)  # {memory_type: count}
+    high_importance_memories = Column(Integer, default=0)
+    feedback_by_day = Column(JSON, default=dict)  # {YYYY-MM-DD: count}, last ~30 days
+    oldest_memory_at = Column(DateTime, nullable=True)
+    newest_memory_at = Column(DateTime, nullable=True)
+    
+    # Progress
+    completed_milestones = Column(Integer, default=0)
+    total_applications = Column(Integer, default=0)
+
+
+class UserWeeklyStats(Base):
+    """Per-user weekly progress bucket keyed by the Monday of the week."""
+    __tablename__ = "user_weekly_stats"
+    
+    user_id = Column(String, primary_key=True)
+    week_start = Column(DateTime, primary_key=True)
+    
+    milestones_completed = Column(Integer, default=0)
+    applications_submitted = Column(Integer, default=0)
+    interviews_attended = Column(Integer, default=0)
+    hours_invested = Column(Integer, default=0)
+    new_skills = Column(JSON, default=list)
+    achievements = Column(JSON, default=list)
+
+
+class LLMCacheEntry(Base):
+    """Durable tier of the deterministic LLM response cache."""
+    __tablename__ = "llm_cache_entries"
+    
+    key = Column(String, primary_key=True)  # sha256 of (model, temperature, prompt)
+    model = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    total_tokens = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class RoadmapTemplate(Base):
+    """Reusable roadmap milestones keyed by canonicalized generation inputs."""
+    __tablename__ = "roadmap_templates"
+    
+    key = Column(String, primary_key=True)  # sha256 of (role, sorted gaps, timeline)
+    role = Column(String, nullable=False)
+    skill_gaps = Column(JSON, nullable=False)  # Normalized gap set
+    timeline_weeks = Column(Integer, nullable=False)
+    milestones = Column(JSON, nullable=False)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class BackgroundTask(Base):
+    """Status of work deferred past the HTTP response (see task_queue.py)."""
+    __tablename__ = "background_tasks"
+    
+    id = Column(String, primary_key=True)  # uuid4
+    kind = Column(String, nullable=False)  # e.g. "resume_enrichment"
+    user_id = Column(String, index=True, nullable=False)
+    status = Column(String, default="pending")  # pending, running, succeeded, failed
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class SharedStateEntry(Base):
+    """Key-value state every worker must see, e.g. mock interview sessions (see shared_state.py)."""
+    __tablename__ = "shared_state"
+    
+    key = Column(String, primary_key=True)  # "<namespace>:<id>", e.g. "interview:<session_id>"
+    value = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=True, index=True)  # NULL = never expires
+
+
 # Database setup
-engine = create_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+# Connection lifecycle counters, exposed through get_pool_status()
+_pool_events = {"connects": 0, "checkouts": 0, "checkins": 0, "invalidations": 0}
+
+
+def _is_sqlite_memory(url) -> bool:
+    """Check whether a SQLite URL points to an in-memory database."""
+    return url.database in (None, "", ":memory:") or "mode=memory" in str(url)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection for concurrent readers and writers."""
+    cursor = dbapi_connection.cursor()
+    try:
+        if settings.SQLITE_WAL:
+            # WAL lets readers proceed while a writer holds the lock
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    finally:
+        cursor.close()
+
+
+def _register_pool_listeners(target: Engine) -> None:
+    """Count pool activity so utilization can be reported."""
+    @event.listens_for(target, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _pool_events["connects"] += 1
+
+    @event.listens_for(target, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _pool_events["checkouts"] += 1
+
+    @event.listens_for(target, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        _pool_events["checkins"] += 1
+
+    @event.listens_for(target, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        _pool_events["invalidations"] += 1
+
+
+def create_db_engine(database_url: Optional[str] = None) -> Engine:
+    """
+    Create the SQLAlchemy engine with pooling tuned from settings.
+    
+    Args:
+        database_url: Optional override of settings.DATABASE_URL
+    
+    Returns:
+        Configured Engine
+    """
+    url = make_url(database_url or settings.DATABASE_URL)
+    engine_kwargs: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    
+    is_sqlite = url.get_backend_name() == "sqlite"
+    
+    # In-memory SQLite uses a singleton connection pool that takes no sizing
+    if not (is_sqlite and _is_sqlite_memory(url)):
+        engine_kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    
+    if is_sqlite:
+        # Sessions are opened in the threadpool and used on the event loop
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+    
+    new_engine = create_engine(url, **engine_kwargs)
+    
+    if is_sqlite:
+        event.listen(new_engine, "connect", _apply_sqlite_pragmas)
+    _register_pool_listeners(new_engine)
+    instrument_engine(new_engine)
+    
+    return new_engine
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """
+    Report connection pool utilization.
+    
+    Returns:
+        Dictionary with pool size, checked-out connections, overflow
+        and lifetime connection counters
+    """
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    
+    # Only QueuePool exposes sizing information
+    if hasattr(pool, "checkedout"):
+        size = pool.size()
+        checked_out = pool.checkedout()
+        capacity = size + max(settings.DB_MAX_OVERFLOW, 0)
+        status.update({
+            "size": size,
+            "checked_in": pool.checkedin(),
+            "checked_out": checked_out,
+            "overflow": pool.overflow(),
+            "capacity": capacity,
+            "utilization": round(checked_out / capacity, 3) if capacity else 0.0,
+        })
+    
+    status.update(_pool_events)
+    return status
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-def init_db():
-    """Initialize database tables."""
-    Base.metadata.create_all(bind=engine)
+def _pool_connections() -> Dict[tuple, float]:
+    status = get_pool_status()
+    if "checked_out" not in status:
+        return {}
+    return {
+        ("checked_out",): status["checked_out"],
+        ("checked_in",): status["checked_in"],
+        # QueuePool reports negative overflow until the pool has filled once
+        ("overflow",): max(status["overflow"], 0),
+    }
+
+
+def _pool_capacity() -> float:
+    return get_pool_status().get("capacity", 0)
+
+
+registry.gauge(
+    "db_pool_connections", "Connection pool connections by state", ["state"], callback=_pool_connections
+)
+registry.gauge(
+    "db_pool_capacity", "Pool size plus allowed overflow", callback=_pool_capacity
+)
+
+
+def init_db(attempts: int = 3):
+    """
+    Initialize database tables.
+    
+    Several workers starting together race to create the same tables; the
+    loser's CREATE fails, and a retry finds the tables in place.
+    """
+    for attempt in range(attempts):
+        try:
+            Base.metadata.create_all(bind=engine)
+            return
+        except DBAPIError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.1 * (attempt + 1))
 
 
 def get_db():
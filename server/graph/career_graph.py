@@ -1,6 +1,8 @@
 """Main LangGraph career mentor agent."""
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Awaitable, Callable, Optional
 from datetime import datetime
+import functools
+import time
 
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
@@ -10,6 +12,34 @@ from sqlalchemy.orm import Session
 from graph.state import AgentState
 from graph.nodes import create_nodes
 from config import settings
+from metrics import registry
+from semantic_cache import semantic_cache
+import telemetry
+
+NODE_LATENCY = registry.histogram(
+    "agent_node_duration_seconds", "LangGraph node latency", ["node"]
+)
+
+# State keys worth recording on a node's span
+_SPAN_STATE_KEYS = ("intent", "requires_action", "action_type", "cache_hit")
+
+
+def _instrumented(name: str, node: Callable[[AgentState], Awaitable[AgentState]]):
+    """Wrap a node to record its latency and, when tracing, an agent.<name> span."""
+    @functools.wraps(node)
+    async def run(state: AgentState) -> AgentState:
+        started_at = time.perf_counter()
+        with telemetry.span(f"agent.{name}") as node_span:
+            try:
+                result = await node(state)
+            finally:
+                NODE_LATENCY.observe(time.perf_counter() - started_at, node=name)
+            if node_span.is_recording() and isinstance(result, dict):
+                for key in _SPAN_STATE_KEYS:
+                    if result.get(key) is not None:
+                        node_span.set_attribute(f"agent.{key}", result[key])
+            return result
+    return run
 
 
 class CareerMentorGraph:
@@ -27,16 +57,26 @@ class CareerMentorGraph:
         workflow = StateGraph(AgentState)
         
         # Add nodes
-        workflow.add_node("load_context", self.nodes.load_context)
-        workflow.add_node("understand_intent", self.nodes.understand_intent)
-        workflow.add_node("execute_action", self.nodes.execute_action)
-        workflow.add_node("generate_response", self.nodes.generate_response)
-        workflow.add_node("save_memory", self.nodes.save_memory)
+        for name in ("load_context", "understand_intent", "execute_action", "generate_response", "save_memory"):
+            workflow.add_node(name, _instrumented(name, getattr(self.nodes, name)))
         
         # Define edges
         workflow.set_entry_point("load_context")
         
-        workflow.add_edge("load_context", "understand_intent")
+        if semantic_cache.enabled:
+            # Paraphrases of a cached question skip straight to saving memory
+            workflow.add_node("check_cache", _instrumented("check_cache", self.nodes.check_cache))
+            workflow.add_edge("load_context", "check_cache")
+            workflow.add_conditional_edges(
+                "check_cache",
+                self._should_use_cache,
+                {
+                    "hit": "save_memory",
+                    "miss": "understand_intent"
+                }
+            )
+        else:
+            workflow.add_edge("load_context", "understand_intent")
         
         # Conditional: if action required, execute it
         workflow.add_conditional_edges(
@@ -52,7 +92,10 @@ class CareerMentorGraph:
         workflow.add_edge("generate_response", "save_memory")
         workflow.add_edge("save_memory", END)
         
-        # Compile with checkpointing
+        # Compile with checkpointing. The saver belongs to this graph, which is
+        # built per request, so checkpoints never outlive the request and
+        # workers share nothing through it; cross-request context comes from
+        # the database (memories, profile, roadmap).
         if settings.CHECKPOINT_ENABLED:
             checkpointer = MemorySaver()
             return workflow.compile(checkpointer=checkpointer)
@@ -65,6 +108,10 @@ class CareerMentorGraph:
             return "execute"
         return "skip"
     
+    def _should_use_cache(self, state: AgentState) -> str:
+        """Decide if a cached response was served."""
+        return "hit" if state.get("cache_hit") else "miss"
+    
     async def run(
         self,
         user_id: str,
@@ -101,6 +148,8 @@ class CareerMentorGraph:
             "response": None,
             "suggestions": [],
             "action_items": [],
+            "cache_lookup": None,
+            "cache_hit": False,
             "iteration": 0,
             "timestamp": datetime.utcnow()
         }
@@ -108,7 +157,11 @@ class CareerMentorGraph:
         # Run graph
         config = {"configurable": {"thread_id": user_id}} if settings.CHECKPOINT_ENABLED else {}
         
-        final_state = await self.graph.ainvoke(initial_state, config)
+        # Parent span so the node, LLM and DB spans of one message share a trace
+        with telemetry.span("agent.run") as run_span:
+            final_state = await self.graph.ainvoke(initial_state, config)
+            if run_span.is_recording():
+                run_span.set_attribute("agent.iterations", final_state.get("iteration") or 0)
         
         # Extract response
         return {
@@ -118,6 +171,7 @@ class CareerMentorGraph:
             "metadata": {
                 "intent": final_state.get("intent"),
                 "action_taken": final_state.get("requires_action"),
+                "cache_hit": final_state.get("cache_hit", False),
                 "iteration": final_state.get("iteration")
             }
         }
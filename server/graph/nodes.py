@@ -3,12 +3,15 @@ from typing import Dict, Any
 from datetime import datetime
 import json
 
-from langchain_groq import ChatGroq
+from llm_gateway import llm_gateway
 from sqlalchemy.orm import Session
 
 from graph.state import AgentState
 from graph.tools import CareerMentorTools
 from memory import memory_manager
+from schemas import IntentClassification
+from semantic_cache import semantic_cache
+from structured_output import ainvoke_structured
 from config import settings
 
 
@@ -18,11 +21,8 @@ class AgentNodes:
     def __init__(self, db: Session):
         self.db = db
         self.tools = CareerMentorTools(db)
-        self.llm = ChatGroq(
-            model_name=settings.GROQ_MODEL,
-            api_key=settings.GROQ_API_KEY,
-            temperature=0.7
-        )
+        self.llm = llm_gateway.chat(temperature=0.7, call_site="agent")
+        self.intent_llm = llm_gateway.for_task("intent")
     
     async def load_context(self, state: AgentState) -> AgentState:
         """
@@ -70,6 +70,40 @@ class AgentNodes:
         
         return state
     
+    async def check_cache(self, state: AgentState) -> AgentState:
+        """
+        Serve a cached response when a near-duplicate question was answered
+        for the same profile context.
+        """
+        last_msg = state["messages"][-1]
+        if isinstance(last_msg, dict):
+            last_message = last_msg.get('content', str(last_msg))
+        elif hasattr(last_msg, 'content'):
+            last_message = last_msg.content
+        else:
+            last_message = str(last_msg)
+        
+        lookup = await semantic_cache.lookup(
+            last_message,
+            state.get("target_role"),
+            state.get("current_skills", []),
+            user_id=state["user_id"]
+        )
+        state["cache_lookup"] = lookup
+        state["cache_hit"] = lookup["hit"]
+        
+        if lookup["hit"]:
+            cached = lookup["cached"]
+            state["intent"] = cached["intent"]
+            state["requires_action"] = False
+            state["action_type"] = None
+            state["action_params"] = {}
+            state["response"] = cached["response"]
+            state["suggestions"] = cached["suggestions"]
+            state["action_items"] = cached["action_items"]
+        
+        return state
+    
     async def understand_intent(self, state: AgentState) -> AgentState:
         """
         Analyze user message to determine intent and required actions.
@@ -112,13 +146,11 @@ Respond in JSON:
 {{"intent": "...", "requires_action": true/false, "action_type": "...", "reasoning": "..."}}
 """
         
-        response = await self.llm.ainvoke(intent_prompt)
-        
         try:
-            intent_data = json.loads(response.content)
-            state["intent"] = intent_data["intent"]
-            state["requires_action"] = intent_data["requires_action"]
-            state["action_type"] = intent_data.get("action_type")
+            intent_data = await ainvoke_structured(self.intent_llm, intent_prompt, IntentClassification)
+            state["intent"] = intent_data.intent
+            state["requires_action"] = intent_data.requires_action
+            state["action_type"] = intent_data.action_type
         except:
             # Fallback
             state["intent"] = "general_advice"
@@ -237,6 +269,15 @@ Generate your response:"""
         state["suggestions"] = self._extract_suggestions(state)
         state["action_items"] = self._extract_action_items(state)
         
+        if state.get("cache_lookup"):
+            semantic_cache.store(
+                state["cache_lookup"],
+                state.get("intent"),
+                state["response"],
+                state["suggestions"],
+                state["action_items"]
+            )
+        
         return state
     
     async def save_memory(self, state: AgentState) -> AgentState:
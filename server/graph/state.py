@@ -41,6 +41,10 @@ class AgentState(TypedDict):
     suggestions: List[str]
     action_items: List[str]
     
+    # Semantic cache
+    cache_lookup: Optional[Dict[str, Any]]  # Record from semantic_cache.lookup
+    cache_hit: bool
+    
     # Metadata
     iteration: int
     timestamp: datetime
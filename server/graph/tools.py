@@ -1,27 +1,47 @@
 """Agent tools for interacting with memory, data, and external systems."""
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from datetime import datetime, timedelta
-import json
 from sqlalchemy.orm import Session
 
 from langchain.tools import tool
-from langchain_groq import ChatGroq
+from llm_gateway import llm_gateway
 
 from database import UserProfile, Milestone, Application, Roadmap
 from memory import memory_manager
+from roadmap_templates import roadmap_templates
+from skills_taxonomy import skill_taxonomy
+from schemas import SkillNameList, MilestonePlan, ProjectIdea, RoadmapBundle
+from structured_output import ainvoke_structured, astream_structured
 from config import settings
 
 
+def _is_role_title(response) -> bool:
+    """A role answer should be a short, single-line title."""
+    role = response.content.strip().strip('"\'')
+    return bool(role) and "\n" not in role and len(role) <= 60 and len(role.split()) <= 6
+
+
+def _drop_known_skills(skill_gaps: List[str], skill_names: List[str]) -> List[str]:
+    """Canonicalize gaps and filter out the ones the user already has."""
+    skill_gaps = skill_taxonomy.canonicalize(skill_gaps)
+    current_skill_keys = skill_taxonomy.keys(skill_names)
+    final_gaps = [
+        skill for skill in skill_gaps
+        if skill_taxonomy.key(skill) not in current_skill_keys
+    ]
+    # If LLM returns all skills user has (unlikely), return original list or top 3
+    return final_gaps if final_gaps else skill_gaps[:3]
+
+
 class CareerMentorTools:
     """Tools available to the career mentor agent."""
     
     def __init__(self, db: Session):
         self.db = db
-        self.llm = ChatGroq(
-            model_name=settings.GROQ_MODEL,
-            api_key=settings.GROQ_API_KEY,
-            temperature=0.7
-        )
+        self.llm = llm_gateway.chat(temperature=0.7, call_site="tools")
+        # Classification/extraction tasks routed via settings.LLM_TASK_MODELS
+        self.role_llm = llm_gateway.for_task("role_inference")
+        self.skill_gaps_llm = llm_gateway.for_task("skill_gaps")
 
     async def infer_best_fit_role(self, user_id: str) -> str:
         """
@@ -46,7 +66,7 @@ class CareerMentorTools:
             Determine the single best fitting specific job role title (e.g., "Frontend Developer", "Data Scientist", "DevOps Engineer").
             Return ONLY the role title string. No explanation."""
             
-            response = await self.llm.ainvoke(prompt)
+            response = await self.role_llm.ainvoke(prompt, validate=_is_role_title)
             role = response.content.strip().replace('"', '').replace("'", "")
             return role
             
@@ -145,35 +165,17 @@ class CareerMentorTools:
             
             Return ONLY a valid JSON array of strings, e.g., ["Skill 1", "Skill 2"]. Do not include any other text or markdown formatting."""
             
-            response = await self.llm.ainvoke(prompt)
-            content = response.content.strip()
-            
-            # Clean up potential markdown formatting
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.startswith('```'):
-                content = content[3:]
-            if content.endswith('```'):
-                content = content[:-3]
-            
-            skill_gaps = json.loads(content.strip())
+            skill_gaps = await ainvoke_structured(self.skill_gaps_llm, prompt, SkillNameList)
             
             if isinstance(skill_gaps, list) and len(skill_gaps) > 0:
-                # Filter out skills user already has (simple string matching)
-                current_skills_lower = {s.lower() for s in skill_names}
-                final_gaps = [
-                    skill for skill in skill_gaps 
-                    if skill.lower() not in current_skills_lower
-                ]
-                # If LLM returns all skills user has (unlikely), return original list or top 3
-                return final_gaps if final_gaps else skill_gaps[:3]
+                return _drop_known_skills(skill_gaps, skill_names)
 
         except Exception as e:
             print(f"LLM skill gap analysis failed: {e}")
             # Fall through to static dictionary
             
         # 2. Fallback to static dictionary
-        current_skills_set = {s.lower() for s in skill_names}
+        current_skill_keys = skill_taxonomy.keys(skill_names)
         
         # Role-specific skill requirements (2025 market)
         role_requirements = {
@@ -219,7 +221,10 @@ class CareerMentorTools:
                     required = role_requirements[key]
                     break
         
-        gaps = [skill for skill in required if skill not in current_skills_set]
+        gaps = [
+            skill_taxonomy.display_name(skill) for skill in required
+            if skill_taxonomy.key(skill) not in current_skill_keys
+        ]
         
         return gaps
     
@@ -227,7 +232,8 @@ class CareerMentorTools:
         self,
         role: str,
         skill_gaps: List[str],
-        timeline_weeks: int
+        timeline_weeks: int,
+        known_skills: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Generate detailed, actionable milestones for a roadmap.
@@ -236,11 +242,145 @@ class CareerMentorTools:
            role: Target role
            skill_gaps: List of skills to learn
            timeline_weeks: Total timeline
+           known_skills: User's current skills, for personalizing a stored template
            
         Returns:
            List of milestone dictionaries with title, description, and details
         """
-        prompt = f"""Create a {timeline_weeks}-week learning roadmap for a {role}.
+        template = await roadmap_templates.get(role, skill_gaps, timeline_weeks, known_skills)
+        if template is not None:
+            return template
+        
+        prompt = self._roadmap_plan_prompt(role, skill_gaps, timeline_weeks)
+        
+        try:
+            plan = await ainvoke_structured(self.llm, prompt, List[MilestonePlan], call_site="roadmap_plan")
+            milestones = [milestone.model_dump() for milestone in plan]
+            await roadmap_templates.put(role, skill_gaps, timeline_weeks, milestones)
+            return milestones
+        except Exception as e:
+            print(f"Error generating roadmap plan: {e}")
+            # Fallback to simple generation if LLM fails
+            return self._fallback_plan(skill_gaps)
+    
+    async def stream_roadmap_plan(
+        self,
+        role: str,
+        skill_gaps: List[str],
+        timeline_weeks: int,
+        known_skills: Optional[List[str]] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Generate roadmap milestones, yielding each one as it is produced.
+        
+        Yields:
+            ("milestone", dict) previews while the plan streams,
+            ("reset", None) if the plan failed after previews were sent, then
+            ("plan", list of milestone dicts) as the final result
+        """
+        template = await roadmap_templates.get(role, skill_gaps, timeline_weeks, known_skills)
+        if template is not None:
+            for milestone in template:
+                yield "milestone", milestone
+            yield "plan", template
+            return
+        
+        prompt = self._roadmap_plan_prompt(role, skill_gaps, timeline_weeks)
+        previews = 0
+        
+        try:
+            async for kind, payload in astream_structured(
+                self.llm, prompt, List[MilestonePlan], call_site="roadmap_plan"
+            ):
+                if kind == "item":
+                    previews += 1
+                    yield "milestone", payload
+                else:
+                    milestones = [milestone.model_dump() for milestone in payload]
+                    await roadmap_templates.put(role, skill_gaps, timeline_weeks, milestones)
+                    yield "plan", milestones
+        except Exception as e:
+            print(f"Error generating roadmap plan: {e}")
+            if previews:
+                # The fallback plan replaces the milestones previewed so far
+                yield "reset", None
+            yield "plan", self._fallback_plan(skill_gaps)
+    
+    async def stream_roadmap_bundle(
+        self,
+        user_id: str,
+        role: Optional[str],
+        timeline_weeks: int
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Infer the role (if not given), skill gaps and milestones in one LLM call.
+        
+        Args:
+            user_id: User identifier
+            role: Target role, or None to let the model pick one
+            timeline_weeks: Total timeline
+        
+        Yields:
+            ("milestone", dict) previews while the response streams, then
+            ("bundle", {"role", "skill_gaps", "milestones"}) as the final result
+        
+        Raises:
+            StructuredOutputError: The combined response could not be parsed
+        """
+        profile = await self.read_user_profile(user_id)
+        skill_names = [s['name'] if isinstance(s, dict) else s for s in profile.get('skills', [])]
+        
+        if role:
+            role_instruction = f"The target role is '{role}'. Use exactly this value for \"role\"."
+        else:
+            role_instruction = (
+                "No target role is set. Determine the single best fitting specific job role title "
+                "(e.g., \"Frontend Developer\", \"Data Scientist\") for these skills."
+            )
+        
+        prompt = f"""Plan a {timeline_weeks}-week learning roadmap for this user.
+        
+        {role_instruction}
+        
+        User's Current Skills: {', '.join(skill_names) if skill_names else 'None listed'}
+        
+        Current Job Market Context: Late 2024/2025.
+        
+        1. skill_gaps: the top 5-7 most critical missing skills or technologies this user needs to learn to be a competitive candidate for the role. Focus on technical skills, tools, and frameworks.
+        2. milestones: 5 distinct milestones covering those skills, progressing from foundational to advanced. For each:
+        - title: A specific, action-oriented title (NOT just "Master X"). E.g., "Build a REST API with FastAPI".
+        - description: A detailed 1-sentence description of what they will achieve.
+        - skills: specific sub-skills or topics covered in this milestone.
+        - estimated_hours: realistic hours to complete.
+        
+        Return ONLY a valid JSON object. Example:
+        {{
+            "role": "...",
+            "skill_gaps": ["Skill 1", "Skill 2"],
+            "milestones": [
+                {{"title": "...", "description": "...", "skills": ["..."], "estimated_hours": 20}}
+            ]
+        }}"""
+        
+        async for kind, payload in astream_structured(self.llm, prompt, RoadmapBundle, call_site="roadmap_bundle"):
+            if kind == "item":
+                yield "milestone", payload
+                continue
+            
+            bundle = {
+                "role": role or payload.role.strip(),
+                "skill_gaps": _drop_known_skills(payload.skill_gaps, skill_names),
+                "milestones": [milestone.model_dump() for milestone in payload.milestones]
+            }
+            # Staged requests with the same inputs can reuse this plan
+            await roadmap_templates.put(
+                bundle["role"], bundle["skill_gaps"], timeline_weeks, bundle["milestones"]
+            )
+            yield "bundle", bundle
+    
+    @staticmethod
+    def _roadmap_plan_prompt(role: str, skill_gaps: List[str], timeline_weeks: int) -> str:
+        return f"""Create a {timeline_weeks}-week learning roadmap for a {role}.
         The user specifically needs to learn these skills: {', '.join(skill_gaps)}.
         
         Create 5 distinct milestones that logically progress from foundational to advanced.
@@ -260,32 +400,19 @@ class CareerMentorTools:
                 "estimated_hours": 20
             }}
         ]"""
-        
-        try:
-            response = await self.llm.ainvoke(prompt)
-            content = response.content.strip()
-             # Clean up potential markdown formatting
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.startswith('```'):
-                content = content[3:]
-            if content.endswith('```'):
-                content = content[:-3]
-                
-            plan = json.loads(content.strip())
-            return plan
-        except Exception as e:
-            print(f"Error generating roadmap plan: {e}")
-            # Fallback to simple generation if LLM fails
-            return [
-                {
-                    "title": f"Learn {skill}",
-                    "description": f"Focus on mastering {skill} concepts and building a small project.",
-                    "skills": [skill],
-                    "estimated_hours": 20
-                }
-                for skill in skill_gaps[:5]
-            ]
+    
+    @staticmethod
+    def _fallback_plan(skill_gaps: List[str]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "title": f"Learn {skill}",
+                "description": f"Focus on mastering {skill} concepts and building a small project.",
+                "skills": [skill],
+                "estimated_hours": 20
+            }
+            for skill in skill_gaps[:5]
+        ]
+    
     async def analyze_market_trends(
         self,
         role: str,
@@ -340,20 +467,17 @@ class CareerMentorTools:
         Difficulty: {difficulty}
         
         For each project, provide:
-        - Name
-        - Description (2-3 sentences)
-        - Key skills practiced
-        - Estimated hours
-        
-        Format as JSON array."""
+        - name
+        - description (2-3 sentences)
+        - skills: key skills practiced
+        - estimated_hours
         
-        response = await self.llm.ainvoke(prompt)
+        Format as a JSON array of objects with exactly those keys."""
         
         try:
-            # Parse LLM response
-            projects = json.loads(response.content)
-            return projects
-        except (json.JSONDecodeError, TypeError, ValueError):
+            projects = await ainvoke_structured(self.llm, prompt, List[ProjectIdea], call_site="project_ideas")
+            return [project.model_dump() for project in projects]
+        except ValueError:
             # Fallback projects
             return [
                 {
@@ -389,14 +513,14 @@ class CareerMentorTools:
                 {"type": "practice", "name": "LeetCode Python", "url": "https://leetcode.com"},
                 {"type": "book", "name": "Fluent Python", "url": "https://www.oreilly.com"}
             ],
-            "system design": [
+            "system-design": [
                 {"type": "course", "name": "System Design Primer", "url": "https://github.com/donnemartin/system-design-primer"},
                 {"type": "book", "name": "Designing Data-Intensive Applications", "url": "https://dataintensive.net"},
                 {"type": "practice", "name": "System Design Interview", "url": "https://www.designgurus.io"}
             ]
         }
         
-        return resources_db.get(skill.lower(), [
+        return resources_db.get(skill_taxonomy.key(skill), [
             {"type": "search", "name": f"Search '{skill} tutorial'", "url": f"https://www.google.com/search?q={skill}+tutorial"}
         ])
     
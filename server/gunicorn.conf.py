@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for running the API with several worker processes.
+
+    pip install gunicorn uvicorn-worker
+    WEB_CONCURRENCY=4 METRICS_MULTIPROC_DIR=/tmp/career-mentor-metrics gunicorn -c gunicorn.conf.py main:app
+
+Workers are uvicorn workers, one event loop each. All cross-request state
+is in the database (see README "Running several workers"), so requests may
+land on any worker.
+"""
+import os
+import shutil
+
+workers = int(os.environ.setdefault("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# LLM calls and streamed answers can legitimately take a minute
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so slow leaks cannot accumulate
+max_requests = 5000
+max_requests_jitter = 500
+
+accesslog = "-"
+
+
+def on_starting(server):
+    """Clear stale per-worker metric snapshots from a previous run."""
+    directory = os.environ.get("METRICS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
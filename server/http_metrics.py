@@ -0,0 +1,67 @@
+"""Per-route HTTP request metrics."""
+import time
+
+from starlette.routing import Match
+
+from metrics import registry
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ["method", "route", "status"]
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Time to the end of the response body", ["method", "route"]
+)
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+)
+
+# Label for paths that match no route, so scanners cannot inflate label cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope) -> str:
+    """The matched route's path template ("/agent/tasks/{task_id}"), never the raw path."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Requests answered before routing (e.g. rejected by outer middleware)
+    app = scope.get("app")
+    for candidate in getattr(app, "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return candidate.path
+    return UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    """
+    Count requests and time them until the last body chunk is sent, so
+    streamed responses are measured in full. Pure ASGI to avoid the
+    BaseHTTPMiddleware overhead on every request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = route_template(scope)
+            HTTP_LATENCY.observe(time.perf_counter() - started_at, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status)
@@ -1,38 +1,60 @@
+import asyncio
 import uuid
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from langchain_groq import ChatGroq
+from llm_gateway import llm_gateway
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
 from config import settings
 from schemas import (
     InterviewSessionRequest, 
     InterviewInteractionResponse,
-    InterviewFinalReport
+    InterviewFinalReport,
+    AnswerEvaluation,
+    InterviewReportDraft
 )
 from memory import memory_manager
+from metrics import registry
+from shared_state import shared_state
+from structured_output import ainvoke_structured, StructuredOutputError
+
+SESSION_PREFIX = "interview:"
+
 
 class InterviewAgent:
-    """Agent for conducting mock AI interviews."""
+    """
+    Agent for conducting mock AI interviews.
+    
+    Sessions live in the shared state store, so each turn of an interview
+    may be served by a different worker. The agent itself holds no state
+    between requests.
+    """
     
     def __init__(self, db):
         self.db = db
-        self.llm = ChatGroq(
-            model_name=settings.GROQ_MODEL,
-            api_key=settings.GROQ_API_KEY,
-            temperature=0.6 # Slightly lower temp for structured evaluation
+        self.llm = llm_gateway.chat(temperature=0.6, call_site="interview") # Slightly lower temp for structured evaluation
+        self.scoring_llm = llm_gateway.for_task("answer_scoring")
+
+    async def _load_session(self, session_id: str) -> Dict[str, Any]:
+        """Session dict ({history: [], question_count: 0, ...}); raises ValueError if unknown or expired."""
+        session = await asyncio.to_thread(shared_state.get, SESSION_PREFIX + session_id)
+        if session is None:
+            raise ValueError("Session not found")
+        return session
+
+    async def _save_session(self, session_id: str, session: Dict[str, Any]) -> None:
+        await asyncio.to_thread(
+            shared_state.set, SESSION_PREFIX + session_id, session,
+            settings.INTERVIEW_SESSION_TTL_HOURS * 3600
         )
-        # Simple in-memory session store (replace with Redis/DB in prod)
-        # Format: {session_id: {history: [], config: {...}, question_count: 0}}
-        self.sessions = {}
 
     async def start_session(self, request: InterviewSessionRequest) -> InterviewInteractionResponse:
         """Start a new interview session."""
         session_id = str(uuid.uuid4())
         
         # Initialize session
-        self.sessions[session_id] = {
+        session = {
             "user_id": request.user_id,
             "role": request.target_role,
             "focus": request.focus_area,
@@ -44,8 +66,9 @@ class InterviewAgent:
         }
         
         # Generate first question
-        question = await self._generate_question(session_id)
-        self.sessions[session_id]["last_question"] = question  # IMPORTANT: Save for context
+        question = await self._generate_question(session)
+        session["last_question"] = question  # IMPORTANT: Save for context
+        await self._save_session(session_id, session)
         
         return InterviewInteractionResponse(
             session_id=session_id,
@@ -54,9 +77,8 @@ class InterviewAgent:
             state="in_progress"
         )
 
-    async def _generate_question(self, session_id: str) -> str:
+    async def _generate_question(self, session: Dict[str, Any]) -> str:
         """Generate the next interview question based on context."""
-        session = self.sessions[session_id]
         role = session["role"]
         focus = session["focus"]
         difficulty = session["difficulty"]
@@ -89,13 +111,10 @@ class InterviewAgent:
 
     async def submit_answer(self, session_id: str, answer: str) -> InterviewInteractionResponse:
         """Evaluate answer and generate next step."""
-        if session_id not in self.sessions:
-            raise ValueError("Session not found")
-            
-        session = self.sessions[session_id]
+        session = await self._load_session(session_id)
         
         # 1. Evaluate answer
-        feedback, score = await self._evaluate_answer(session_id, answer)
+        feedback, score = await self._evaluate_answer(session, answer)
         
         # Update session
         session["history"].append({
@@ -109,11 +128,13 @@ class InterviewAgent:
         
         # Check if finished
         if session["question_count"] >= session["max_questions"]:
+            await self._save_session(session_id, session)
             return await self._finish_session(session_id)
         
         # 2. Generate NEXT question
-        next_question = await self._generate_question(session_id)
+        next_question = await self._generate_question(session)
         session["last_question"] = next_question # Store for next turn
+        await self._save_session(session_id, session)
         
         return InterviewInteractionResponse(
             session_id=session_id,
@@ -124,9 +145,8 @@ class InterviewAgent:
             state="in_progress"
         )
 
-    async def _evaluate_answer(self, session_id: str, answer: str): 
+    async def _evaluate_answer(self, session: Dict[str, Any], answer: str): 
         """Evaluate the user's answer significantly."""
-        session = self.sessions[session_id]
         # We need to know what the question was. 
         # Ideally state tracking should be robust.
         # For prototype, we re-infer or assume last question is context.
@@ -147,15 +167,10 @@ class InterviewAgent:
         """
         
         try:
-            response = await self.llm.ainvoke(min_prompt)
-            import json, re
-            # Extract JSON
-            match = re.search(r'\{.*\}', response.content, re.DOTALL)
-            if match:
-                data = json.loads(match.group())
-                return data["feedback"], data["score"]
-            else:
-                return response.content[:100], 70 # Fallback
+            evaluation = await ainvoke_structured(self.scoring_llm, min_prompt, AnswerEvaluation)
+            return evaluation.feedback, evaluation.score
+        except StructuredOutputError as e:
+            return e.content[:100], 70 # Fallback
         except:
              return "Good effort.", 75
 
@@ -169,7 +184,7 @@ class InterviewAgent:
         )
 
     async def generate_final_report(self, session_id: str) -> InterviewFinalReport:
-        session = self.sessions[session_id]
+        session = await self._load_session(session_id)
         
         # Calculate summary stats
         avg_score = sum(session["scores"]) // len(session["scores"]) if session["scores"] else 0
@@ -196,10 +211,8 @@ class InterviewAgent:
         """
         
         try:
-            response = await self.llm.ainvoke(prompt)
-            import json, re
-            match = re.search(r'\{.*\}', response.content, re.DOTALL)
-            data = json.loads(match.group())
+            report = await ainvoke_structured(self.llm, prompt, InterviewReportDraft, call_site="interview_report")
+            data = report.model_dump()
         except:
             data = {"summary": "Completed", "strengths": [], "improvements": []}
             
@@ -214,12 +227,17 @@ class InterviewAgent:
             transcript=[{"role": "system", "content": "Transcript available"}]
         )
 
-# Global Instance
-interview_agent = None # Will instantiate with DB in main.py
+def _active_sessions() -> int:
+    return shared_state.count(SESSION_PREFIX)
+
+
+# Every worker reads the same count from a shared store, so merge with max, not sum
+registry.gauge(
+    "interview_sessions_active", "Unexpired mock interview sessions in the shared state store",
+    callback=_active_sessions, aggregate="max" if shared_state.shared else "sum"
+)
+
 
 def get_interview_agent(db):
-    """Factory to get agent instance."""
-    global interview_agent
-    if interview_agent is None:
-        interview_agent = InterviewAgent(db)
-    return interview_agent
+    """Agent bound to this request's database session (sessions themselves are in shared state)."""
+    return InterviewAgent(db)
@@ -5,29 +5,36 @@ import numpy as np
 from sqlalchemy.orm import Session
 import requests
 import logging
+import time
 
-from langchain_groq import ChatGroq
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from llm_gateway import llm_gateway
 
 from database import UserProfile, Application
+from schemas import MarketTrendsResponse, GeneratedJob
+from skills_taxonomy import skill_taxonomy
+from structured_output import ainvoke_structured
 from config import settings
+from memory import memory_manager, embedding_call
+from metrics import registry
+import telemetry
 
 logger = logging.getLogger(__name__)
 
+JSEARCH_LATENCY = registry.histogram(
+    "jsearch_request_duration_seconds", "JSearch API request latency"
+)
+
 
 class JobRecommendationEngine:
     """Match users to jobs and analyze market trends."""
     
     def __init__(self):
-        self.llm = ChatGroq(
-            model_name=settings.GROQ_MODEL,
-            api_key=settings.GROQ_API_KEY,
-            temperature=0
-        )
-        self.embedding_client = GoogleGenerativeAIEmbeddings(
-            model=settings.GEMINI_EMBEDDING_MODEL,
-            google_api_key=settings.GOOGLE_API_KEY
-        )
+        self.llm = llm_gateway.chat(temperature=0, call_site="job_recommender")
+    
+    @property
+    def embedding_client(self):
+        """The memory manager's embeddings client, created on first use."""
+        return memory_manager.embedding_client
     
     async def analyze_market_trends(
         self,
@@ -67,30 +74,17 @@ Return as JSON:
     "top_companies": ["company1", "company2", "company3"],
     "remote_percentage": 0,
     "entry_level_opportunities": "abundant/moderate/scarce",
-    "key_trends": ["trend1", "trend2", "trend3"],
-    "analysis_date": "{datetime.utcnow().isoformat()}"
+    "key_trends": ["trend1", "trend2", "trend3"]
 }}
 
 Return ONLY the JSON object."""
 
-        response = await self.llm.ainvoke(prompt)
-        
-        # Parse response
-        import json
-        import re
-        
         try:
-            if hasattr(response, 'content'):
-                response_text = response.content if isinstance(response.content, str) else str(response.content)
-            else:
-                response_text = str(response)
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            
-            if json_match:
-                trends = json.loads(json_match.group())
-            else:
-                trends = json.loads(response_text)
+            analysis = await ainvoke_structured(self.llm, prompt, MarketTrendsResponse, call_site="market_trends")
+            trends = analysis.model_dump()
             
+            # Stamped here rather than in the prompt so identical requests hit the LLM cache
+            trends["analysis_date"] = datetime.utcnow().isoformat()
             return trends
         
         except Exception as e:
@@ -160,7 +154,7 @@ Return ONLY the JSON object."""
             return []
         
         try:
-            url = "https://jsearch.p.rapidapi.com/search"
+            url = f"{settings.JSEARCH_BASE_URL.rstrip('/')}/search"
             
             headers = {
                 "X-RapidAPI-Key": settings.JSEARCH_API_KEY,
@@ -174,11 +168,22 @@ Return ONLY the JSON object."""
                 "country":"in",
             }
             
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            jobs = data.get('data', [])
+            started_at = time.perf_counter()
+            with telemetry.span("jsearch.search") as search_span:
+                try:
+                    response = requests.get(url, headers=headers, params=params, timeout=10)
+                finally:
+                    JSEARCH_LATENCY.observe(time.perf_counter() - started_at)
+                if search_span.is_recording():
+                    search_span.set_attributes({
+                        "jsearch.query": params["query"],
+                        "http.status_code": response.status_code,
+                    })
+                response.raise_for_status()
+                
+                data = response.json()
+                jobs = data.get('data', [])
+                search_span.set_attribute("jsearch.results", len(jobs))
             
             # Transform to our format
             formatted_jobs = []
@@ -228,7 +233,8 @@ Return ONLY the JSON object."""
         """
         try:
             # Get embeddings
-            embeddings = self.embedding_client.embed_documents([user_profile, job_description])
+            with embedding_call("job_match", texts=2):
+                embeddings = self.embedding_client.embed_documents([user_profile, job_description])
             
             # Calculate cosine similarity
             user_vec = np.array(embeddings[0])
@@ -356,23 +362,9 @@ Return as JSON array:
 
 Return ONLY the JSON array."""
 
-        response = await self.llm.ainvoke(prompt)
-        
-        # Parse response
-        import json
-        import re
-        
         try:
-            if hasattr(response, 'content'):
-                response_text = response.content if isinstance(response.content, str) else str(response.content)
-            else:
-                response_text = str(response)
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-            
-            if json_match:
-                jobs = json.loads(json_match.group())
-            else:
-                jobs = json.loads(response_text)
+            generated = await ainvoke_structured(self.llm, prompt, List[GeneratedJob], call_site="generated_jobs")
+            jobs = [job.model_dump() for job in generated]
             
             # Add recommendation metadata
             for job in jobs:
@@ -387,10 +379,15 @@ Return ONLY the JSON array."""
     def _generate_reason(self, job: Dict[str, Any], user_skills: List[str]) -> str:
         """Generate reason for recommendation."""
         matched_skills = []
-        required = job.get('required_skills', [])
+        # Requirements are free text ("3+ years of Python"); scan them for canonical skills
+        required = set()
+        for req in job.get('required_skills', []):
+            required.add(skill_taxonomy.key(req))
+            required.update(skill_taxonomy.extract(req))
         
-        for skill in user_skills:
-            if any(skill.lower() in req.lower() for req in required):
+        for skill in skill_taxonomy.canonicalize(user_skills):
+            # A skill also covers its ancestors: React satisfies a JavaScript requirement
+            if skill_taxonomy.implied([skill]) & required:
                 matched_skills.append(skill)
         
         if matched_skills:
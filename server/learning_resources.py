@@ -1,6 +1,9 @@
 """Learning resource recommendations."""
 from typing import List, Dict, Any, Optional
-from langchain_groq import ChatGroq
+from llm_gateway import llm_gateway
+from schemas import LearningResource
+from skills_taxonomy import skill_taxonomy
+from structured_output import ainvoke_structured
 from config import settings
 
 
@@ -8,11 +11,7 @@ class LearningResourceFetcher:
     """Fetch and recommend learning resources."""
     
     def __init__(self):
-        self.llm = ChatGroq(
-            model_name=settings.GROQ_MODEL,
-            api_key=settings.GROQ_API_KEY,
-            temperature=0.7
-        )
+        self.llm = llm_gateway.chat(temperature=0.7, call_site="learning_resources")
     
     async def get_resources_for_skill(
         self,
@@ -63,26 +62,9 @@ Format as JSON array:
 
 Recommend 5-7 high-quality resources. Return ONLY the JSON array."""
 
-        response = await self.llm.ainvoke(prompt)
-        
-        # Parse response
-        import json
-        import re
-        
         try:
-            if hasattr(response, 'content'):
-                response_text = response.content if isinstance(response.content, str) else str(response.content)
-            else:
-                response_text = str(response)
-            
-            # Extract JSON array
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-            if json_match:
-                resources = json.loads(json_match.group())
-            else:
-                resources = json.loads(response_text)
-            
-            return resources
+            resources = await ainvoke_structured(self.llm, prompt, List[LearningResource])
+            return [resource.model_dump() for resource in resources]
         
         except Exception as e:
             # Return fallback resources
@@ -90,7 +72,7 @@ Recommend 5-7 high-quality resources. Return ONLY the JSON array."""
     
     def _get_fallback_resources(self, skill: str, level: str) -> List[Dict[str, Any]]:
         """Fallback resources when LLM fails."""
-        skill_lower = skill.lower()
+        skill_key = skill_taxonomy.key(skill)
         
         # Common resource templates
         resources = []
@@ -108,7 +90,7 @@ Recommend 5-7 high-quality resources. Return ONLY the JSON array."""
         })
         
         # freeCodeCamp
-        if skill_lower in ['javascript', 'python', 'html', 'css', 'react', 'node']:
+        if skill_key in ['javascript', 'python', 'html', 'css', 'react', 'nodejs']:
             resources.append({
                 "title": f"{skill} on freeCodeCamp",
                 "type": "course",
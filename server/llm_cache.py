@@ -0,0 +1,209 @@
+"""Response cache for deterministic (temperature 0) LLM calls."""
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from config import settings
+from database import SessionLocal, LLMCacheEntry
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOOKUPS = registry.counter(
+    "llm_cache_lookups_total", "LLM response cache lookups", ["call_site", "result"]
+)
+CACHE_SAVED_TOKENS = registry.counter(
+    "llm_cache_saved_tokens_total", "Provider tokens not spent thanks to cache hits", ["call_site"]
+)
+
+
+def prompt_fingerprint(input: Any) -> str:
+    """Serialize a prompt string or message list into a stable string."""
+    if isinstance(input, str):
+        return input
+    if isinstance(input, (list, tuple)):
+        parts = []
+        for message in input:
+            if isinstance(message, BaseMessage):
+                parts.append([message.type, message.content])
+            else:
+                parts.append(message)
+        return json.dumps(parts, sort_keys=True, default=str)
+    return json.dumps(input, sort_keys=True, default=str)
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache keyed on (model, temperature, prompt hash).
+
+    The in-process tier is an LRU bounded by LLM_CACHE_MAX_ENTRIES; the
+    optional durable tier stores entries in the `llm_cache_entries` table
+    so they survive restarts and are shared between workers.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stores = 0
+
+    @staticmethod
+    def make_key(model: str, temperature: float, input: Any, options: Optional[Dict[str, Any]] = None) -> str:
+        payload = f"{model}\x00{float(temperature)}\x00{prompt_fingerprint(input)}"
+        if options:
+            # Call options such as response_format change the answer
+            payload += "\x00" + json.dumps(options, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, temperature: float) -> bool:
+        return settings.LLM_CACHE_ENABLED and float(temperature) == 0.0
+
+    async def get(self, key: str, call_site: str = "default") -> Optional[AIMessage]:
+        """Return a cached response for `key`, or None."""
+        entry = self._get_local(key)
+        tier = "memory"
+
+        if entry is None and settings.LLM_CACHE_DURABLE:
+            try:
+                entry = await asyncio.to_thread(self._get_durable, key)
+            except Exception as e:
+                logger.warning(f"LLM cache durable read failed: {str(e)[:100]}")
+            tier = "durable"
+            if entry is not None:
+                self._put_local(key, entry)
+
+        if entry is None:
+            CACHE_LOOKUPS.inc(call_site=call_site, result="miss")
+            return None
+
+        CACHE_LOOKUPS.inc(call_site=call_site, result=f"hit_{tier}")
+        CACHE_SAVED_TOKENS.inc(entry.get("total_tokens", 0), call_site=call_site)
+        return AIMessage(
+            content=entry["content"],
+            response_metadata={"cache_hit": True, "cache_tier": tier}
+        )
+
+    async def set(self, key: str, model: str, response: Any) -> None:
+        """Store a provider response."""
+        content = getattr(response, "content", response)
+        if not isinstance(content, str):
+            return  # Multi-part responses are not worth caching
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        entry = {
+            "content": content,
+            "model": model,
+            "total_tokens": int(usage.get("total_tokens", 0) or 0),
+            "expires_at": time.time() + settings.LLM_CACHE_TTL_SECONDS
+        }
+        self._put_local(key, entry)
+
+        if settings.LLM_CACHE_DURABLE:
+            try:
+                await asyncio.to_thread(self._set_durable, key, entry)
+            except Exception as e:
+                logger.warning(f"LLM cache durable write failed: {str(e)[:100]}")
+
+    async def discard(self, key: str) -> None:
+        """Drop an entry, e.g. a response that failed validation."""
+        with self._lock:
+            self._entries.pop(key, None)
+        if settings.LLM_CACHE_DURABLE:
+            try:
+                await asyncio.to_thread(self._discard_durable, key)
+            except Exception as e:
+                logger.warning(f"LLM cache durable delete failed: {str(e)[:100]}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts and token savings across call sites."""
+        hits = misses = 0.0
+        for (_, result), value in CACHE_LOOKUPS.samples():
+            if result == "miss":
+                misses += value
+            else:
+                hits += value
+        total = hits + misses
+        return {
+            "entries": len(self._entries),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "saved_tokens": sum(value for _, value in CACHE_SAVED_TOKENS.samples())
+        }
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put_local(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.LLM_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def _get_durable(self, key: str) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            row = db.get(LLMCacheEntry, key)
+            if row is None or row.expires_at <= datetime.utcnow():
+                return None
+            return {
+                "content": row.content,
+                "model": row.model,
+                "total_tokens": row.total_tokens or 0,
+                "expires_at": time.time() + (row.expires_at - datetime.utcnow()).total_seconds()
+            }
+        finally:
+            db.close()
+
+    def _set_durable(self, key: str, entry: Dict[str, Any]) -> None:
+        db = SessionLocal()
+        try:
+            db.merge(LLMCacheEntry(
+                key=key,
+                model=entry["model"],
+                content=entry["content"],
+                total_tokens=entry["total_tokens"],
+                created_at=datetime.utcnow(),
+                expires_at=datetime.utcnow() + timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS)
+            ))
+            self._stores += 1
+            # Purge expired rows now and then rather than on every write
+            if self._stores % 500 == 0:
+                db.query(LLMCacheEntry).filter(
+                    LLMCacheEntry.expires_at <= datetime.utcnow()
+                ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _discard_durable(self, key: str) -> None:
+        db = SessionLocal()
+        try:
+            db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+# Singleton instance
+llm_cache = LLMResponseCache()
@@ -0,0 +1,481 @@
+"""Shared LLM clients with provider-level concurrency and rate limiting."""
+from typing import Dict, Any, AsyncIterator, Callable, Optional, Tuple
+import asyncio
+import logging
+import time
+
+import httpx
+from langchain_groq import ChatGroq
+
+from config import settings
+from llm_cache import llm_cache
+from metrics import registry
+import telemetry
+
+logger = logging.getLogger(__name__)
+
+LLM_IN_FLIGHT = registry.gauge(
+    "llm_requests_in_flight", "LLM requests currently running against the provider"
+)
+LLM_QUEUED = registry.gauge(
+    "llm_requests_queued", "LLM requests waiting for a rate-limit token or concurrency slot"
+)
+LLM_QUEUE_WAIT = registry.histogram(
+    "llm_queue_wait_seconds", "Time spent waiting in the local LLM queue", ["call_site"]
+)
+LLM_REQUESTS = registry.counter(
+    "llm_requests_total", "LLM requests by call site and outcome", ["call_site", "model", "outcome"]
+)
+LLM_LATENCY = registry.histogram(
+    "llm_request_duration_seconds", "Provider call latency, excluding local queueing", ["call_site", "model"]
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total", "Provider tokens by call site, model and direction", ["call_site", "model", "kind"]
+)
+LLM_COST = registry.counter(
+    "llm_cost_usd_total", "Estimated provider spend from LLM_MODEL_PRICES", ["call_site", "model"]
+)
+LLM_ESCALATIONS = registry.counter(
+    "llm_escalations_total", "Routed calls re-run on the large model after failing validation", ["call_site", "model"]
+)
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, up to `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return  # Rate limiting disabled
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                # Holding the lock keeps waiters FIFO
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class GatedChatModel:
+    """
+    Drop-in stand-in for a chat model whose calls go through the gateway.
+
+    Modules keep calling `self.llm.ainvoke(...)`; the gateway supplies the
+    shared client and applies the limiter around each call.
+    """
+
+    def __init__(
+        self,
+        gateway: "LLMGateway",
+        model: str,
+        temperature: float,
+        call_site: str,
+        escalation_model: Optional[str] = None
+    ):
+        self.gateway = gateway
+        self.model = model
+        self.temperature = temperature
+        self.call_site = call_site
+        self.escalation_model = escalation_model
+
+    async def ainvoke(
+        self,
+        input: Any,
+        call_site: Optional[str] = None,
+        validate: Optional[Callable[[Any], Any]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Invoke the model, escalating once if the output fails validation.
+
+        Args:
+            input: Prompt string or list of messages
+            call_site: Overrides the handle's call site label
+            validate: Optional check on the response; returning False or
+                raising counts as a failure
+
+        Returns:
+            The model's AIMessage
+        """
+        call_site = call_site or self.call_site
+        response = await self.gateway.ainvoke(
+            input,
+            model=self.model,
+            temperature=self.temperature,
+            call_site=call_site,
+            **kwargs
+        )
+        if validate is None or not self.escalation_model or _passes(validate, response):
+            return response
+
+        LLM_ESCALATIONS.inc(call_site=call_site, model=self.model)
+        logger.info(f"Escalating {call_site} from {self.model} to {self.escalation_model}")
+        return await self.gateway.ainvoke(
+            input,
+            model=self.escalation_model,
+            temperature=self.temperature,
+            call_site=call_site,
+            **kwargs
+        )
+
+    async def astream(self, input: Any, call_site: Optional[str] = None, **kwargs) -> AsyncIterator[Any]:
+        """Stream response chunks through the gateway."""
+        async for chunk in self.gateway.astream(
+            input,
+            model=self.model,
+            temperature=self.temperature,
+            call_site=call_site or self.call_site,
+            **kwargs
+        ):
+            yield chunk
+
+    async def discard(self, input: Any, **kwargs) -> None:
+        """Forget cached responses to `input` (e.g. after they failed to parse)."""
+        for model in filter(None, (self.model, self.escalation_model)):
+            await self.gateway.discard(input, model=model, temperature=self.temperature, **kwargs)
+
+
+def _span_usage(response: Any, queue_wait: float) -> Dict[str, Any]:
+    """Span attributes for a finished provider call."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return {
+        "llm.queue_wait_ms": round(queue_wait * 1000, 1),
+        "llm.input_tokens": int(usage.get("input_tokens", 0) or 0),
+        "llm.output_tokens": int(usage.get("output_tokens", 0) or 0),
+    }
+
+
+def _passes(validate: Callable[[Any], Any], response: Any) -> bool:
+    try:
+        return validate(response) is not False
+    except Exception:
+        return False
+
+
+class LLMGateway:
+    """
+    Hands out pooled chat clients keyed by (model, temperature).
+
+    All calls share one HTTP connection pool, a global concurrency
+    semaphore and a token-bucket request rate, so bursts queue locally
+    instead of turning into provider 429s.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple[str, float], ChatGroq] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[TokenBucket] = None
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+
+    def chat(
+        self,
+        temperature: float = 0.0,
+        model: Optional[str] = None,
+        call_site: str = "default"
+    ) -> GatedChatModel:
+        """Get a rate-limited chat model handle."""
+        return GatedChatModel(self, model or settings.GROQ_MODEL, temperature, call_site)
+
+    def for_task(self, task: str, temperature: float = 0.0) -> GatedChatModel:
+        """
+        Get a chat model handle routed by settings.LLM_TASK_MODELS.
+
+        The task name doubles as the call site, so latency, tokens and cost
+        are tracked per task. Tasks on a smaller model escalate to
+        GROQ_MODEL when the caller's validation fails.
+        """
+        model = self.resolve_model(task)
+        escalation_model = settings.GROQ_MODEL if model != settings.GROQ_MODEL else None
+        return GatedChatModel(self, model, temperature, task, escalation_model)
+
+    @staticmethod
+    def resolve_model(task: str) -> str:
+        """Model name configured for a task (defaults to the large model)."""
+        route = settings.LLM_TASK_MODELS.get(task, "large")
+        if route == "small":
+            return settings.LLM_SMALL_MODEL
+        if route == "large":
+            return settings.GROQ_MODEL
+        return route
+
+    def get_client(self, model: Optional[str] = None, temperature: float = 0.0) -> ChatGroq:
+        """Get the shared client for (model, temperature), creating it on first use."""
+        self._bind_loop()
+        key = (model or settings.GROQ_MODEL, float(temperature))
+        client = self._clients.get(key)
+        if client is None:
+            client = ChatGroq(
+                model_name=key[0],
+                api_key=settings.GROQ_API_KEY,
+                base_url=settings.GROQ_BASE_URL or None,
+                temperature=key[1],
+                max_retries=settings.LLM_MAX_RETRIES,
+                request_timeout=settings.LLM_REQUEST_TIMEOUT,
+                http_client=self._sync_http_client(),
+                http_async_client=self._http_async_client
+            )
+            self._clients[key] = client
+        return client
+
+    async def ainvoke(
+        self,
+        input: Any,
+        model: Optional[str] = None,
+        temperature: float = 0.0,
+        call_site: str = "default",
+        **kwargs
+    ) -> Any:
+        """
+        Invoke a chat model through the shared limiter.
+
+        Args:
+            input: Prompt string or list of messages
+            model: Model name (defaults to settings.GROQ_MODEL)
+            temperature: Sampling temperature
+            call_site: Label identifying the caller in metrics
+
+        Returns:
+            The model's AIMessage
+        """
+        model = model or settings.GROQ_MODEL
+
+        with telemetry.span("llm.chat") as llm_span:
+            if llm_span.is_recording():
+                llm_span.set_attributes({"llm.call_site": call_site, "llm.model": model, "llm.temperature": temperature})
+
+            # Deterministic prompts are answered from cache without touching the limiter
+            cache_key = None
+            if llm_cache.is_cacheable(temperature):
+                cache_key = llm_cache.make_key(model, temperature, input, kwargs)
+                cached = await llm_cache.get(cache_key, call_site=call_site)
+                llm_span.set_attribute("llm.cache_hit", cached is not None)
+                if cached is not None:
+                    return cached
+
+            self._bind_loop()
+            client = self.get_client(model, temperature)
+            queue_wait = await self._acquire(call_site)
+
+            LLM_IN_FLIGHT.inc()
+            started_at = time.perf_counter()
+            try:
+                response = await client.ainvoke(input, **kwargs)
+            except Exception:
+                LLM_REQUESTS.inc(call_site=call_site, model=model, outcome="error")
+                raise
+            finally:
+                LLM_IN_FLIGHT.dec()
+                self._semaphore.release()
+                LLM_LATENCY.observe(time.perf_counter() - started_at, call_site=call_site, model=model)
+
+            LLM_REQUESTS.inc(call_site=call_site, model=model, outcome="ok")
+            self._record_usage(call_site, model, response)
+            if llm_span.is_recording():
+                llm_span.set_attributes(_span_usage(response, queue_wait))
+            if cache_key is not None:
+                await llm_cache.set(cache_key, model, response)
+            return response
+
+    async def astream(
+        self,
+        input: Any,
+        model: Optional[str] = None,
+        temperature: float = 0.0,
+        call_site: str = "default",
+        **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        Stream a chat model response through the shared limiter.
+
+        The concurrency slot is held until the stream finishes or the
+        consumer stops iterating. Cached responses arrive as one chunk.
+
+        Args:
+            input: Prompt string or list of messages
+            model: Model name (defaults to settings.GROQ_MODEL)
+            temperature: Sampling temperature
+            call_site: Label identifying the caller in metrics
+
+        Yields:
+            Message chunks
+        """
+        model = model or settings.GROQ_MODEL
+
+        # Not made current: a `with` block cannot straddle the generator's yields
+        llm_span = telemetry.start_span("llm.stream")
+        if llm_span.is_recording():
+            llm_span.set_attributes({"llm.call_site": call_site, "llm.model": model, "llm.temperature": temperature})
+        try:
+            cache_key = None
+            if llm_cache.is_cacheable(temperature):
+                cache_key = llm_cache.make_key(model, temperature, input, kwargs)
+                cached = await llm_cache.get(cache_key, call_site=call_site)
+                llm_span.set_attribute("llm.cache_hit", cached is not None)
+                if cached is not None:
+                    yield cached
+                    return
+
+            self._bind_loop()
+            client = self.get_client(model, temperature)
+            queue_wait = await self._acquire(call_site)
+
+            LLM_IN_FLIGHT.inc()
+            started_at = time.perf_counter()
+            full = None
+            try:
+                async for chunk in client.astream(input, **kwargs):
+                    full = chunk if full is None else full + chunk
+                    yield chunk
+            except Exception:
+                LLM_REQUESTS.inc(call_site=call_site, model=model, outcome="error")
+                raise
+            finally:
+                LLM_IN_FLIGHT.dec()
+                self._semaphore.release()
+                LLM_LATENCY.observe(time.perf_counter() - started_at, call_site=call_site, model=model)
+
+            LLM_REQUESTS.inc(call_site=call_site, model=model, outcome="ok")
+            self._record_usage(call_site, model, full)
+            if llm_span.is_recording():
+                llm_span.set_attributes(_span_usage(full, queue_wait))
+            if cache_key is not None and full is not None:
+                await llm_cache.set(cache_key, model, full)
+        finally:
+            llm_span.end()
+
+    async def _acquire(self, call_site: str) -> float:
+        """Wait for a rate-limit token and a concurrency slot; returns seconds waited."""
+        queued_at = time.perf_counter()
+        LLM_QUEUED.inc()
+        try:
+            await self._bucket.acquire()
+            await self._semaphore.acquire()
+        finally:
+            LLM_QUEUED.dec()
+        waited = time.perf_counter() - queued_at
+        LLM_QUEUE_WAIT.observe(waited, call_site=call_site)
+        return waited
+
+    @staticmethod
+    def _record_usage(call_site: str, model: str, response: Any) -> None:
+        """Count tokens and estimated cost from the response's usage metadata."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = int(usage.get("input_tokens", 0) or 0)
+        output_tokens = int(usage.get("output_tokens", 0) or 0)
+        if not (input_tokens or output_tokens):
+            return
+
+        LLM_TOKENS.inc(input_tokens, call_site=call_site, model=model, kind="input")
+        LLM_TOKENS.inc(output_tokens, call_site=call_site, model=model, kind="output")
+
+        prices = settings.LLM_MODEL_PRICES.get(model)
+        if prices:
+            cost = (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+            LLM_COST.inc(cost, call_site=call_site, model=model)
+
+    async def discard(self, input: Any, model: Optional[str] = None, temperature: float = 0.0, **kwargs) -> None:
+        """Remove a cached response for this exact call, if any."""
+        if llm_cache.is_cacheable(temperature):
+            await llm_cache.discard(llm_cache.make_key(model or settings.GROQ_MODEL, temperature, input, kwargs))
+
+    def _bind_loop(self) -> None:
+        """(Re)create loop-bound primitives when the running event loop changes."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is self._loop and self._semaphore is not None:
+            return
+
+        self._loop = loop
+        limits = self.worker_limits()
+        self._semaphore = asyncio.Semaphore(limits["max_concurrency"])
+        self._bucket = TokenBucket(
+            rate=limits["requests_per_minute"] / 60.0,
+            capacity=limits["burst"]
+        )
+        # Async connection pools belong to one loop; clients holding them are rebuilt too
+        self._http_async_client = httpx.AsyncClient(
+            limits=self._limits(), timeout=settings.LLM_REQUEST_TIMEOUT
+        )
+        self._clients.clear()
+
+    @staticmethod
+    def worker_limits() -> Dict[str, Any]:
+        """
+        This process's share of the provider limits.
+
+        LLM_* limits describe the whole deployment, so with WEB_CONCURRENCY
+        workers each one enforces 1/N of them (at least one request).
+        """
+        workers = max(1, settings.WEB_CONCURRENCY)
+        return {
+            "workers": workers,
+            "max_concurrency": max(1, settings.LLM_MAX_CONCURRENCY // workers),
+            "requests_per_minute": settings.LLM_REQUESTS_PER_MINUTE / workers,
+            "burst": max(1, settings.LLM_RATE_LIMIT_BURST // workers)
+        }
+
+    def _sync_http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            self._http_client = httpx.Client(limits=self._limits(), timeout=settings.LLM_REQUEST_TIMEOUT)
+        return self._http_client
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_CONNECTIONS
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limiter state."""
+        return {
+            "clients": len(self._clients),
+            "in_flight": LLM_IN_FLIGHT.value(),
+            "queued": LLM_QUEUED.value(),
+            "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+            "requests_per_minute": settings.LLM_REQUESTS_PER_MINUTE,
+            "worker_limits": self.worker_limits(),
+            "usage": self.usage(),
+            "cache": llm_cache.stats()
+        }
+
+    def usage(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Requests, mean latency, tokens, cost and escalations per call site and model."""
+        summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+        def row(call_site: str, model: str) -> Dict[str, float]:
+            return summary.setdefault(call_site, {}).setdefault(model, {
+                "requests": 0.0, "mean_latency_s": 0.0, "input_tokens": 0.0,
+                "output_tokens": 0.0, "cost_usd": 0.0, "escalations": 0.0
+            })
+
+        for (call_site, model), state in LLM_LATENCY.samples():
+            count, total = state[-2], state[-1]
+            entry = row(call_site, model)
+            entry["requests"] = count
+            entry["mean_latency_s"] = round(total / count, 4) if count else 0.0
+        for (call_site, model, kind), value in LLM_TOKENS.samples():
+            row(call_site, model)[f"{kind}_tokens"] = value
+        for (call_site, model), value in LLM_COST.samples():
+            row(call_site, model)["cost_usd"] = round(value, 6)
+        for (call_site, model), value in LLM_ESCALATIONS.samples():
+            row(call_site, model)["escalations"] = value
+        return summary
+
+
+# Singleton instance
+llm_gateway = LLMGateway()
@@ -0,0 +1,153 @@
+"""Event-loop lag monitor with a watchdog that names the blocking call."""
+from typing import Any, Dict, Optional
+from collections import deque
+import asyncio
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+
+from config import settings
+from metrics import registry
+from profiling import blocking_site, frame_stack
+
+logger = logging.getLogger(__name__)
+
+# Lag quantiles published over the recent window
+WINDOW_QUANTILES = (0.5, 0.95, 0.99)
+
+EVENT_LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds", "Delay between a scheduled event-loop wakeup and when it ran",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+EVENT_LOOP_BLOCKS = registry.counter(
+    "event_loop_blocks_total",
+    "Times the event loop was blocked past LOOP_BLOCK_THRESHOLD_MS, by the app line running at the time",
+    ["site"]
+)
+
+
+class LoopMonitor:
+    """
+    Measures how late the event loop runs a scheduled wakeup.
+
+    A probe task sleeps LOOP_MONITOR_INTERVAL_MS at a time; the extra delay
+    on each wakeup is the lag every other coroutine saw too. A watchdog
+    thread checks that the probe wakes on time. When it is
+    LOOP_BLOCK_THRESHOLD_MS late, the watchdog captures the loop
+    thread's stack while the blocking call is still running, so the report
+    names the offending line instead of whatever ran afterwards.
+    """
+
+    def __init__(self, interval: float, threshold: float, window: int):
+        self.interval = interval
+        self.threshold = threshold
+        self._lags = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        # Monotonic time by which the probe should have woken up
+        self._deadline: Optional[float] = None
+        # Stack captured by the watchdog for the stall in progress
+        self._stall: Optional[Dict[str, Any]] = None
+
+    def start(self) -> None:
+        """Start the probe and the watchdog; call from the event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._watchdog = None
+
+    async def _probe(self) -> None:
+        while True:
+            scheduled = time.monotonic()
+            self._deadline = scheduled + self.interval + self.threshold
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - scheduled - self.interval)
+            with self._lock:
+                self._lags.append(lag)
+                stall, self._stall = self._stall, None
+            EVENT_LOOP_LAG.observe(lag)
+            if lag >= self.threshold:
+                self._record_block(lag, stall)
+
+    def _watch(self) -> None:
+        """Watchdog thread: snapshot the loop thread's stack once per stall."""
+        poll = min(self.interval, self.threshold) / 4
+        while not self._stop.wait(poll):
+            deadline = self._deadline
+            if deadline is None or time.monotonic() < deadline:
+                continue
+            with self._lock:
+                if self._stall is not None and self._stall["deadline"] == deadline:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            frames = frame_stack(frame)
+            stall = {
+                "deadline": deadline,
+                "site": blocking_site(frames),
+                "stack": "".join(traceback.format_list(traceback.extract_stack(frame)[-12:])),
+            }
+            del frame, frames
+            with self._lock:
+                # The probe may have woken (and moved on) while we were capturing
+                if self._deadline == deadline:
+                    self._stall = stall
+
+    def _record_block(self, lag: float, stall: Optional[Dict[str, Any]]) -> None:
+        # Without a stack the stall ended between watchdog polls
+        site = stall["site"] if stall else "<unknown>"
+        EVENT_LOOP_BLOCKS.inc(site=site)
+        if stall:
+            logger.warning(
+                f"Event loop blocked for {lag * 1000:.0f}ms at {site}\n{stall['stack']}"
+            )
+        else:
+            logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms (no stack captured)")
+
+    def quantiles(self) -> Dict[tuple, float]:
+        """Lag quantiles over the recent window, as {("0.95",): seconds}."""
+        with self._lock:
+            lags = sorted(self._lags)
+        if not lags:
+            return {}
+        return {
+            (str(q),): lags[min(len(lags) - 1, max(0, math.ceil(q * len(lags)) - 1))]
+            for q in WINDOW_QUANTILES
+        }
+
+
+# Singleton instance
+loop_monitor = LoopMonitor(
+    settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+    window=max(1, int(settings.LOOP_LAG_WINDOW_SECONDS * 1000 / settings.LOOP_MONITOR_INTERVAL_MS))
+)
+
+EVENT_LOOP_LAG_WINDOW = registry.gauge(
+    "event_loop_lag_window_seconds",
+    "Event-loop lag quantiles over the last LOOP_LAG_WINDOW_SECONDS (worst worker when merged)",
+    ["quantile"],
+    callback=loop_monitor.quantiles,
+    aggregate="max"
+)
@@ -1,13 +1,20 @@
 """Main FastAPI application for Career Mentor API."""
 from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 from datetime import datetime
+import asyncio
+import importlib
 import logging
+import time
 import uuid
 
+import orjson
+
 from config import settings
-from database import init_db, get_db, UserProfile
+from database import init_db, get_db, SessionLocal, UserProfile
 from schemas import (
     AgentMessageRequest, AgentMessageResponse,
     RoadmapRegenerateRequest,
@@ -17,6 +24,7 @@ from schemas import (
     WeeklyProgress,
     HealthResponse,
     ResumeParseResponse,
+    BackgroundTaskStatus,
     JobRecommendationRequest,
     JobRecommendationResponse,
     MarketTrendsRequest,
@@ -28,11 +36,17 @@ from schemas import (
     InterviewAnswerRequest,
     InterviewFinalReport
 )
-from services import CareerMentorService
-from resume_parser import resume_parser
-from job_recommender import job_engine
-from learning_resources import learning_resources
-from interview_agent import get_interview_agent
+from roadmap_templates import roadmap_templates
+from task_queue import task_queue
+from metrics import registry, render_prometheus, MultiprocessMetrics
+from http_metrics import RequestMetricsMiddleware
+from profiling import ProfilingMiddleware
+from loop_monitor import loop_monitor
+from shared_state import shared_state
+import telemetry
+from uploads import (
+    UploadLimitMiddleware, UploadTooLargeError, spool_upload, sniff_mime, PDF_MIME, DOCX_MIME
+)
 
 # Configure logging
 logging.basicConfig(
@@ -50,6 +64,26 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Opt-in sampling profiler, innermost so it sees only the app's own work
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Refuse oversized resumes before the body is read (inside CORS so 413s carry CORS headers)
+app.add_middleware(
+    UploadLimitMiddleware,
+    paths=["/agent/resume/parse"],
+    max_bytes=settings.RESUME_MAX_UPLOAD_BYTES
+)
+
+# Per-route request metrics (inside CORS, outside the upload limit so 413s are counted)
+app.add_middleware(RequestMetricsMiddleware)
+
+# Per-worker metric snapshots merged at scrape time
+multiprocess_metrics = (
+    MultiprocessMetrics(settings.METRICS_MULTIPROC_DIR, settings.METRICS_SNAPSHOT_INTERVAL_SECONDS)
+    if settings.METRICS_MULTIPROC_DIR else None
+)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -60,6 +94,22 @@ app.add_middleware(
 )
 
 
+# Heavy modules the endpoints import on first use
+AGENT_MODULES = ("services", "resume_parser", "job_recommender", "learning_resources", "interview_agent")
+
+
+def preload_agent_modules() -> None:
+    """Import the agent stack ahead of the first request (runs in a worker thread)."""
+    started_at = time.perf_counter()
+    try:
+        for name in AGENT_MODULES:
+            importlib.import_module(name)
+    except Exception as e:
+        logger.warning(f"Preloading agent modules failed: {str(e)[:200]}")
+        return
+    logger.info(f"Agent modules loaded in {time.perf_counter() - started_at:.2f}s")
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -67,6 +117,36 @@ async def startup_event():
     logger.info("Starting Career Mentor API...")
     init_db()
     logger.info("Database initialized")
+    pruned = task_queue.prune()
+    if pruned:
+        logger.info(f"Pruned {pruned} finished background tasks")
+    pruned = shared_state.prune()
+    if pruned:
+        logger.info(f"Pruned {pruned} expired shared state entries")
+    if settings.WEB_CONCURRENCY > 1:
+        if not shared_state.shared:
+            logger.warning(
+                "SHARED_STATE_BACKEND=memory with several workers: interview turns "
+                "served by another worker will not find their session"
+            )
+        if not settings.METRICS_MULTIPROC_DIR:
+            logger.warning("METRICS_MULTIPROC_DIR is unset: /metrics reports only the worker that answers")
+    if multiprocess_metrics:
+        multiprocess_metrics.start()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    if settings.PRELOAD_AGENT_MODULES:
+        asyncio.get_running_loop().run_in_executor(None, preload_agent_modules)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Give in-flight background tasks a chance to finish, then flush spans."""
+    await loop_monitor.stop()
+    await task_queue.drain()
+    telemetry.shutdown()
+    if multiprocess_metrics:
+        await multiprocess_metrics.stop()
 
 
 def ensure_user_profile(db: Session, user_id: str) -> UserProfile:
@@ -110,6 +190,44 @@ async def health_check():
     )
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint, aggregated across workers when METRICS_MULTIPROC_DIR is set."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if multiprocess_metrics:
+        collected = await asyncio.to_thread(multiprocess_metrics.collect)
+    else:
+        # Callback gauges may query the database (interview_sessions_active)
+        collected = (await asyncio.to_thread(registry.snapshot))["metrics"]
+    return PlainTextResponse(
+        render_prometheus(collected),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/agent/cache/semantic")
+async def semantic_cache_stats():
+    """
+    Semantic cache hit rate and false-hit audit figures, for threshold tuning.
+    
+    Audited samples hold users' messages and cached answers, so they are
+    only returned with SEMANTIC_CACHE_EXPOSE_SAMPLES (the endpoint has no auth).
+    """
+    from semantic_cache import semantic_cache
+    
+    stats = semantic_cache.stats()
+    if settings.SEMANTIC_CACHE_EXPOSE_SAMPLES:
+        stats["samples"] = semantic_cache.samples()
+    return stats
+
+
+@app.get("/agent/cache/roadmap-templates")
+async def roadmap_template_stats():
+    """Roadmap template store hit rate."""
+    return roadmap_templates.stats()
+
+
 # ============== Protected Endpoints ==============
 # All endpoints expect user_id in request body (from frontend auth)
 
@@ -124,6 +242,8 @@ async def agent_message(
     Frontend should verify user authentication and pass user_id.
     """
     try:
+        from services import CareerMentorService
+        
         service = CareerMentorService(db)
         result = await service.process_message(
             user_id=request.user_id,
@@ -145,6 +265,8 @@ async def get_memory_summary(
 ):
     """Get user's long-term memory summary."""
     try:
+        from services import CareerMentorService
+        
         service = CareerMentorService(db)
         summary = await service.get_memory_summary(user_id)
         
@@ -162,6 +284,8 @@ async def get_current_roadmap(
 ):
     """Get user's current active roadmap."""
     try:
+        from services import CareerMentorService
+        
         service = CareerMentorService(db)
         roadmap = await service.get_current_roadmap(user_id)
         
@@ -187,6 +311,8 @@ async def regenerate_roadmap(
         # Ensure user profile exists
         ensure_user_profile(db, request.user_id)
         
+        from services import CareerMentorService
+        
         service = CareerMentorService(db)
         roadmap = await service.regenerate_roadmap(
             user_id=request.user_id,
@@ -204,6 +330,39 @@ async def regenerate_roadmap(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/agent/roadmap/regenerate/stream")
+async def regenerate_roadmap_stream(request: RoadmapRegenerateRequest):
+    """
+    Generate a new roadmap, streaming progress as NDJSON.
+    
+    Emits role, skill_gaps and one milestone event per milestone as the
+    LLM produces them; the final "roadmap" event carries the saved roadmap
+    (milestone events are previews). Failures arrive as an "error" event.
+    """
+    async def events():
+        # The request-scoped session is gone once streaming starts; own one
+        db = SessionLocal()
+        try:
+            ensure_user_profile(db, request.user_id)
+            from services import CareerMentorService
+
+            service = CareerMentorService(db)
+            async for event in service.stream_roadmap(
+                user_id=request.user_id,
+                target_role=request.target_role,
+                focus_areas=request.focus_areas,
+                timeline_weeks=request.timeline_weeks or 12
+            ):
+                yield orjson.dumps(jsonable_encoder(event)) + b"\n"
+        except Exception as e:
+            logger.error(f"Error streaming roadmap: {str(e)}")
+            yield orjson.dumps({"event": "error", "detail": str(e)}) + b"\n"
+        finally:
+            db.close()
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @app.post("/agent/milestone/complete")
 async def complete_milestone(
     request: MilestoneCompleteRequest,
@@ -211,6 +370,8 @@ async def complete_milestone(
 ):
     """Mark a milestone as completed."""
     try:
+        from services import CareerMentorService
+        
         service = CareerMentorService(db)
         success = await service.complete_milestone(
             user_id=request.user_id,
@@ -241,6 +402,8 @@ async def log_application_outcome(
         # Ensure user profile exists
         ensure_user_profile(db, request.user_id)
         
+        from services import CareerMentorService
+        
         service = CareerMentorService(db)
         app_id = await service.log_application_outcome(
             user_id=request.user_id,
@@ -277,6 +440,8 @@ async def get_weekly_progress(
         week_offset: Weeks back from current (0 = this week, 1 = last week)
     """
     try:
+        from services import CareerMentorService
+        
         service = CareerMentorService(db)
         progress = await service.get_weekly_progress(user_id, week_offset)
         
@@ -309,62 +474,44 @@ async def parse_resume(
     """
     Parse resume and extract structured information.
     
-    Accepts PDF or DOCX files.
+    Accepts PDF or DOCX files up to RESUME_MAX_UPLOAD_BYTES. The type is
+    detected from the file content, not the client's Content-Type.
+    
+    The parsed resume is returned as soon as extraction finishes; the
+    profile update runs as a background task whose progress is available
+    from /agent/tasks/{enrichment_task_id}.
     """
+    spooled = None
     try:
-        from resume_parser import resume_parser
+        # Stream the upload to a size-capped temp file instead of reading it into memory
+        try:
+            spooled = await spool_upload(file, settings.RESUME_MAX_UPLOAD_BYTES)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
         # Validate file type
-        allowed_types = ['application/pdf', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']
-        if file.content_type not in allowed_types:
+        file_type = sniff_mime(spooled)
+        if file_type not in (PDF_MIME, DOCX_MIME):
             raise HTTPException(
                 status_code=400,
-                detail=f"Unsupported file type. Allowed: PDF, DOCX. Got: {file.content_type}"
+                detail=f"Unsupported file type. Allowed: PDF, DOCX. Got: {file_type or 'empty file'}"
             )
         
-        # Read file content
-        file_content = await file.read()
+        from resume_parser import resume_parser
+        from services import enrich_profile_from_resume
         
         # Parse resume
-        parsed_data = await resume_parser.parse_resume(file_content, file.content_type)
+        parsed_data = await resume_parser.parse_resume_file(spooled, file_type)
         
-        # Ensure user profile exists
-        ensure_user_profile(db, user_id)
-        
-        # Update user profile with extracted skills and resume info
-        profile_update = {}
-        
-        if parsed_data.get('skills'):
-            # Overwrite skills with new data from resume
-            new_skills_list = [
-                {"name": skill, "level": "intermediate", "verified": True}
-                for skill in parsed_data['skills']
-            ]
-            profile_update["skills"] = new_skills_list
-            
-            # Infer best fit role if not set
-            current_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-            if not current_profile or not current_profile.target_role:
-                from graph.tools import get_tools
-                tools = get_tools(db)
-                # Temporarily save skills to infer role
-                current_profile.skills = new_skills_list
-                db.commit() 
-                
-                best_fit_role = await tools.infer_best_fit_role(user_id)
-                profile_update["target_role"] = best_fit_role
-            
-        # Update resume info if file_id provided
-        if resume_file_id:
-            profile_update["resume_filename"] = file.filename
-            profile_update["resume_file_id"] = resume_file_id
-            
-        if profile_update:
-            db.query(UserProfile).filter(UserProfile.user_id == user_id).update(
-                profile_update,
-                synchronize_session=False
-            )
-            db.commit()
+        # Profile update and role inference (another LLM call) happen after the response
+        parsed_data["enrichment_task_id"] = await task_queue.submit(
+            "resume_enrichment",
+            user_id,
+            enrich_profile_from_resume,
+            skills=parsed_data.get('skills') or [],
+            resume_filename=file.filename,
+            resume_file_id=resume_file_id
+        )
         
         logger.info(f"Successfully parsed resume for user {user_id}")
         return parsed_data
@@ -374,6 +521,22 @@ async def parse_resume(
     except Exception as e:
         logger.error(f"Error parsing resume: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if spooled is not None:
+            spooled.close()
+
+
+@app.get("/agent/tasks/{task_id}", response_model=BackgroundTaskStatus)
+async def get_task_status(
+    task_id: str,
+    user_id: str,
+    db: Session = Depends(get_db)
+):
+    """Poll a background task, e.g. the profile update after resume parsing."""
+    task = task_queue.get(db, task_id)
+    if not task or task["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
 
 
 @app.post("/agent/jobs/recommend")
@@ -479,6 +642,8 @@ async def start_interview(
 ):
     """Start a new AI mock interview session."""
     try:
+        from interview_agent import get_interview_agent
+        
         agent = get_interview_agent(db)
         return await agent.start_session(request)
     except Exception as e:
@@ -492,6 +657,8 @@ async def submit_interview_answer(
 ):
     """Submit an answer and get feedback/next question."""
     try:
+        from interview_agent import get_interview_agent
+        
         agent = get_interview_agent(db)
         return await agent.submit_answer(request.session_id, request.answer)
     except Exception as e:
@@ -505,6 +672,8 @@ async def get_interview_report(
 ):
     """Get final report for a completed session."""
     try:
+        from interview_agent import get_interview_agent
+        
         agent = get_interview_agent(db)
         return await agent.generate_final_report(session_id)
     except Exception as e:
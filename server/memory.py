@@ -1,24 +1,85 @@
 """Long-term memory system for the career mentor agent."""
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import json
+import time
 import numpy as np
 from sqlalchemy.orm import Session
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
 from database import Memory, UserProfile
+from stats import user_stats
 from config import settings
+from metrics import registry
+import telemetry
+
+EMBEDDING_LATENCY = registry.histogram(
+    "embedding_request_duration_seconds", "Embedding provider call latency", ["call_site"]
+)
+EMBEDDING_REQUESTS = registry.counter(
+    "embedding_requests_total", "Embedding provider calls by call site and outcome", ["call_site", "outcome"]
+)
+RETRIEVAL_CANDIDATES = registry.histogram(
+    "memory_retrieval_candidates",
+    "Memories per retrieval: scored against the query, and above the similarity threshold",
+    ["stage"],
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+
+
+@contextmanager
+def embedding_call(call_site: str, texts: int = 1) -> Iterator[Any]:
+    """Time an embedding request and trace it as an `embedding` span."""
+    started_at = time.perf_counter()
+    with telemetry.span("embedding") as embedding_span:
+        if embedding_span.is_recording():
+            embedding_span.set_attributes({
+                "embedding.call_site": call_site,
+                "embedding.model": settings.GEMINI_EMBEDDING_MODEL,
+                "embedding.texts": texts,
+            })
+        try:
+            yield embedding_span
+        except Exception:
+            EMBEDDING_REQUESTS.inc(call_site=call_site, outcome="error")
+            raise
+        else:
+            EMBEDDING_REQUESTS.inc(call_site=call_site, outcome="ok")
+        finally:
+            EMBEDDING_LATENCY.observe(time.perf_counter() - started_at, call_site=call_site)
 
 
 class MemoryManager:
     """Manages semantic and episodic memory for users."""
     
     def __init__(self):
-        """Initialize memory manager with embeddings."""
-        self.embedding_client = GoogleGenerativeAIEmbeddings(
-            model=settings.GEMINI_EMBEDDING_MODEL,
-            google_api_key=settings.GOOGLE_API_KEY
-        )
+        """Initialize memory manager; the embeddings client is built on first use."""
+        self._embedding_client = None
+    
+    @property
+    def embedding_client(self):
+        """
+        Shared Gemini embeddings client.
+        
+        Created on first use so importing this module stays cheap and does
+        not need GOOGLE_API_KEY. Without a key this raises, and callers fall
+        back as they do for any embedding failure.
+        """
+        if self._embedding_client is None:
+            if not settings.GOOGLE_API_KEY:
+                raise RuntimeError("GOOGLE_API_KEY is not set; embeddings are unavailable")
+            from langchain_google_genai import GoogleGenerativeAIEmbeddings
+            
+            self._embedding_client = GoogleGenerativeAIEmbeddings(
+                model=settings.GEMINI_EMBEDDING_MODEL,
+                google_api_key=settings.GOOGLE_API_KEY,
+                base_url=settings.GEMINI_BASE_URL or None
+            )
+        return self._embedding_client
+    
+    @embedding_client.setter
+    def embedding_client(self, client) -> None:
+        self._embedding_client = client
     
     async def add_memory(
         self,
@@ -48,24 +109,29 @@ class MemoryManager:
         # Generate embedding for semantic search (with fallback)
         try:
             # LangChain's Google embeddings return a list of floats
-            embedding = self.embedding_client.embed_query(content)
+            with embedding_call("memory_write"):
+                embedding = await self.embedding_client.aembed_query(content)
         except Exception as e:
             # If embedding fails (e.g., quota), use empty embedding
             print(f"Warning: Failed to generate embedding: {str(e)[:100]}")
             embedding = []
         
+        created_at = datetime.utcnow()
         memory = Memory(
-            id=f"{user_id}_{datetime.utcnow().timestamp()}",
+            id=f"{user_id}_{created_at.timestamp()}",
             user_id=user_id,
             content=content,
             memory_type=memory_type,
             embedding=embedding,
             importance=importance,
             tags=tags or [],
-            meta_data=metadata or {}  # Changed from metadata to meta_data
+            meta_data=metadata or {},  # Changed from metadata to meta_data
+            created_at=created_at
         )
         
         db.add(memory)
+        # Keep dashboard counters in the same transaction
+        user_stats.record_memory(db, user_id, memory_type, importance, memory.created_at)
         db.commit()
         db.refresh(memory)
         
@@ -96,7 +162,8 @@ class MemoryManager:
         """
         # Generate query embedding (with fallback)
         try:
-            query_embedding = self.embedding_client.embed_query(query)
+            with embedding_call("memory_query"):
+                query_embedding = await self.embedding_client.aembed_query(query)
         except Exception as e:
             # If embedding fails, return recent memories instead
             print(f"Warning: Failed to generate query embedding, using recency: {str(e)[:100]}")
@@ -107,8 +174,8 @@ class MemoryManager:
                 query_obj = query_obj.filter(Memory.importance >= min_importance)
             return query_obj.order_by(Memory.created_at.desc()).limit(top_k).all()
         
-        # Get all user memories
-        query_obj = db.query(Memory).filter(Memory.user_id == user_id)
+        # Score on a lightweight (id, embedding) projection
+        query_obj = db.query(Memory.id, Memory.embedding).filter(Memory.user_id == user_id)
         
         if memory_type:
             query_obj = query_obj.filter(Memory.memory_type == memory_type)
@@ -116,22 +183,30 @@ class MemoryManager:
         if min_importance > 0:
             query_obj = query_obj.filter(Memory.importance >= min_importance)
         
-        memories = query_obj.all()
+        candidates = query_obj.all()
+        RETRIEVAL_CANDIDATES.observe(len(candidates), stage="scanned")
         
-        if not memories:
+        if not candidates:
             return []
         
         # Calculate similarity scores
-        scored_memories = []
-        for memory in memories:
-            if memory.embedding:
-                similarity = self._cosine_similarity(query_embedding, memory.embedding)
+        scored_ids = []
+        for memory_id, embedding in candidates:
+            if embedding:
+                similarity = self._cosine_similarity(query_embedding, embedding)
                 if similarity >= settings.MEMORY_SIMILARITY_THRESHOLD:
-                    scored_memories.append((similarity, memory))
+                    scored_ids.append((similarity, memory_id))
+        
+        RETRIEVAL_CANDIDATES.observe(len(scored_ids), stage="matched")
         
-        # Sort by similarity and return top_k
-        scored_memories.sort(key=lambda x: x[0], reverse=True)
-        return [mem for _, mem in scored_memories[:top_k]]
+        # Sort by similarity and load only the top_k rows (embedding stays deferred)
+        scored_ids.sort(key=lambda x: x[0], reverse=True)
+        top_ids = [memory_id for _, memory_id in scored_ids[:top_k]]
+        if not top_ids:
+            return []
+        
+        rows = {m.id: m for m in db.query(Memory).filter(Memory.id.in_(top_ids)).all()}
+        return [rows[memory_id] for memory_id in top_ids if memory_id in rows]
     
     def get_recent_memories(
         self,
@@ -161,48 +236,6 @@ class MemoryManager:
             Memory.importance >= min_importance
         ).order_by(Memory.importance.desc()).limit(limit).all()
     
-    async def consolidate_memories(
-        self,
-        db: Session,
-        user_id: str
-    ) -> Dict[str, Any]:
-        """
-        Consolidate and summarize user memories.
-        
-        This creates a compressed representation of key patterns,
-        skills, preferences, and feedback over time.
-        
-        Returns:
-            Dictionary with consolidated insights
-        """
-        # Get all memories
-        all_memories = db.query(Memory).filter(Memory.user_id == user_id).all()
-        
-        if not all_memories:
-            return {"summary": "No memories yet", "insights": []}
-        
-        # Group by type
-        by_type = {}
-        for mem in all_memories:
-            if mem.memory_type not in by_type:
-                by_type[mem.memory_type] = []
-            by_type[mem.memory_type].append(mem.content)
-        
-        # Extract patterns
-        feedback_items = by_type.get("feedback", [])
-        episodic_items = by_type.get("episodic", [])
-        
-        return {
-            "total_memories": len(all_memories),
-            "by_type": {k: len(v) for k, v in by_type.items()},
-            "recent_feedback_count": len([m for m in all_memories 
-                                         if m.memory_type == "feedback" 
-                                         and m.created_at > datetime.utcnow() - timedelta(days=30)]),
-            "high_importance_count": len([m for m in all_memories if m.importance >= 0.7]),
-            "oldest_memory": min(m.created_at for m in all_memories),
-            "newest_memory": max(m.created_at for m in all_memories)
-        }
-    
     @staticmethod
     def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors."""
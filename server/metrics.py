@@ -0,0 +1,362 @@
+"""Lightweight in-process metrics registry (counters, gauges, histograms)."""
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
+import asyncio
+import glob
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[str, ...]
+
+
+class _Metric:
+    """Base class holding name, help text and label names."""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback at collection time."""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Any]] = None,
+        aggregate: str = "sum"
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._callback = callback
+        # How workers' values combine in multiprocess mode: "sum" or "max"
+        self.aggregate = aggregate
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        if self._callback is not None:
+            result = self._callback()
+            # Callbacks return a number, or {label tuple: number} for labelled gauges
+            if isinstance(result, dict):
+                return [(tuple(str(v) for v in key), float(val)) for key, val in result.items()]
+            return [((), float(result))]
+        with self._lock:
+            return list(self._values.items())
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with sum and count per label set."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += 1
+            state[-1] += value
+
+    def count(self, **labels) -> float:
+        state = self._values.get(self._key(labels))
+        return state[-2] if state else 0.0
+
+    def sum(self, **labels) -> float:
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0.0
+
+    def samples(self) -> List[Tuple[LabelKey, List[float]]]:
+        with self._lock:
+            return [(key, list(state)) for key, state in self._values.items()]
+
+
+class MetricsRegistry:
+    """Holds every metric defined by the application, keyed by name."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Modules may be re-imported (reload, tests); reuse the first definition
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Any]] = None,
+        aggregate: str = "sum"
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback, aggregate))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def metrics(self) -> List[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current values of every metric as plain JSON-serializable data.
+
+        Callback gauges are evaluated here; a failing callback is skipped.
+        """
+        metrics = []
+        for metric in self.metrics():
+            try:
+                samples = [[list(key), value] for key, value in metric.samples()]
+            except Exception as e:
+                logger.warning(f"Metric {metric.name} collection failed: {str(e)[:100]}")
+                continue
+            entry = {
+                "name": metric.name,
+                "kind": metric.kind,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "samples": samples,
+            }
+            if isinstance(metric, Histogram):
+                entry["buckets"] = list(metric.buckets)
+            elif isinstance(metric, Gauge) and metric.aggregate != "sum":
+                entry["aggregate"] = metric.aggregate
+            metrics.append(entry)
+        return {"pid": os.getpid(), "written_at": time.time(), "metrics": metrics}
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]], gauge_max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Combine per-worker snapshots into one set of metrics.
+
+    Counters and histograms are summed, so totals from workers that have
+    exited are kept. Gauges are summed too (in-flight requests, checked-out
+    connections, sessions), or maxed when registered with aggregate="max"
+    (per-worker quantiles), but only from snapshots newer than
+    `gauge_max_age` seconds: a dead worker holds no connections.
+    """
+    now = time.time()
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        gauges_fresh = gauge_max_age is None or now - snapshot.get("written_at", 0) <= gauge_max_age
+        for entry in snapshot.get("metrics", []):
+            if entry["kind"] == "gauge" and not gauges_fresh:
+                continue
+            target = merged.get(entry["name"])
+            if target is None:
+                target = dict(entry, samples={})
+                merged[entry["name"]] = target
+            for labels, value in entry["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                elif entry.get("aggregate") == "max":
+                    target["samples"][key] = max(current, value)
+                else:
+                    target["samples"][key] = current + value
+    return list(merged.values())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def render_prometheus(metrics: List[Dict[str, Any]]) -> str:
+    """Render merged metrics in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for entry in sorted(metrics, key=lambda m: m["name"]):
+        name, names = entry["name"], entry["labelnames"]
+        samples = entry["samples"]
+        if isinstance(samples, list):
+            samples = {tuple(labels): value for labels, value in samples}
+        lines.append(f"# HELP {name} {entry['help']}")
+        lines.append(f"# TYPE {name} {entry['kind']}")
+        for key in sorted(samples):
+            value = samples[key]
+            if entry["kind"] == "histogram":
+                # state = [cumulative bucket counts..., count, sum]
+                for bound, count in zip(entry["buckets"], value):
+                    lines.append(f"{name}_bucket{_labels(names, key, ('le', _number(bound)))} {_number(count)}")
+                lines.append(f"{name}_bucket{_labels(names, key, ('le', '+Inf'))} {_number(value[-2])}")
+                lines.append(f"{name}_sum{_labels(names, key)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(names, key)} {_number(value[-2])}")
+            else:
+                lines.append(f"{name}{_labels(names, key)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MultiprocessMetrics:
+    """
+    Share metrics between worker processes through a directory.
+
+    Each worker periodically writes its registry snapshot to
+    `<directory>/metrics-<pid>.json`; whichever worker serves /metrics
+    refreshes its own file and merges all of them. The directory should be
+    emptied before the server starts so totals from a previous deployment
+    are not carried over.
+    """
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+
+    def write(self) -> None:
+        """Atomically replace this worker's snapshot file."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(registry.snapshot(), f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def collect(self) -> List[Dict[str, Any]]:
+        """Merged metrics of every worker, including this one's current values."""
+        self.write()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                # Being replaced or removed right now; picked up on the next scrape
+                continue
+        return merge_snapshots(snapshots, gauge_max_age=self.interval * 3)
+
+    def start(self) -> None:
+        """Begin periodic snapshot writes on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and leave a final snapshot behind."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.write()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.write)
+            except Exception as e:
+                logger.warning(f"Metrics snapshot write failed: {str(e)[:100]}")
+            await asyncio.sleep(self.interval)
+
+
+# Singleton instance
+registry = MetricsRegistry()
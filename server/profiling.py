@@ -0,0 +1,292 @@
+"""Opt-in per-request stack sampling with flamegraph output."""
+from typing import Any, Dict, List, Optional
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as StackCounter
+from datetime import datetime
+
+from config import settings
+from http_metrics import route_template
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PROFILED_REQUESTS = registry.counter(
+    "profiled_requests_total", "Requests profiled by the sampling profiler", ["trigger"]
+)
+BLOCKING_CALLS = registry.counter(
+    "profile_blocking_calls_total",
+    "Synchronous stretches inside profiled requests that held the event loop past the threshold",
+    ["site"]
+)
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_HEADER = "x-profile"
+
+
+def frame_label(frame) -> str:
+    """`function (path:line)` with paths shortened to the app or the installed package."""
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(SERVER_DIR):
+        filename = os.path.relpath(filename, SERVER_DIR)
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    # ';' separates frames in collapsed stacks
+    return f"{code.co_name} ({filename}:{frame.f_lineno})".replace(";", ":")
+
+
+def frame_stack(frame) -> List[Any]:
+    """Frames from the outermost caller down to `frame`."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def is_app_frame(frame) -> bool:
+    """Frame from this codebase, excluding the profiler itself."""
+    filename = frame.f_code.co_filename
+    return (
+        filename.startswith(SERVER_DIR)
+        and "site-packages" not in filename
+        and filename != __file__
+    )
+
+
+def blocking_site(frames: List[Any]) -> str:
+    """
+    The innermost app frame of a stack, i.e. the line of our code that made
+    the blocking call (`job_recommender.py:175 _search_jsearch_jobs`).
+    """
+    for frame in reversed(frames):
+        if is_app_frame(frame):
+            return (
+                f"{os.path.relpath(frame.f_code.co_filename, SERVER_DIR)}:{frame.f_lineno} "
+                f"{frame.f_code.co_name}"
+            )
+    return frame_label(frames[-1]) if frames else "<unknown>"
+
+
+class RequestProfile:
+    """Samples and blocked stretches collected for one request."""
+
+    def __init__(self, profile_id: str, thread_id: int, root_frame, interval: float, blocked_threshold: float):
+        self.profile_id = profile_id
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.blocked_threshold = blocked_threshold
+        self.started_at = time.perf_counter()
+        self.stacks = StackCounter()
+        self.samples = 0
+        self.blocked: List[Dict[str, Any]] = []
+        # Current run of consecutive samples with this request on the loop thread
+        self._run_start: Optional[float] = None
+        self._run_last: Optional[float] = None
+        self._run_stacks = StackCounter()
+        self._run_sites: Dict[str, str] = {}
+
+    def add_sample(self, frames: List[Any], now: float) -> None:
+        """Record a sample taken while this request's code was executing."""
+        collapsed = ";".join(frame_label(frame) for frame in frames)
+        self.stacks[collapsed] += 1
+        self.samples += 1
+
+        # A gap of more than ~1.5 intervals means the loop ran something else in between
+        if self._run_last is None or now - self._run_last > self.interval * 1.5:
+            self.close_run()
+            self._run_start = now
+        self._run_last = now
+        self._run_stacks[collapsed] += 1
+        if collapsed not in self._run_sites:
+            self._run_sites[collapsed] = blocking_site(frames)
+
+    def close_run(self) -> None:
+        """End the current run; keep it if it held the loop past the threshold."""
+        if self._run_start is not None:
+            held = self._run_last - self._run_start + self.interval
+            if held >= self.blocked_threshold:
+                stack, _ = self._run_stacks.most_common(1)[0]
+                site = self._run_sites[stack]
+                self.blocked.append({"site": site, "held_ms": round(held * 1000, 1), "stack": stack})
+                BLOCKING_CALLS.inc(site=site)
+        self._run_start = self._run_last = None
+        self._run_stacks = StackCounter()
+        self._run_sites = {}
+
+
+class StackSampler:
+    """
+    One daemon thread that periodically reads the stacks of threads running
+    profiled requests (`sys._current_frames`). A sample is attributed to a
+    request when that request's middleware frame is on the stack, so
+    concurrent requests on the same event loop do not mix.
+
+    The thread only runs while at least one request is being profiled.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: Dict[str, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles[profile.profile_id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+
+    def unregister(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.pop(profile.profile_id, None)
+        profile.close_run()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                profiles = list(self._profiles.values())
+                if not profiles:
+                    self._thread = None
+                    return
+            now = time.perf_counter()
+            current = sys._current_frames()
+            for profile in profiles:
+                frame = current.get(profile.thread_id)
+                if frame is None:
+                    continue
+                frames = frame_stack(frame)
+                if any(f is profile.root_frame for f in frames):
+                    with self._lock:
+                        if profile.profile_id in self._profiles:
+                            profile.add_sample(frames, now)
+            del current, frame
+            time.sleep(self.interval)
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", value).strip("_")[:60] or "root"
+
+
+def write_profile(directory: str, name: str, profile: RequestProfile, summary: Dict[str, Any]) -> str:
+    """Write `<name>.collapsed` (flamegraph.pl / speedscope input) and `<name>.json`."""
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, name)
+    with open(base + ".collapsed", "w") as f:
+        for stack, count in profile.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(base + ".json", "w") as f:
+        json.dump(summary, f, indent=2)
+    return base + ".collapsed"
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request when it carries `X-Profile: <PROFILING_HEADER_TOKEN>`
+    or is picked by PROFILING_SAMPLE_RATE.
+
+    Writes a collapsed-stack file per profiled request to PROFILING_OUTPUT_DIR
+    and returns its id in `X-Profile-Id`. Stretches where the request's code
+    kept the event loop busy for PROFILING_BLOCKED_THRESHOLD_MS or more
+    (a sync HTTP call, PDF parsing, a slow query) are listed in the JSON
+    summary and logged with the app line that made the call.
+
+    Only code running on the event loop thread is sampled; `def` endpoints
+    and `asyncio.to_thread` work run elsewhere and do not block the loop.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000)
+        self.token = settings.PROFILING_HEADER_TOKEN.encode()
+
+    def _trigger(self, scope) -> Optional[str]:
+        if self.token:
+            for key, value in scope.get("headers", ()):
+                if key == PROFILE_HEADER.encode() and hmac.compare_digest(value, self.token):
+                    return "header"
+        if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        profile = RequestProfile(
+            profile_id,
+            threading.get_ident(),
+            sys._getframe(),
+            self.sampler.interval,
+            settings.PROFILING_BLOCKED_THRESHOLD_MS / 1000
+        )
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        PROFILED_REQUESTS.inc(trigger=trigger)
+        self.sampler.register(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.sampler.unregister(profile)
+            await self._report(scope, profile, status, trigger)
+
+    async def _report(self, scope, profile: RequestProfile, status: int, trigger: str) -> None:
+        duration = time.perf_counter() - profile.started_at
+        route = route_template(scope)
+        summary = {
+            "profile_id": profile.profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": status,
+            "trigger": trigger,
+            "started_at": datetime.utcnow().isoformat(),
+            "duration_ms": round(duration * 1000, 1),
+            "interval_ms": settings.PROFILING_INTERVAL_MS,
+            "samples": profile.samples,
+            # Time the request's own code held the event loop (approximate)
+            "on_loop_ms": round(profile.samples * profile.interval * 1000, 1),
+            "blocked": profile.blocked,
+        }
+        name = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{scope['method']}-{_slug(route)}-{profile.profile_id}"
+        try:
+            path = await asyncio.to_thread(write_profile, settings.PROFILING_OUTPUT_DIR, name, profile, summary)
+        except OSError as e:
+            logger.warning(f"Could not write profile {profile.profile_id}: {e}")
+            return
+
+        if profile.blocked:
+            worst = max(profile.blocked, key=lambda episode: episode["held_ms"])
+            logger.warning(
+                f"{scope['method']} {route} blocked the event loop {len(profile.blocked)}x "
+                f"(worst {worst['held_ms']}ms at {worst['site']}); profile {path}"
+            )
+        else:
+            logger.info(f"Profiled {scope['method']} {route} in {summary['duration_ms']}ms; profile {path}")
@@ -1,68 +1,123 @@
 """Resume parsing and skills extraction module."""
-from typing import Dict, Any, List, Optional
+from typing import BinaryIO, Dict, Any, List, Optional, Tuple, Union
+import asyncio
 import io
+import mmap
 import re
 from datetime import datetime
 
-try:
-    import PyPDF2
-except ImportError:
-    PyPDF2 = None
+from llm_gateway import llm_gateway
+from schemas import ResumeExtraction
+from structured_output import ainvoke_structured, StructuredOutputError
+from resume_sections import segment, compact
+from skills_taxonomy import skill_taxonomy
+from config import settings
 
-try:
-    from docx import Document
-except ImportError:
-    Document = None
+# JSON shape of each extracted field; prompts list only the fields they ask for
+_FIELD_SHAPES = {
+    "name": '"name": "Full Name"',
+    "email": '"email": "email@example.com"',
+    "phone": '"phone": "phone number or null"',
+    "education": '"education": [{"degree": "", "institution": "", "year": "", "field": ""}]',
+    "experience": '"experience": [{"title": "", "company": "", "duration": "Start - End", "description": "brief"}]',
+    "skills": '"skills": ["skill1", "skill2"]',
+    "certifications": '"certifications": ["cert1"]',
+    "projects": '"projects": [{"name": "", "description": "brief", "technologies": ["tech1"]}]',
+}
 
-from langchain_groq import ChatGroq
-from config import settings
+# Per-section extraction: group -> (sections it reads, fields it returns)
+_SECTION_GROUPS = {
+    "contact": (("header", "contact", "summary"), ("name", "email", "phone")),
+    "experience": (("experience", "volunteering"), ("experience", "skills")),
+    "education": (("education",), ("education",)),
+    "projects": (("projects",), ("projects", "skills")),
+    "skills": (("skills", "certifications", "awards", "publications", "languages"), ("skills", "certifications")),
+}
+
+# "Technical Skills:", "Data:" and similar short labels in front of a skill list
+_SKILL_LINE_LABEL = re.compile(r"^[^:]{1,30}:\s*")
+_LIST_SEPARATORS = re.compile(r"\s*(?:[,;|\u2022\u00b7]|\band\b|\s-\s)\s*", re.IGNORECASE)
+
+
+def skill_prepass(text: str) -> Tuple[str, List[str]]:
+    """
+    Detect skills locally in one scan and shrink the text sent to the LLM.
+
+    Lines that are nothing but delimited lists of known skills (typically
+    the Skills section) are removed; their content is carried by the
+    returned skill list instead. Lines with any unrecognized item are kept,
+    so nothing the taxonomy does not know is lost.
+
+    Returns:
+        (text without skill-list lines, canonical skill names found anywhere)
+    """
+    names: List[str] = []
+    kept = []
+    for line in text.splitlines():
+        names.extend(skill_taxonomy.get(skill_id)["name"] for _, _, skill_id in skill_taxonomy.scan(line))
+        items = _list_items(line)
+        if len(items) >= 2 and all(skill_taxonomy.resolve(item) for item in items):
+            # Whole items also catch names free-text scanning skips ("Go", "R")
+            names.extend(items)
+        else:
+            kept.append(line)
+    return "\n".join(kept), skill_taxonomy.canonicalize(names)
+
+
+def _list_items(line: str) -> List[str]:
+    body = _SKILL_LINE_LABEL.sub("", line, count=1)
+    return [item.strip(" .:()") for item in _LIST_SEPARATORS.split(body) if item and item.strip(" .:()")]
+
+
+class _MappedFile(mmap.mmap):
+    """Read-only memory map usable where a file object is expected (e.g. zipfile)."""
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
 
 
 class ResumeParser:
     """Extract structured information from resumes."""
     
     def __init__(self):
-        self.llm = ChatGroq(
-            model_name=settings.GROQ_MODEL,
-            api_key=settings.GROQ_API_KEY,
-            temperature=0
-        )
+        self.llm = llm_gateway.chat(temperature=0, call_site="resume_parser")
     
-    def extract_text_from_pdf(self, file_content: bytes) -> str:
-        """Extract text from PDF file."""
-        if not PyPDF2:
+    def extract_text_from_pdf(self, file_content: Union[bytes, BinaryIO]) -> str:
+        """Extract text from PDF bytes or a seekable binary stream."""
+        # Imported on first use; the parsers are only needed for uploads
+        try:
+            import PyPDF2
+        except ImportError:
             raise ImportError("PyPDF2 not installed. Run: pip install PyPDF2")
         
         try:
-            pdf_file = io.BytesIO(file_content)
+            pdf_file = io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
             pdf_reader = PyPDF2.PdfReader(pdf_file)
             
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text.strip()
+            pages = [page.extract_text() or "" for page in pdf_reader.pages]
+            return "\n".join(pages).strip()
         except Exception as e:
             raise ValueError(f"Failed to parse PDF: {str(e)}")
     
-    def extract_text_from_docx(self, file_content: bytes) -> str:
-        """Extract text from DOCX file."""
-        if not Document:
+    def extract_text_from_docx(self, file_content: Union[bytes, BinaryIO]) -> str:
+        """Extract text from DOCX bytes or a seekable binary stream."""
+        try:
+            from docx import Document
+        except ImportError:
             raise ImportError("python-docx not installed. Run: pip install python-docx")
         
         try:
-            docx_file = io.BytesIO(file_content)
+            docx_file = io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
             doc = Document(docx_file)
             
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            return text.strip()
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
         except Exception as e:
             raise ValueError(f"Failed to parse DOCX: {str(e)}")
     
-    def extract_text(self, file_content: bytes, file_type: str) -> str:
+    def extract_text(self, file_content: Union[bytes, BinaryIO], file_type: str) -> str:
         """Extract text based on file type."""
         file_type = file_type.lower()
         
@@ -86,63 +141,69 @@ class ResumeParser:
         """
         # Extract text
         text = self.extract_text(file_content, file_type)
+        return await self.parse_text(text)
+    
+    def extract_text_from_file(self, file: BinaryIO, file_type: str) -> str:
+        """
+        Extract text from an on-disk file through a read-only memory map.
+        
+        The parsers read pages straight from the page cache instead of a
+        private in-memory copy of the whole upload.
+        """
+        with _MappedFile(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return self.extract_text(mapped, file_type)
+    
+    async def parse_resume_file(self, file: BinaryIO, file_type: str) -> Dict[str, Any]:
+        """
+        Parse a resume stored in a (temporary) file.
+        
+        Args:
+            file: Binary file with a real descriptor, e.g. from uploads.spool_upload
+            file_type: Sniffed MIME type
+        
+        Returns:
+            Structured resume data
+        """
+        # PDF/DOCX decoding is CPU-bound; keep it off the event loop
+        text = await asyncio.to_thread(self.extract_text_from_file, file, file_type)
+        return await self.parse_text(text)
+    
+    async def parse_text(self, text: str) -> Dict[str, Any]:
+        """
+        Extract structured information from resume text.
+        
+        Args:
+            text: Plain resume text
+        
+        Returns:
+            Structured resume data
+        """
+        detected_skills: List[str] = []
+        llm_text = text
+        skills_note = ""
+        if settings.RESUME_SKILL_PREPASS:
+            llm_text, detected_skills = skill_prepass(text)
+            if detected_skills:
+                skills_note = (
+                    f"Skills already detected (do not repeat them; list only other skills in \"skills\"): "
+                    f"{', '.join(detected_skills)}\n\n"
+                )
+        
+        # Send headed, de-noised sections within a token budget instead of raw text
+        sections = segment(llm_text)
         
-        # Use LLM to extract structured data
-        prompt = f"""Extract structured information from this resume. Return ONLY valid JSON with this exact structure:
-
-{{
-    "name": "Full Name",
-    "email": "email@example.com",
-    "phone": "phone number or null",
-    "education": [
-        {{
-            "degree": "Degree Name",
-            "institution": "University Name",
-            "year": "Graduation Year",
-            "field": "Field of Study"
-        }}
-    ],
-    "experience": [
-        {{
-            "title": "Job Title",
-            "company": "Company Name",
-            "duration": "Start - End",
-            "description": "Brief description"
-        }}
-    ],
-    "skills": ["skill1", "skill2", "skill3"],
-    "certifications": ["cert1", "cert2"],
-    "projects": [
-        {{
-            "name": "Project Name",
-            "description": "Brief description",
-            "technologies": ["tech1", "tech2"]
-        }}
-    ]
-}}
-
-Resume text:
-{text}
-
-Return ONLY the JSON object, no additional text."""
-
-        response = await self.llm.ainvoke(prompt)
-        
-        # Parse LLM response
-        import json
         try:
-            # Extract JSON from response
-            if hasattr(response, 'content'):
-                response_text = response.content if isinstance(response.content, str) else str(response.content)
-            else:
-                response_text = str(response)
-            
-            # Find JSON object in response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                parsed_data = json.loads(json_match.group())
+            if settings.RESUME_PARALLEL_SECTIONS and len(sections) > 1:
+                extraction = await self._extract_by_section(sections, skills_note)
             else:
-                parsed_data = json.loads(response_text)
+                prompt = self._extraction_prompt(
+                    list(_FIELD_SHAPES),
+                    compact(sections, settings.RESUME_LLM_TOKEN_BUDGET),
+                    skills_note
+                )
+                extraction = await ainvoke_structured(self.llm, prompt, ResumeExtraction)
+            parsed_data = extraction.model_dump()
+            parsed_data['skills'] = skill_taxonomy.canonicalize(detected_skills + parsed_data['skills'])
             
             # Add metadata
             parsed_data['parsed_at'] = datetime.utcnow().isoformat()
@@ -150,10 +211,57 @@ Return ONLY the JSON object, no additional text."""
             
             return parsed_data
         
-        except json.JSONDecodeError as e:
+        except StructuredOutputError:
             # Fallback: extract basic info using regex
             return self._fallback_parse(text)
     
+    async def _extract_by_section(self, sections: List[Dict[str, str]], skills_note: str) -> ResumeExtraction:
+        """
+        Extract each group of sections with its own, smaller LLM call, in parallel.
+        
+        Groups that fail are left empty; if every group fails the first
+        error is raised so the caller can fall back.
+        """
+        calls = []
+        for group, (section_names, fields) in _SECTION_GROUPS.items():
+            group_sections = [section for section in sections if section["name"] in section_names]
+            if not group_sections:
+                continue
+            prompt = self._extraction_prompt(
+                list(fields),
+                compact(group_sections, settings.RESUME_LLM_TOKEN_BUDGET),
+                skills_note if "skills" in fields else ""
+            )
+            calls.append((fields, ainvoke_structured(self.llm, prompt, ResumeExtraction, call_site=f"resume_{group}")))
+        
+        results = await asyncio.gather(*(call for _, call in calls), return_exceptions=True)
+        
+        merged: Dict[str, Any] = {}
+        errors = []
+        for (fields, _), result in zip(calls, results):
+            if isinstance(result, Exception):
+                errors.append(result)
+                continue
+            for field in fields:
+                value = getattr(result, field)
+                if isinstance(value, list):
+                    merged.setdefault(field, []).extend(value)
+                elif value and not merged.get(field):
+                    merged[field] = value
+        
+        if errors and len(errors) == len(calls):
+            raise errors[0]
+        return ResumeExtraction(**merged)
+    
+    @staticmethod
+    def _extraction_prompt(fields: List[str], resume_text: str, skills_note: str = "") -> str:
+        shape = ",\n".join(_FIELD_SHAPES[field] for field in fields)
+        return f"""Extract structured information from this resume. Return ONLY a JSON object with this structure:
+{{{shape}}}
+
+{skills_note}Resume:
+{resume_text}"""
+    
     def _fallback_parse(self, text: str) -> Dict[str, Any]:
         """Fallback parsing using regex patterns."""
         # Extract email
@@ -164,19 +272,8 @@ Return ONLY the JSON object, no additional text."""
         phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
         phones = re.findall(phone_pattern, text)
         
-        # Extract skills (common programming languages and tools)
-        skill_keywords = [
-            'python', 'java', 'javascript', 'typescript', 'react', 'node',
-            'sql', 'mongodb', 'postgresql', 'docker', 'kubernetes', 'aws',
-            'git', 'html', 'css', 'angular', 'vue', 'django', 'flask',
-            'fastapi', 'spring', 'tensorflow', 'pytorch', 'pandas', 'numpy'
-        ]
-        
-        found_skills = []
-        text_lower = text.lower()
-        for skill in skill_keywords:
-            if skill in text_lower:
-                found_skills.append(skill.title())
+        # Extract skills in a single word-boundary-aware pass over the text
+        found_skills = [skill_taxonomy.get(skill_id)["name"] for skill_id in skill_taxonomy.extract(text)]
         
         return {
             "name": None,
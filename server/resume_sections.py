@@ -0,0 +1,187 @@
+"""Local resume segmentation and compaction ahead of LLM extraction."""
+from typing import Dict, List, Optional
+import re
+
+# Canonical section -> headings that introduce it (compared lowercase, punctuation stripped)
+SECTION_HEADINGS: Dict[str, tuple] = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about", "about me", "overview"),
+    "contact": ("contact", "contact information", "contact details", "personal details", "personal information"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience", "internships"),
+    "education": ("education", "academic background", "academics", "education and training",
+                  "qualifications", "academic qualifications"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "core competencies", "competencies",
+               "technologies", "tech stack", "tools", "tools and technologies", "skills and tools"),
+    "projects": ("projects", "personal projects", "selected projects", "side projects", "academic projects",
+                 "key projects", "open source", "open source contributions"),
+    "certifications": ("certifications", "certificates", "licenses and certifications",
+                       "licences and certifications", "courses", "training"),
+    "awards": ("awards", "honors", "honours", "achievements", "awards and honors", "accomplishments"),
+    "publications": ("publications", "research", "papers"),
+    "languages": ("languages", "spoken languages"),
+    "volunteering": ("volunteering", "volunteer experience", "volunteer work", "leadership", "activities"),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+    "references": ("references", "referees"),
+}
+
+# Sections that add tokens without helping extraction
+DROPPED_SECTIONS = {"interests", "references"}
+
+# Budget priority when a resume has to be truncated (earlier keeps more)
+SECTION_PRIORITY = ["header", "contact", "experience", "skills", "education", "projects",
+                    "certifications", "summary", "awards", "volunteering", "publications", "languages"]
+
+_HEADING_LOOKUP = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+_HEADING_STRIP = re.compile(r"[^a-z ]+")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_RULE_LINE = re.compile(r"^[\s\-_=*~•·|.]{3,}$")
+# "3", "Page 2", "1/3", and footers ending in "Page 1 of 2"
+_PAGE_MARKER = re.compile(
+    r"^(\s*(page\s*)?\d{1,2}(\s*(/|of)\s*\d{1,2})?|.{0,60}\bpage\s+\d{1,2}\s*(/|of)\s*\d{1,2})\s*$",
+    re.IGNORECASE
+)
+_BOILERPLATE = re.compile(
+    r"^\s*(references?\s+(are\s+)?available\s+(up)?on\s+request|curriculum\s+vitae|resume|résumé|cv)\s*\.?\s*$",
+    re.IGNORECASE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)."""
+    return (len(text) + 3) // 4
+
+
+def heading_name(line: str) -> Optional[str]:
+    """Canonical section name if the line is a section heading."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40 or len(stripped.split()) > 5:
+        return None
+    normalized = _HEADING_STRIP.sub(" ", stripped.lower().replace("&", " and "))
+    return _HEADING_LOOKUP.get(" ".join(normalized.split()))
+
+
+def clean_lines(text: str) -> List[str]:
+    """
+    Strip layout noise: page markers, rule lines, boilerplate phrases and
+    headers/footers repeated on every page. Blank-line runs collapse to one.
+    """
+    lines = [_SPACES.sub(" ", line).strip() for line in text.splitlines()]
+
+    counts: Dict[str, int] = {}
+    for line in lines:
+        if line and len(line) <= 80:
+            counts[line] = counts.get(line, 0) + 1
+
+    cleaned: List[str] = []
+    seen_repeated = set()
+    for line in lines:
+        if _RULE_LINE.match(line) or _PAGE_MARKER.match(line) or _BOILERPLATE.match(line):
+            continue
+        # Per-page headers/footers (name, contact line) are kept once
+        if line and counts.get(line, 0) > 1 and heading_name(line) is None:
+            if line in seen_repeated:
+                continue
+            seen_repeated.add(line)
+        if not line and (not cleaned or not cleaned[-1]):
+            continue
+        cleaned.append(line)
+    while cleaned and not cleaned[-1]:
+        cleaned.pop()
+    return cleaned
+
+
+def segment(text: str) -> List[Dict[str, str]]:
+    """
+    Split resume text into sections.
+
+    Text before the first recognized heading becomes the "header" section
+    (usually name and contact details). Repeated headings are merged.
+
+    Returns:
+        Sections in document order as {"name", "heading", "text"}
+    """
+    sections: List[Dict[str, str]] = []
+    by_name: Dict[str, Dict[str, str]] = {}
+    current = {"name": "header", "heading": "", "text": ""}
+    body: List[str] = []
+
+    def close():
+        content = "\n".join(body).strip()
+        if not content:
+            return
+        existing = by_name.get(current["name"])
+        if existing:
+            existing["text"] += "\n" + content
+        else:
+            current["text"] = content
+            by_name[current["name"]] = current
+            sections.append(current)
+
+    for line in clean_lines(text):
+        name = heading_name(line)
+        inline = ""
+        if not name and ":" in line[:40]:
+            # "Skills: Python, SQL" opens a section and carries its first line
+            label, inline = line.split(":", 1)
+            name = heading_name(label)
+        if name:
+            close()
+            current = {"name": name, "heading": line.split(":", 1)[0].strip(), "text": ""}
+            body = [inline.strip()] if inline.strip() else []
+        else:
+            body.append(line)
+    close()
+    return sections
+
+
+def compact(sections: List[Dict[str, str]], token_budget: int) -> str:
+    """
+    Render sections as a compact, token-budgeted document for the LLM.
+
+    Low-value sections are dropped. When the rest exceeds the budget,
+    small sections are kept whole and the remainder is shared between
+    larger ones, each truncated at a line boundary (keeping its first,
+    typically most recent, entries) in SECTION_PRIORITY order.
+    """
+    kept = [section for section in sections if section["name"] not in DROPPED_SECTIONS]
+    rendered = {id(section): _render(section) for section in kept}
+
+    allotment = {}
+    remaining = token_budget
+    by_size = sorted(kept, key=lambda section: estimate_tokens(rendered[id(section)]))
+    for i, section in enumerate(by_size):
+        share = remaining // (len(by_size) - i)
+        allotment[id(section)] = min(estimate_tokens(rendered[id(section)]), share)
+        remaining -= allotment[id(section)]
+
+    ordered = sorted(kept, key=lambda section: _priority(section["name"]))
+    parts = [_truncate(rendered[id(section)], allotment[id(section)]) for section in ordered]
+    return "\n\n".join(part for part in parts if part)
+
+
+def _render(section: Dict[str, str]) -> str:
+    if section["name"] == "header":
+        return section["text"]
+    return f"## {section['name'].upper()}\n{section['text']}"
+
+
+def _truncate(text: str, tokens: int) -> str:
+    if estimate_tokens(text) <= tokens:
+        return text
+    limit = tokens * 4
+    lines = []
+    used = 0
+    for line in text.split("\n"):
+        if used + len(line) + 1 > limit:
+            break
+        lines.append(line)
+        used += len(line) + 1
+    if not lines or (len(lines) == 1 and lines[0].startswith("## ")):
+        return ""
+    # Mark the cut so the model does not invent the rest
+    return "\n".join(lines + ["[...]"])
+
+
+def _priority(name: str) -> int:
+    return SECTION_PRIORITY.index(name) if name in SECTION_PRIORITY else len(SECTION_PRIORITY)
@@ -0,0 +1,234 @@
+"""Reusable roadmap templates keyed by canonicalized generation inputs."""
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import asyncio
+import copy
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import update
+
+from config import settings
+from database import SessionLocal, RoadmapTemplate
+from metrics import registry
+from skills_taxonomy import skill_taxonomy
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_LOOKUPS = registry.counter(
+    "roadmap_template_lookups_total", "Roadmap template lookups by result", ["result"]
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_role(role: str) -> str:
+    return _WHITESPACE.sub(" ", (role or "").strip().lower())
+
+
+def normalize_gaps(skill_gaps: List[str]) -> List[str]:
+    """Order-independent gap set of canonical skill keys ("React.js" == "react")."""
+    return sorted(skill_taxonomy.keys(skill_gaps))
+
+
+def template_key(role: str, skill_gaps: List[str], timeline_weeks: int) -> Tuple[str, str, List[str]]:
+    """
+    Canonicalize roadmap inputs.
+
+    Returns:
+        (key, normalized role, normalized gaps)
+    """
+    role_norm = normalize_role(role)
+    gaps_norm = normalize_gaps(skill_gaps)
+    payload = f"{role_norm}\x00{'|'.join(gaps_norm)}\x00{int(timeline_weeks)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest(), role_norm, gaps_norm
+
+
+class RoadmapTemplateStore:
+    """
+    Two-tier store of generated roadmap milestones.
+
+    Users asking for the same (role, gap set, timeline) get a stored plan
+    instead of an LLM call. The in-process tier is an LRU; the
+    `roadmap_templates` table shares templates between workers and
+    restarts. Per-user personalization is applied on read.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ROADMAP_TEMPLATES_ENABLED
+
+    async def get(
+        self,
+        role: str,
+        skill_gaps: List[str],
+        timeline_weeks: int,
+        known_skills: Optional[List[str]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up a template and personalize it.
+
+        Args:
+            role: Target role
+            skill_gaps: Skills the roadmap covers
+            timeline_weeks: Roadmap length
+            known_skills: The user's current skill names
+
+        Returns:
+            Personalized milestone dicts, or None on a miss
+        """
+        if not self.enabled or not skill_gaps:
+            return None
+
+        key, _, _ = template_key(role, skill_gaps, timeline_weeks)
+        milestones = self._get_local(key)
+        result = "hit_memory"
+
+        if milestones is None:
+            try:
+                milestones = await asyncio.to_thread(self._get_durable, key)
+            except Exception as e:
+                logger.warning(f"Roadmap template read failed: {str(e)[:100]}")
+                milestones = None
+            result = "hit_durable"
+            if milestones is not None:
+                self._put_local(key, milestones)
+
+        if milestones is None:
+            TEMPLATE_LOOKUPS.inc(result="miss")
+            return None
+
+        TEMPLATE_LOOKUPS.inc(result=result)
+        return self.personalize(milestones, known_skills or [])
+
+    async def put(
+        self,
+        role: str,
+        skill_gaps: List[str],
+        timeline_weeks: int,
+        milestones: List[Dict[str, Any]]
+    ) -> None:
+        """Store freshly generated milestones for reuse."""
+        if not self.enabled or not skill_gaps or not milestones:
+            return
+
+        key, role_norm, gaps_norm = template_key(role, skill_gaps, timeline_weeks)
+        milestones = copy.deepcopy(milestones)
+        self._put_local(key, milestones)
+
+        try:
+            await asyncio.to_thread(self._put_durable, key, role_norm, gaps_norm, timeline_weeks, milestones)
+        except Exception as e:
+            logger.warning(f"Roadmap template write failed: {str(e)[:100]}")
+
+    @staticmethod
+    def personalize(milestones: List[Dict[str, Any]], known_skills: List[str]) -> List[Dict[str, Any]]:
+        """
+        Adapt a template to one user without an LLM call.
+
+        Sub-skills the user already has are dropped from each milestone and
+        its hours are scaled down in proportion (to no less than half).
+        """
+        known = skill_taxonomy.keys(known_skills)
+        personalized = []
+        for milestone in milestones:
+            item = copy.deepcopy(milestone)
+            skills = item.get("skills") or []
+            remaining = [skill for skill in skills if skill_taxonomy.key(skill) not in known]
+            if skills and remaining and len(remaining) < len(skills):
+                item["skills"] = remaining
+                hours = item.get("estimated_hours") or 20
+                item["estimated_hours"] = max(int(round(hours * len(remaining) / len(skills))), hours // 2, 1)
+            personalized.append(item)
+        return personalized
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate across both tiers."""
+        lookups = {result: value for (result,), value in TEMPLATE_LOOKUPS.samples()}
+        hits = lookups.get("hit_memory", 0.0) + lookups.get("hit_durable", 0.0)
+        total = hits + lookups.get("miss", 0.0)
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "lookups": lookups,
+            "hit_rate": round(hits / total, 4) if total else 0.0
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry["milestones"]
+
+    def _put_local(self, key: str, milestones: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = {
+                "milestones": milestones,
+                "expires_at": time.time() + settings.ROADMAP_TEMPLATE_TTL_DAYS * 86400
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.ROADMAP_TEMPLATE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def _get_durable(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        db = SessionLocal()
+        try:
+            row = db.get(RoadmapTemplate, key)
+            if row is None or row.expires_at <= datetime.utcnow():
+                return None
+            milestones = row.milestones
+            db.execute(
+                update(RoadmapTemplate)
+                .where(RoadmapTemplate.key == key)
+                .values(hit_count=RoadmapTemplate.hit_count + 1)
+            )
+            db.commit()
+            return milestones
+        finally:
+            db.close()
+
+    def _put_durable(
+        self,
+        key: str,
+        role: str,
+        skill_gaps: List[str],
+        timeline_weeks: int,
+        milestones: List[Dict[str, Any]]
+    ) -> None:
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            db.merge(RoadmapTemplate(
+                key=key,
+                role=role,
+                skill_gaps=skill_gaps,
+                timeline_weeks=timeline_weeks,
+                milestones=milestones,
+                hit_count=0,
+                created_at=now,
+                expires_at=now + timedelta(days=settings.ROADMAP_TEMPLATE_TTL_DAYS)
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+
+# Singleton instance
+roadmap_templates = RoadmapTemplateStore()
@@ -1,8 +1,9 @@
 """Pydantic schemas for API request/response models."""
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, BeforeValidator, Field, conlist, validator
+from typing import Annotated, Optional, List, Dict, Any, Literal
 from datetime import datetime
 from enum import Enum
+import math
 
 
 class SkillLevel(str, Enum):
@@ -191,6 +192,20 @@ class ResumeParseResponse(BaseModel):
     certifications: List[str]
     projects: List[Dict[str, Any]]
     parsed_at: str
+    # Profile update (skills, role inference) runs after the response; poll /agent/tasks/{id}
+    enrichment_task_id: Optional[str] = None
+
+
+class BackgroundTaskStatus(BaseModel):
+    """Status of a background task."""
+    task_id: str
+    kind: str
+    status: Literal["pending", "running", "succeeded", "failed"]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 
 class JobRecommendationResponse(BaseModel):
@@ -233,6 +248,106 @@ class LearningResource(BaseModel):
     difficulty: str
 
 
+# ============== LLM Output Models ==============
+# Shapes the LLM is asked to return; parsed by structured_output.
+
+Intent = Literal[
+    "skill_assessment", "roadmap_request", "job_search", "application_help",
+    "milestone_update", "general_advice", "other"
+]
+
+# Non-empty list of skill names (skill gap analysis)
+SkillNameList = conlist(str, min_length=1)
+
+
+class IntentClassification(BaseModel):
+    """Intent detected for an agent message."""
+    intent: Intent
+    requires_action: bool
+    action_type: Optional[str] = None
+    reasoning: Optional[str] = None
+
+
+class MilestonePlan(BaseModel):
+    """One generated roadmap milestone."""
+    title: str
+    description: str = ""
+    skills: List[str] = []
+    estimated_hours: int = 20
+
+
+class RoadmapBundle(BaseModel):
+    """Role, skill gaps and milestones from a single combined roadmap call."""
+    role: str
+    skill_gaps: List[str]
+    milestones: List[MilestonePlan]
+
+
+class ProjectIdea(BaseModel):
+    """Generated practice project."""
+    name: str
+    description: str = ""
+    skills: List[str] = []
+    estimated_hours: int = 20
+
+
+def _round_score(value: Any) -> Any:
+    """Models often write scores as 7.5 or "82.0"; round them instead of failing validation."""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return value
+    if isinstance(value, float) and math.isfinite(value):
+        return round(value)
+    return value
+
+
+# Integer score from LLM output, accepting fractional numbers
+LLMScore = Annotated[int, BeforeValidator(_round_score)]
+
+
+class AnswerEvaluation(BaseModel):
+    """Score and feedback for one interview answer."""
+    score: LLMScore = Field(..., ge=0, le=100)
+    feedback: str
+
+
+class InterviewReportDraft(BaseModel):
+    """LLM-written part of the final interview report."""
+    summary: str = ""
+    strengths: List[str] = []
+    improvements: List[str] = []
+
+
+class GeneratedJob(BaseModel):
+    """Job posting suggested by the LLM when no live listings are available."""
+    company: str
+    title: str
+    location: str = "Remote"
+    job_type: str = "Full-time"
+    experience_required: Optional[str] = None
+    required_skills: List[str] = []
+    preferred_skills: List[str] = []
+    salary_range: Dict[str, Any] = {}
+    description: str = ""
+    url: str = ""
+    match_score: LLMScore = Field(0, ge=0, le=100)
+    posted_date: Optional[str] = None
+
+
+class ResumeExtraction(BaseModel):
+    """Structured fields extracted from resume text."""
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    education: List[Dict[str, Any]] = []
+    experience: List[Dict[str, Any]] = []
+    skills: List[str] = []
+    certifications: List[str] = []
+    projects: List[Dict[str, Any]] = []
+
+
 # ============== Health Check ==============
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,329 @@
+"""Semantic cache for agent responses to near-duplicate questions."""
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict, deque
+from datetime import datetime
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+import unicodedata
+import uuid
+
+import numpy as np
+
+from config import settings
+from memory import memory_manager, embedding_call
+from metrics import registry
+from skills_taxonomy import skill_taxonomy
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_LOOKUPS = registry.counter(
+    "semantic_cache_lookups_total", "Semantic cache lookups by result", ["result"]
+)
+SEMANTIC_HITS = registry.counter(
+    "semantic_cache_hits_total", "Semantic cache hits by cached intent", ["intent"]
+)
+SEMANTIC_AUDITS = registry.counter(
+    "semantic_cache_audits_total",
+    "Sampled hits re-run through the full graph, by intent agreement",
+    ["intent", "result"]
+)
+SEMANTIC_SIMILARITY = registry.histogram(
+    "semantic_cache_best_similarity",
+    "Best cosine similarity found per lookup",
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.92, 0.94, 0.96, 0.98, 1.0)
+)
+
+_PUNCTUATION = re.compile(r"[^\w\s+#.]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Normalized message -> embedding; exact repeats skip the embedding call
+_EMBEDDING_MEMO_SIZE = 1024
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, strip punctuation (keeping c++/c#/.net style tokens) and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", message or "").lower()
+    text = _PUNCTUATION.sub(" ", text)
+    text = _WHITESPACE.sub(" ", text).strip(" .")
+    return text[:1000]
+
+
+def context_fingerprint(
+    target_role: Optional[str],
+    skills: List[Dict[str, Any]],
+    user_id: Optional[str] = None
+) -> str:
+    """
+    Compact hash of the profile fields a response depends on.
+
+    Args:
+        target_role: User's target role
+        skills: Profile skills (only names are used)
+        user_id: Included unless the cache is shared between users
+
+    Returns:
+        16-character hex fingerprint
+    """
+    skill_names = sorted(skill_taxonomy.keys(
+        str(skill.get("name", ""))
+        for skill in skills or []
+        if isinstance(skill, dict) and skill.get("name")
+    ))
+    parts = [
+        (target_role or "").strip().lower(),
+        "|".join(skill_names),
+        "" if settings.SEMANTIC_CACHE_SHARED else (user_id or "")
+    ]
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticResponseCache:
+    """
+    Reuses `generate_response` output for paraphrased questions.
+
+    Entries are bucketed by context fingerprint (target role + skill set,
+    plus user id unless shared) and matched by cosine similarity of the
+    normalized message embedding. TTLs are set per intent; intents with
+    a TTL of 0 are never cached. A sample of hits is re-run through the
+    full graph so false hits can be measured.
+    """
+
+    def __init__(self):
+        self._buckets: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._samples: deque = deque(maxlen=settings.SEMANTIC_CACHE_SAMPLE_SIZE)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SEMANTIC_CACHE_ENABLED
+
+    async def lookup(
+        self,
+        message: str,
+        target_role: Optional[str],
+        skills: List[Dict[str, Any]],
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Find the closest cached response for a message in the same context.
+
+        Args:
+            message: Raw user message
+            target_role: User's target role
+            skills: User's profile skills
+            user_id: User identifier
+
+        Returns:
+            Lookup record (plain data, safe to keep in graph state). `hit` is
+            True when `cached` should be served; `audit` marks a sampled hit
+            that must take the full path and be settled by `store`.
+        """
+        lookup = {
+            "fingerprint": context_fingerprint(target_role, skills, user_id),
+            "message": normalize_message(message),
+            "embedding": None,
+            "similarity": 0.0,
+            "hit": False,
+            "audit": False,
+            "cached": None
+        }
+
+        embedding = await self._embed(lookup["message"])
+        if embedding is None:
+            SEMANTIC_LOOKUPS.inc(result="error")
+            return lookup
+        lookup["embedding"] = embedding.tolist()
+
+        entry, similarity = self._nearest(lookup["fingerprint"], embedding)
+        lookup["similarity"] = similarity
+        SEMANTIC_SIMILARITY.observe(similarity)
+
+        if entry is None or similarity < settings.SEMANTIC_CACHE_THRESHOLD:
+            SEMANTIC_LOOKUPS.inc(result="miss")
+            return lookup
+
+        lookup["cached"] = {
+            key: entry[key]
+            for key in ("id", "message", "intent", "response", "suggestions", "action_items")
+        }
+        if random.random() < settings.SEMANTIC_CACHE_AUDIT_RATE:
+            lookup["audit"] = True
+            SEMANTIC_LOOKUPS.inc(result="audit")
+        else:
+            lookup["hit"] = True
+            SEMANTIC_LOOKUPS.inc(result="hit")
+            SEMANTIC_HITS.inc(intent=entry["intent"])
+            entry["hits"] += 1
+        return lookup
+
+    def store(
+        self,
+        lookup: Dict[str, Any],
+        intent: Optional[str],
+        response: str,
+        suggestions: List[str],
+        action_items: List[str]
+    ) -> None:
+        """
+        Cache a freshly generated response, and settle an audited lookup.
+
+        Args:
+            lookup: Record returned by `lookup` for this message
+            intent: Intent detected on the full path
+            response: Generated response text
+            suggestions: Generated suggestions
+            action_items: Generated action items
+        """
+        if lookup.get("audit"):
+            self._record_audit(lookup, intent, response)
+
+        if lookup.get("embedding") is None or not response:
+            return
+        ttl = self.ttl_for(intent)
+        if ttl <= 0:
+            return
+
+        entry = {
+            "id": uuid.uuid4().hex,
+            "message": lookup["message"],
+            "embedding": np.asarray(lookup["embedding"], dtype=np.float32),
+            "intent": intent or "other",
+            "response": response,
+            "suggestions": list(suggestions or []),
+            "action_items": list(action_items or []),
+            "expires_at": time.time() + ttl,
+            "hits": 0
+        }
+        replaces = (lookup.get("cached") or {}).get("id")
+
+        with self._lock:
+            bucket = self._buckets.setdefault(lookup["fingerprint"], [])
+            self._buckets.move_to_end(lookup["fingerprint"])
+            # An audited entry is replaced by the fresh answer rather than duplicated
+            if replaces:
+                kept = [cached for cached in bucket if cached["id"] != replaces]
+                self._size -= len(bucket) - len(kept)
+                bucket[:] = kept
+            bucket.append(entry)
+            self._size += 1
+            self._evict()
+
+    @staticmethod
+    def ttl_for(intent: Optional[str]) -> int:
+        """Seconds to keep responses for an intent (0 = do not cache)."""
+        return int(settings.SEMANTIC_CACHE_INTENT_TTLS.get(intent or "other", 0))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and audit (false-hit) figures for threshold tuning."""
+        lookups = {result: value for (result,), value in SEMANTIC_LOOKUPS.samples()}
+        hits = lookups.get("hit", 0.0)
+        total = hits + lookups.get("miss", 0.0) + lookups.get("audit", 0.0)
+
+        audits = mismatches = 0.0
+        for (_, result), value in SEMANTIC_AUDITS.samples():
+            audits += value
+            if result == "intent_mismatch":
+                mismatches += value
+
+        return {
+            "enabled": self.enabled,
+            "threshold": settings.SEMANTIC_CACHE_THRESHOLD,
+            "contexts": len(self._buckets),
+            "entries": self._size,
+            "lookups": lookups,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "hits_by_intent": {intent: value for (intent,), value in SEMANTIC_HITS.samples()},
+            "audits": audits,
+            "false_hit_rate": round(mismatches / audits, 4) if audits else 0.0
+        }
+
+    def samples(self) -> List[Dict[str, Any]]:
+        """Most recent audited hits, newest first."""
+        with self._lock:
+            return list(reversed(self._samples))
+
+    async def _embed(self, normalized: str) -> Optional[np.ndarray]:
+        """Embed a normalized message as a unit vector, memoizing exact repeats."""
+        with self._lock:
+            cached = self._embeddings.get(normalized)
+            if cached is not None:
+                self._embeddings.move_to_end(normalized)
+                return cached
+
+        try:
+            with embedding_call("semantic_cache"):
+                values = await memory_manager.embedding_client.aembed_query(normalized)
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {str(e)[:100]}")
+            return None
+
+        vector = np.asarray(values, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        vector /= norm
+
+        with self._lock:
+            self._embeddings[normalized] = vector
+            while len(self._embeddings) > _EMBEDDING_MEMO_SIZE:
+                self._embeddings.popitem(last=False)
+        return vector
+
+    def _nearest(self, fingerprint: str, embedding: np.ndarray) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Best live entry in the fingerprint's bucket and its similarity."""
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(fingerprint)
+            if not bucket:
+                return None, 0.0
+
+            live = [entry for entry in bucket if entry["expires_at"] > now]
+            self._size -= len(bucket) - len(live)
+            if not live:
+                del self._buckets[fingerprint]
+                return None, 0.0
+            self._buckets[fingerprint] = live
+            self._buckets.move_to_end(fingerprint)
+
+            scores = np.stack([entry["embedding"] for entry in live]) @ embedding
+            best = int(np.argmax(scores))
+            return live[best], float(scores[best])
+
+    def _evict(self) -> None:
+        """Drop least recently used contexts until under the entry limit. Caller holds the lock."""
+        while self._size > settings.SEMANTIC_CACHE_MAX_ENTRIES and self._buckets:
+            _, bucket = self._buckets.popitem(last=False)
+            self._size -= len(bucket)
+
+    def _record_audit(self, lookup: Dict[str, Any], intent: Optional[str], response: str) -> None:
+        cached = lookup["cached"]
+        result = "agree" if (intent or "other") == cached["intent"] else "intent_mismatch"
+        SEMANTIC_AUDITS.inc(intent=cached["intent"], result=result)
+
+        with self._lock:
+            self._samples.append({
+                "sampled_at": datetime.utcnow().isoformat(),
+                "similarity": round(lookup["similarity"], 4),
+                "result": result,
+                "message": lookup["message"][:200],
+                "cached_message": cached["message"][:200],
+                "cached_intent": cached["intent"],
+                "fresh_intent": intent,
+                "cached_response": cached["response"][:500],
+                "fresh_response": (response or "")[:500]
+            })
+
+
+# Singleton instance
+semantic_cache = SemanticResponseCache()
@@ -1,18 +1,88 @@
 """Service layer for business logic."""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, Coroutine, List, Optional, Set
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
+import asyncio
 import uuid
 
-from database import UserProfile, Milestone, Application, Roadmap
+from config import settings
+from database import SessionLocal, UserProfile, Milestone, Application, Roadmap
 from graph import create_career_graph
 from memory import memory_manager
+from stats import user_stats, week_start_for
+from skills_taxonomy import skill_taxonomy
 from schemas import (
     MilestoneStatus, ApplicationStatus,
     Milestone as MilestoneSchema,
     Roadmap as RoadmapSchema
 )
 
+# Strong references keep fire-and-forget tasks alive until they finish
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _run_in_background(coro: Coroutine) -> None:
+    """Schedule a coroutine without awaiting it."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _add_memory_in_background(user_id: str, **kwargs) -> None:
+    """Add a memory on a dedicated session; the request's session may already be closed."""
+    db = SessionLocal()
+    try:
+        await memory_manager.add_memory(db, user_id=user_id, **kwargs)
+    except Exception as e:
+        print(f"Warning: Background memory write failed: {str(e)[:100]}")
+    finally:
+        db.close()
+
+
+async def enrich_profile_from_resume(
+    db: Session,
+    user_id: str,
+    skills: List[str],
+    resume_filename: Optional[str] = None,
+    resume_file_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Apply a parsed resume to the user's profile (task_queue job).
+
+    Overwrites skills, infers a target role when none is set (an LLM
+    call) and records the uploaded file.
+
+    Returns:
+        Task result: skill count and the inferred role, if any
+    """
+    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    if not profile:
+        profile = UserProfile(user_id=user_id, skills=[], career_goals=[], target_role=None)
+        db.add(profile)
+
+    inferred_role = None
+    if skills:
+        profile.skills = [
+            {"name": skill, "level": "intermediate", "verified": True}
+            for skill in skill_taxonomy.canonicalize(skills)
+        ]
+    if resume_file_id:
+        profile.resume_filename = resume_filename
+        profile.resume_file_id = resume_file_id
+    # Skills are visible before the slower role inference finishes
+    db.commit()
+
+    if skills and not profile.target_role:
+        from graph.tools import get_tools
+        inferred_role = await get_tools(db).infer_best_fit_role(user_id)
+        db.query(UserProfile).filter(UserProfile.user_id == user_id).update(
+            {"target_role": inferred_role},
+            synchronize_session=False
+        )
+        db.commit()
+
+    return {"skills": len(profile.skills or []), "target_role": inferred_role}
+
 
 class CareerMentorService:
     """Business logic for career mentor operations."""
@@ -56,28 +126,19 @@ class CareerMentorService:
                 "last_activity": None
             }
         
-        completed_milestones = self.db.query(Milestone).filter(
-            Milestone.user_id == user_id,
-            Milestone.status == MilestoneStatus.COMPLETED.value
-        ).count()
-        
-        total_applications = self.db.query(Application).filter(
-            Application.user_id == user_id
-        ).count()
-        
-        # Consolidate memories
-        memory_insights = await memory_manager.consolidate_memories(self.db, user_id)
+        # Counters are maintained on write; this is a primary-key read
+        stats = user_stats.get_stats(self.db, user_id)
         
         return {
             "skills": profile.skills or [],
             "career_goals": profile.career_goals or [],
-            "total_applications": total_applications,
-            "completed_milestones": completed_milestones,
+            "total_applications": stats.total_applications or 0,
+            "completed_milestones": stats.completed_milestones or 0,
             "current_focus": profile.target_role,
             "resume_filename": profile.resume_filename,
             "resume_file_id": profile.resume_file_id,
             "last_activity": profile.updated_at,
-            "memory_insights": memory_insights
+            "memory_insights": user_stats.memory_insights(stats)
         }
     
     async def get_current_roadmap(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -90,8 +151,10 @@ class CareerMentorService:
         if not roadmap:
             return None
         
-        # Get associated milestones
-        milestones = self.db.query(Milestone).filter(
+        # Get associated milestones (resources are deferred by default)
+        milestones = self.db.query(Milestone).options(
+            undefer(Milestone.resources)
+        ).filter(
             Milestone.roadmap_id == roadmap.id
         ).all()
         
@@ -136,6 +199,29 @@ class CareerMentorService:
         Returns:
             Generated roadmap
         """
+        roadmap = None
+        async for event in self.stream_roadmap(user_id, target_role, focus_areas, timeline_weeks):
+            if event["event"] == "roadmap":
+                roadmap = event["roadmap"]
+        return roadmap
+    
+    async def stream_roadmap(
+        self,
+        user_id: str,
+        target_role: Optional[str] = None,
+        focus_areas: Optional[List[str]] = None,
+        timeline_weeks: int = 12
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a new roadmap, yielding progress events as work completes.
+        
+        Events (dicts with an "event" key):
+            role, skill_gaps: inputs to the plan once known
+            milestone: preview of a milestone while the plan streams
+            reset: previews so far are void (the combined call fell back to
+                staged calls, or the streamed plan fell back to the default plan)
+            roadmap: the saved roadmap, always last
+        """
         # Get user profile
         profile = self.db.query(UserProfile).filter(
             UserProfile.user_id == user_id
@@ -150,8 +236,48 @@ class CareerMentorService:
         
         # Use provided target role or profile default, otherwise infer dynamically
         role = target_role or profile.target_role
-        if not role:
-            role = await tools.infer_best_fit_role(user_id)
+        skill_gaps: List[str] = []
+        roadmap_plan: Optional[List[Dict[str, Any]]] = None
+        
+        if settings.ROADMAP_GENERATION_MODE == "combined":
+            # One round trip for role (if unset), gaps and milestones
+            previews = 0
+            try:
+                async for kind, payload in tools.stream_roadmap_bundle(user_id, role, timeline_weeks):
+                    if kind == "milestone":
+                        previews += 1
+                        yield {"event": "milestone", "milestone": payload}
+                    else:
+                        role = payload["role"]
+                        skill_gaps = payload["skill_gaps"]
+                        roadmap_plan = payload["milestones"]
+            except Exception as e:
+                print(f"Combined roadmap generation failed, falling back to staged calls: {e}")
+                if previews:
+                    yield {"event": "reset"}
+            
+            if roadmap_plan is not None:
+                yield {"event": "role", "role": role}
+                yield {"event": "skill_gaps", "skill_gaps": skill_gaps}
+        
+        if roadmap_plan is None:
+            if not role:
+                role = await tools.infer_best_fit_role(user_id)
+            yield {"event": "role", "role": role}
+            
+            # Get skill gaps using LLM
+            skill_gaps = await tools.get_skill_gaps(user_id, role)
+            yield {"event": "skill_gaps", "skill_gaps": skill_gaps}
+            
+            # Generate milestones using LLM for detailed plan, surfacing each as it arrives
+            known_skills = [skill["name"] if isinstance(skill, dict) else skill for skill in profile.skills or []]
+            async for kind, payload in tools.stream_roadmap_plan(role, skill_gaps, timeline_weeks, known_skills):
+                if kind == "milestone":
+                    yield {"event": "milestone", "milestone": payload}
+                elif kind == "reset":
+                    yield {"event": "reset"}
+                else:
+                    roadmap_plan = payload
         
         # Deactivate old roadmaps
         self.db.query(Roadmap).filter(
@@ -159,12 +285,6 @@ class CareerMentorService:
             Roadmap.is_active == True
         ).update({"is_active": False})
         
-        # Get skill gaps using LLM
-        skill_gaps = await tools.get_skill_gaps(user_id, role)
-        
-        # Generate milestones using LLM for detailed plan
-        roadmap_plan = await tools.generate_roadmap_plan(role, skill_gaps, timeline_weeks)
-        
         milestones = []
         for i, item in enumerate(roadmap_plan):
             milestone_id = str(uuid.uuid4())
@@ -174,7 +294,7 @@ class CareerMentorService:
                 title=item.get("title", f"Milestone {i+1}"),
                 description=item.get("description", "Complete the assigned tasks."),
                 status=MilestoneStatus.NOT_STARTED.value,
-                skills_to_learn=item.get("skills", []),
+                skills_to_learn=skill_taxonomy.canonicalize(item.get("skills", [])),
                 estimated_hours=item.get("estimated_hours", 20),
                 deadline=datetime.utcnow() + timedelta(weeks=(i+1) * 2),
                 resources=[]
@@ -201,17 +321,16 @@ class CareerMentorService:
         
         self.db.commit()
         
-        # Add memory
-        await memory_manager.add_memory(
-            self.db,
+        # The memory embedding is off the response path
+        _run_in_background(_add_memory_in_background(
             user_id=user_id,
             content=f"Generated new roadmap for {role} role with {len(skill_gaps)} skill gaps",
             memory_type="semantic",
             importance=0.9,
             tags=["roadmap", "planning"]
-        )
+        ))
         
-        return await self.get_current_roadmap(user_id)
+        yield {"event": "roadmap", "roadmap": await self.get_current_roadmap(user_id)}
     
     async def complete_milestone(
         self,
@@ -240,9 +359,12 @@ class CareerMentorService:
         if not milestone:
             return False
         
-        # Update milestone
+        already_completed = milestone.status == MilestoneStatus.COMPLETED.value
+        
+        # Update milestone; a repeat completion keeps its original week in user_weekly_stats
         milestone.status = MilestoneStatus.COMPLETED.value
-        milestone.completed_at = datetime.utcnow()
+        if not already_completed:
+            milestone.completed_at = datetime.utcnow()
         if reflection:
             milestone.reflection = reflection
         
@@ -254,14 +376,15 @@ class CareerMentorService:
             
             if profile:
                 current_skills = profile.skills or []
-                for skill in learned_skills:
-                    # Add or update skill
+                for skill in skill_taxonomy.canonicalize(learned_skills):
+                    # Add or update skill ("React.js" updates an existing "React")
+                    skill_key = skill_taxonomy.key(skill)
                     existing = next(
                         (
                             s
                             for s in current_skills
                             if isinstance(s, dict)
-                            and s.get("name", "").lower() == skill.lower()
+                            and skill_taxonomy.key(s.get("name", "")) == skill_key
                         ),
                         None,
                     )
@@ -276,6 +399,10 @@ class CareerMentorService:
                 
                 profile.skills = current_skills
         
+        # Re-completing a milestone must not count it twice
+        if not already_completed:
+            user_stats.record_milestone_completed(self.db, milestone)
+        
         self.db.commit()
         
         # Save to memory
@@ -329,6 +456,7 @@ class CareerMentorService:
         )
         
         self.db.add(application)
+        user_stats.record_application(self.db, application)
         self.db.commit()
         
         # Save to memory with high importance if rejected (to learn from)
@@ -360,46 +488,21 @@ class CareerMentorService:
         Returns:
             Weekly progress data
         """
-        # Calculate week boundaries
-        today = datetime.utcnow()
-        week_start = today - timedelta(days=today.weekday() + (week_offset * 7))
+        # Calculate week boundaries (weeks start Monday 00:00 UTC)
+        week_start = week_start_for(datetime.utcnow() - timedelta(weeks=week_offset))
         week_end = week_start + timedelta(days=7)
         
-        # Get completed milestones this week
-        completed = self.db.query(Milestone).filter(
-            Milestone.user_id == user_id,
-            Milestone.status == MilestoneStatus.COMPLETED.value,
-            Milestone.completed_at >= week_start,
-            Milestone.completed_at < week_end
-        ).all()
-        
-        # Get applications this week
-        applications = self.db.query(Application).filter(
-            Application.user_id == user_id,
-            Application.applied_date >= week_start,
-            Application.applied_date < week_end
-        ).all()
-        
-        # Calculate insights
-        new_skills = []
-        for milestone in completed:
-            new_skills.extend(milestone.skills_to_learn)
-        
-        total_hours = sum(m.actual_hours or m.estimated_hours for m in completed)
-        
-        interviews = len([a for a in applications if a.status in [
-            ApplicationStatus.INTERVIEW.value,
-            ApplicationStatus.SCREENING.value
-        ]])
+        # Weekly buckets are maintained on write; this is a primary-key read
+        week = user_stats.get_weekly(self.db, user_id, week_start)
         
         return {
             "week_start": week_start.isoformat(),
             "week_end": week_end.isoformat(),
-            "milestones_completed": len(completed),
-            "new_skills_learned": list(set(new_skills)),
-            "applications_submitted": len(applications),
-            "interviews_attended": interviews,
-            "total_hours_invested": total_hours,
-            "achievements": [m.title for m in completed],
+            "milestones_completed": week.milestones_completed if week else 0,
+            "new_skills_learned": list(week.new_skills or []) if week else [],
+            "applications_submitted": week.applications_submitted if week else 0,
+            "interviews_attended": week.interviews_attended if week else 0,
+            "total_hours_invested": week.hours_invested if week else 0,
+            "achievements": list(week.achievements or []) if week else [],
             "next_week_goals": ["Continue learning", "Apply to 3+ positions", "Complete next milestone"]
         }
@@ -0,0 +1,149 @@
+"""Key-value store for state that must be visible to every worker process."""
+from typing import Any, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+import json
+import threading
+import time
+
+from config import settings
+from database import SessionLocal, SharedStateEntry
+
+BACKENDS = ("database", "memory")
+
+
+class MemoryStateStore:
+    """
+    Process-local stand-in for a shared KV store.
+
+    Values are kept JSON-encoded so callers get a copy, exactly as with the
+    database backend. Only correct with a single worker.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        encoded = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (encoded, expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def count(self, prefix: str) -> int:
+        """Unexpired keys starting with `prefix`."""
+        now = time.time()
+        with self._lock:
+            return sum(
+                1 for key, (_, expires_at) in self._entries.items()
+                if key.startswith(prefix) and (expires_at is None or expires_at > now)
+            )
+
+    def prune(self) -> int:
+        """Drop expired entries; returns how many were removed."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._entries.items()
+                       if expires_at is not None and expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+
+class DatabaseStateStore:
+    """
+    Shared KV store on the shared_state table.
+
+    Every worker (and every replica pointed at the same DATABASE_URL) sees
+    the same entries. Writes are last-writer-wins per key; callers that need
+    more should keep one writer per key (an interview session only advances
+    on its own client's requests).
+
+    Methods are synchronous; call them with asyncio.to_thread from async code.
+    """
+
+    shared = True
+
+    def get(self, key: str) -> Optional[Any]:
+        db = SessionLocal()
+        try:
+            row = db.get(SharedStateEntry, key)
+            if row is None or (row.expires_at is not None and row.expires_at <= datetime.utcnow()):
+                return None
+            return row.value
+        finally:
+            db.close()
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            db.merge(SharedStateEntry(
+                key=key,
+                value=value,
+                updated_at=now,
+                expires_at=now + timedelta(seconds=ttl_seconds) if ttl_seconds else None
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def delete(self, key: str) -> None:
+        db = SessionLocal()
+        try:
+            db.query(SharedStateEntry).filter(SharedStateEntry.key == key).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def count(self, prefix: str) -> int:
+        """Unexpired keys starting with `prefix`."""
+        db = SessionLocal()
+        try:
+            return db.query(SharedStateEntry).filter(
+                SharedStateEntry.key.startswith(prefix, autoescape=True),
+                (SharedStateEntry.expires_at.is_(None)) | (SharedStateEntry.expires_at > datetime.utcnow())
+            ).count()
+        finally:
+            db.close()
+
+    def prune(self) -> int:
+        """Delete expired rows; returns how many were removed."""
+        db = SessionLocal()
+        try:
+            deleted = db.query(SharedStateEntry).filter(
+                SharedStateEntry.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+
+def create_state_store(backend: str):
+    """Store for SHARED_STATE_BACKEND ("database" or "memory")."""
+    if backend == "database":
+        return DatabaseStateStore()
+    if backend == "memory":
+        return MemoryStateStore()
+    raise ValueError(f"Unknown SHARED_STATE_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+# Singleton instance
+shared_state = create_state_store(settings.SHARED_STATE_BACKEND)
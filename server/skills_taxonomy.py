@@ -0,0 +1,495 @@
+"""Skill taxonomy: canonical skill IDs, aliases, hierarchy and free-text matching."""
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from collections import deque
+import re
+import unicodedata
+
+# (id, display name, category, parent id, aliases)
+# The display name and id are always aliases; list other spellings only.
+SKILLS: List[Tuple[str, str, str, Optional[str], Tuple[str, ...]]] = [
+    # Languages
+    ("python", "Python", "language", None, ("python3", "py")),
+    ("java", "Java", "language", None, ("java se", "java ee", "j2ee")),
+    ("javascript", "JavaScript", "language", None, ("js", "ecmascript", "es6", "es2015")),
+    ("typescript", "TypeScript", "language", "javascript", ("ts",)),
+    ("go", "Go", "language", None, ("golang",)),
+    ("rust", "Rust", "language", None, ("rustlang",)),
+    ("c", "C", "language", None, ("ansi c", "c99")),
+    ("cpp", "C++", "language", None, ("cplusplus", "cpp11", "c++11", "c++17")),
+    ("csharp", "C#", "language", None, ("c sharp",)),
+    ("kotlin", "Kotlin", "language", None, ()),
+    ("swift", "Swift", "language", None, ()),
+    ("ruby", "Ruby", "language", None, ()),
+    ("php", "PHP", "language", None, ()),
+    ("scala", "Scala", "language", None, ()),
+    ("r", "R", "language", None, ("rlang", "r programming")),
+    ("sql", "SQL", "language", None, ("structured query language",)),
+    ("bash", "Bash", "language", None, ("shell scripting", "shell", "sh")),
+    ("html", "HTML", "language", None, ("html5",)),
+    ("css", "CSS", "language", None, ("css3",)),
+    ("perl", "Perl", "language", None, ()),
+    ("haskell", "Haskell", "language", None, ()),
+    ("elixir", "Elixir", "language", None, ()),
+    ("erlang", "Erlang", "language", None, ()),
+    ("clojure", "Clojure", "language", None, ()),
+    ("fsharp", "F#", "language", None, ("f sharp",)),
+    ("dart", "Dart", "language", None, ()),
+    ("lua", "Lua", "language", None, ()),
+    ("matlab", "MATLAB", "language", None, ()),
+    ("julia", "Julia", "language", None, ("julialang",)),
+    ("objective-c", "Objective-C", "language", None, ("objc", "obj-c")),
+    ("groovy", "Groovy", "language", "java", ()),
+    ("solidity", "Solidity", "language", None, ()),
+    ("assembly", "Assembly", "language", None, ("asm", "x86 assembly")),
+    ("cobol", "COBOL", "language", None, ()),
+    ("fortran", "Fortran", "language", None, ()),
+    ("powershell", "PowerShell", "language", None, ()),
+    ("vba", "VBA", "language", None, ("visual basic",)),
+    ("sass", "Sass", "language", "css", ("scss",)),
+    ("less", "Less", "language", "css", ()),
+
+    # Frontend
+    ("react", "React", "frontend", "javascript", ("react.js", "reactjs")),
+    ("nextjs", "Next.js", "frontend", "react", ("next",)),
+    ("angular", "Angular", "frontend", "typescript", ("angular.js", "angularjs")),
+    ("vue", "Vue", "frontend", "javascript", ("vue.js", "vuejs")),
+    ("svelte", "Svelte", "frontend", "javascript", ()),
+    ("redux", "Redux", "frontend", "react", ()),
+    ("state-management", "State Management", "frontend", None, ()),
+    ("tailwind", "Tailwind CSS", "frontend", "css", ("tailwindcss", "tailwind")),
+    ("html-css", "HTML/CSS", "frontend", None, ("html & css", "html and css")),
+    ("responsive-design", "Responsive Design", "frontend", "css", ()),
+    ("web-performance", "Performance Optimization", "frontend", None, ("web performance",)),
+    ("jquery", "jQuery", "frontend", "javascript", ()),
+    ("bootstrap", "Bootstrap", "frontend", "css", ()),
+    ("material-ui", "Material UI", "frontend", "react", ("mui", "material-ui")),
+    ("webpack", "Webpack", "frontend", "javascript", ()),
+    ("vite", "Vite", "frontend", "javascript", ()),
+    ("babel", "Babel", "frontend", "javascript", ()),
+    ("nuxt", "Nuxt", "frontend", "vue", ("nuxt.js", "nuxtjs")),
+    ("gatsby", "Gatsby", "frontend", "react", ("gatsby.js",)),
+    ("remix", "Remix", "frontend", "react", ()),
+    ("ember", "Ember", "frontend", "javascript", ("ember.js", "emberjs")),
+    ("backbone", "Backbone.js", "frontend", "javascript", ("backbone", "backbonejs")),
+    ("storybook", "Storybook", "frontend", None, ()),
+    ("threejs", "Three.js", "frontend", "javascript", ("three js",)),
+    ("d3", "D3.js", "frontend", "javascript", ("d3", "d3js")),
+    ("webgl", "WebGL", "frontend", None, ()),
+    ("web-components", "Web Components", "frontend", None, ()),
+    ("pwa", "Progressive Web Apps", "frontend", None, ("pwa", "progressive web app")),
+    ("accessibility", "Accessibility", "frontend", None, ("a11y", "wcag")),
+    ("ui-ux", "UI/UX Design", "frontend", None, ("ui/ux", "ux design", "ui design", "user experience")),
+    ("figma", "Figma", "frontend", "ui-ux", ()),
+
+    # Mobile & desktop
+    ("android", "Android", "mobile", None, ("android development",)),
+    ("ios", "iOS", "mobile", None, ("ios development",)),
+    ("react-native", "React Native", "mobile", "react", ()),
+    ("flutter", "Flutter", "mobile", "dart", ()),
+    ("ionic", "Ionic", "mobile", None, ()),
+    ("xamarin", "Xamarin", "mobile", "csharp", ()),
+    ("swiftui", "SwiftUI", "mobile", "swift", ()),
+    ("jetpack-compose", "Jetpack Compose", "mobile", "kotlin", ()),
+    ("electron", "Electron", "mobile", "javascript", ("electron.js",)),
+    ("unity", "Unity", "mobile", "csharp", ("unity3d",)),
+    ("unreal-engine", "Unreal Engine", "mobile", "cpp", ("unreal", "ue4", "ue5")),
+
+    # Backend
+    ("nodejs", "Node.js", "backend", "javascript", ("node", "node js")),
+    ("express", "Express", "backend", "nodejs", ("express.js", "expressjs")),
+    ("django", "Django", "backend", "python", ()),
+    ("flask", "Flask", "backend", "python", ()),
+    ("fastapi", "FastAPI", "backend", "python", ()),
+    ("spring", "Spring", "backend", "java", ("spring framework",)),
+    ("spring-boot", "Spring Boot", "backend", "spring", ("springboot",)),
+    ("rails", "Ruby on Rails", "backend", "ruby", ("rails", "ror")),
+    ("dotnet", ".NET", "backend", "csharp", ("dotnet", "asp.net", ".net core", "dotnet core")),
+    ("rest-api", "REST API", "backend", None, ("rest", "restful", "restful api", "rest apis")),
+    ("graphql", "GraphQL", "backend", None, ()),
+    ("grpc", "gRPC", "backend", None, ()),
+    ("microservices", "Microservices", "backend", None, ("microservice architecture",)),
+    ("authentication", "Authentication", "backend", None, ("auth", "oauth", "jwt")),
+    ("caching", "Caching", "backend", None, ()),
+    ("system-design", "System Design", "backend", None, ("distributed systems design",)),
+    ("nestjs", "NestJS", "backend", "nodejs", ("nest.js",)),
+    ("koa", "Koa", "backend", "nodejs", ("koa.js",)),
+    ("fastify", "Fastify", "backend", "nodejs", ()),
+    ("laravel", "Laravel", "backend", "php", ()),
+    ("symfony", "Symfony", "backend", "php", ()),
+    ("gin", "Gin", "backend", "go", ("gin gonic",)),
+    ("actix", "Actix", "backend", "rust", ("actix web",)),
+    ("celery", "Celery", "backend", "python", ()),
+    ("rabbitmq", "RabbitMQ", "backend", "message-queues", ("rabbit mq",)),
+    ("kafka", "Kafka", "backend", "message-queues", ("apache kafka",)),
+    ("message-queues", "Message Queues", "backend", None, ("message queue", "message brokers", "pub/sub")),
+    ("nginx", "Nginx", "backend", None, ()),
+    ("websockets", "WebSockets", "backend", None, ("websocket", "socket.io")),
+    ("openapi", "OpenAPI", "backend", "rest-api", ("swagger",)),
+    ("soap", "SOAP", "backend", None, ()),
+    ("serverless", "Serverless", "backend", "cloud-platforms", ()),
+    ("aws-lambda", "AWS Lambda", "backend", "serverless", ("lambda functions",)),
+    ("event-driven", "Event-Driven Architecture", "backend", None, ("event driven architecture", "event sourcing")),
+    ("distributed-systems", "Distributed Systems", "backend", "system-design", ()),
+    ("orm", "ORM", "backend", "databases", ("object relational mapping",)),
+    ("sqlalchemy", "SQLAlchemy", "backend", "orm", ()),
+    ("hibernate", "Hibernate", "backend", "orm", ()),
+    ("prisma", "Prisma", "backend", "orm", ()),
+    ("sequelize", "Sequelize", "backend", "orm", ()),
+    ("typeorm", "TypeORM", "backend", "orm", ()),
+
+    # Data stores
+    ("databases", "Databases", "data", None, ("database", "dbms")),
+    ("postgresql", "PostgreSQL", "data", "sql", ("postgres", "psql")),
+    ("mysql", "MySQL", "data", "sql", ()),
+    ("sqlite", "SQLite", "data", "sql", ()),
+    ("mongodb", "MongoDB", "data", "databases", ("mongo",)),
+    ("redis", "Redis", "data", "databases", ()),
+    ("elasticsearch", "Elasticsearch", "data", "databases", ("elastic search",)),
+    ("oracle-db", "Oracle Database", "data", "sql", ("oracle", "oracle db", "pl/sql", "plsql")),
+    ("sql-server", "SQL Server", "data", "sql", ("mssql", "ms sql", "microsoft sql server", "t-sql", "tsql")),
+    ("mariadb", "MariaDB", "data", "sql", ()),
+    ("dynamodb", "DynamoDB", "data", "databases", ("dynamo db",)),
+    ("cassandra", "Cassandra", "data", "databases", ("apache cassandra",)),
+    ("neo4j", "Neo4j", "data", "databases", ()),
+    ("couchdb", "CouchDB", "data", "databases", ()),
+    ("firebase", "Firebase", "data", "databases", ("firestore",)),
+    ("supabase", "Supabase", "data", "postgresql", ()),
+    ("snowflake", "Snowflake", "data", "data-warehousing", ()),
+    ("bigquery", "BigQuery", "data", "data-warehousing", ("big query",)),
+    ("redshift", "Redshift", "data", "data-warehousing", ("amazon redshift",)),
+    ("clickhouse", "ClickHouse", "data", "databases", ()),
+    ("influxdb", "InfluxDB", "data", "databases", ()),
+    ("nosql", "NoSQL", "data", "databases", ()),
+    ("vector-databases", "Vector Databases", "data", "databases", ("vector database", "pinecone", "pgvector", "faiss")),
+
+    # Cloud & DevOps
+    ("cloud-platforms", "Cloud Platforms", "devops", None, ("cloud", "cloud computing")),
+    ("aws", "AWS", "devops", "cloud-platforms", ("amazon web services",)),
+    ("gcp", "GCP", "devops", "cloud-platforms", ("google cloud", "google cloud platform")),
+    ("azure", "Azure", "devops", "cloud-platforms", ("microsoft azure",)),
+    ("docker", "Docker", "devops", None, ("containers", "containerization")),
+    ("kubernetes", "Kubernetes", "devops", None, ("k8s",)),
+    ("terraform", "Terraform", "devops", "infrastructure-as-code", ()),
+    ("infrastructure-as-code", "Infrastructure as Code", "devops", None, ("iac",)),
+    ("ci-cd", "CI/CD", "devops", None, ("ci cd", "continuous integration", "continuous delivery")),
+    ("git", "Git", "devops", None, ("version control",)),
+    ("linux", "Linux", "devops", None, ()),
+    ("monitoring", "Monitoring", "devops", None, ("observability",)),
+    ("scripting", "Scripting", "devops", None, ()),
+    ("jenkins", "Jenkins", "devops", "ci-cd", ()),
+    ("github-actions", "GitHub Actions", "devops", "ci-cd", ()),
+    ("gitlab-ci", "GitLab CI", "devops", "ci-cd", ("gitlab ci/cd",)),
+    ("circleci", "CircleCI", "devops", "ci-cd", ("circle ci",)),
+    ("github", "GitHub", "devops", "git", ()),
+    ("gitlab", "GitLab", "devops", "git", ()),
+    ("ansible", "Ansible", "devops", "infrastructure-as-code", ()),
+    ("puppet", "Puppet", "devops", "infrastructure-as-code", ()),
+    ("chef", "Chef", "devops", "infrastructure-as-code", ()),
+    ("cloudformation", "CloudFormation", "devops", "infrastructure-as-code", ("aws cloudformation",)),
+    ("pulumi", "Pulumi", "devops", "infrastructure-as-code", ()),
+    ("helm", "Helm", "devops", "kubernetes", ("helm charts",)),
+    ("istio", "Istio", "devops", "kubernetes", ()),
+    ("openshift", "OpenShift", "devops", "kubernetes", ()),
+    ("argocd", "Argo CD", "devops", "ci-cd", ("argo cd", "argo")),
+    ("prometheus", "Prometheus", "devops", "monitoring", ()),
+    ("grafana", "Grafana", "devops", "monitoring", ()),
+    ("datadog", "Datadog", "devops", "monitoring", ()),
+    ("elk", "ELK Stack", "devops", "monitoring", ("elk", "kibana", "logstash")),
+    ("splunk", "Splunk", "devops", "monitoring", ()),
+    ("new-relic", "New Relic", "devops", "monitoring", ()),
+    ("opentelemetry", "OpenTelemetry", "devops", "monitoring", ("otel",)),
+    ("sre", "Site Reliability Engineering", "devops", None, ("sre",)),
+    ("networking", "Networking", "devops", None, ("tcp/ip", "computer networking")),
+    ("security", "Security", "devops", None, ("cybersecurity", "application security", "appsec", "infosec")),
+    ("devsecops", "DevSecOps", "devops", "security", ()),
+    ("owasp", "OWASP", "devops", "security", ()),
+    ("vagrant", "Vagrant", "devops", None, ()),
+
+    # Data & ML
+    ("pandas", "pandas", "data-science", "python", ()),
+    ("numpy", "NumPy", "data-science", "python", ()),
+    ("scikit-learn", "scikit-learn", "data-science", "machine-learning", ("sklearn", "scikit learn")),
+    ("tensorflow", "TensorFlow", "data-science", "deep-learning", ()),
+    ("pytorch", "PyTorch", "data-science", "deep-learning", ("torch",)),
+    ("tensorflow-pytorch", "TensorFlow/PyTorch", "data-science", "deep-learning", ()),
+    ("machine-learning", "Machine Learning", "data-science", None, ("ml", "ml algorithms")),
+    ("deep-learning", "Deep Learning", "data-science", "machine-learning", ("dl", "neural networks")),
+    ("mlops", "MLOps", "data-science", "machine-learning", ()),
+    ("model-deployment", "Model Deployment", "data-science", "mlops", ()),
+    ("distributed-training", "Distributed Training", "data-science", "deep-learning", ()),
+    ("statistics", "Statistics", "data-science", None, ("stats",)),
+    ("data-visualization", "Data Visualization", "data-science", None, ("data viz", "dataviz")),
+    ("keras", "Keras", "data-science", "deep-learning", ()),
+    ("xgboost", "XGBoost", "data-science", "machine-learning", ()),
+    ("lightgbm", "LightGBM", "data-science", "machine-learning", ()),
+    ("hugging-face", "Hugging Face", "data-science", "nlp", ("huggingface", "hugging face transformers")),
+    ("nlp", "NLP", "data-science", "machine-learning", ("natural language processing",)),
+    ("computer-vision", "Computer Vision", "data-science", "deep-learning", ("cv",)),
+    ("opencv", "OpenCV", "data-science", "computer-vision", ()),
+    ("llms", "LLMs", "data-science", "nlp", ("llm", "large language models", "generative ai", "genai")),
+    ("langchain", "LangChain", "data-science", "llms", ()),
+    ("langgraph", "LangGraph", "data-science", "langchain", ()),
+    ("rag", "RAG", "data-science", "llms", ("retrieval augmented generation", "retrieval-augmented generation")),
+    ("prompt-engineering", "Prompt Engineering", "data-science", "llms", ()),
+    ("mlflow", "MLflow", "data-science", "mlops", ()),
+    ("kubeflow", "Kubeflow", "data-science", "mlops", ()),
+    ("sagemaker", "SageMaker", "data-science", "mlops", ("aws sagemaker", "amazon sagemaker")),
+    ("vertex-ai", "Vertex AI", "data-science", "mlops", ()),
+    ("reinforcement-learning", "Reinforcement Learning", "data-science", "machine-learning", ()),
+    ("time-series", "Time Series Analysis", "data-science", "statistics", ("time series", "forecasting")),
+    ("ab-testing", "A/B Testing", "data-science", "statistics", ("a/b testing", "experimentation")),
+    ("jupyter", "Jupyter", "data-science", "python", ("jupyter notebook", "jupyterlab")),
+    ("matplotlib", "Matplotlib", "data-science", "data-visualization", ()),
+    ("seaborn", "Seaborn", "data-science", "data-visualization", ()),
+    ("plotly", "Plotly", "data-science", "data-visualization", ()),
+    ("tableau", "Tableau", "data-science", "data-visualization", ()),
+    ("power-bi", "Power BI", "data-science", "data-visualization", ("powerbi",)),
+    ("looker", "Looker", "data-science", "data-visualization", ()),
+    ("excel", "Excel", "data-science", None, ("microsoft excel", "ms excel")),
+
+    # Data engineering
+    ("data-engineering", "Data Engineering", "data-engineering", None, ()),
+    ("etl", "ETL", "data-engineering", "data-engineering", ("elt", "data pipelines")),
+    ("data-warehousing", "Data Warehousing", "data-engineering", "data-engineering", ("data warehouse",)),
+    ("data-modeling", "Data Modeling", "data-engineering", "data-engineering", ("data modelling",)),
+    ("spark", "Apache Spark", "data-engineering", "data-engineering", ("spark", "pyspark")),
+    ("hadoop", "Hadoop", "data-engineering", "data-engineering", ("hdfs", "mapreduce")),
+    ("hive", "Hive", "data-engineering", "hadoop", ("apache hive",)),
+    ("flink", "Flink", "data-engineering", "data-engineering", ("apache flink",)),
+    ("airflow", "Airflow", "data-engineering", "etl", ("apache airflow",)),
+    ("dbt", "dbt", "data-engineering", "etl", ()),
+    ("databricks", "Databricks", "data-engineering", "spark", ()),
+
+    # Fundamentals
+    ("data-structures", "Data Structures", "fundamentals", None, ()),
+    ("algorithms", "Algorithms", "fundamentals", None, ("algorithm design",)),
+    ("testing", "Testing", "fundamentals", None, ("unit testing", "automated testing")),
+    ("tdd", "Test-Driven Development", "fundamentals", "testing", ("tdd",)),
+    ("jest", "Jest", "fundamentals", "testing", ()),
+    ("mocha", "Mocha", "fundamentals", "testing", ()),
+    ("cypress", "Cypress", "fundamentals", "testing", ()),
+    ("selenium", "Selenium", "fundamentals", "testing", ()),
+    ("playwright", "Playwright", "fundamentals", "testing", ()),
+    ("pytest", "pytest", "fundamentals", "testing", ()),
+    ("junit", "JUnit", "fundamentals", "testing", ()),
+    ("oop", "Object-Oriented Programming", "fundamentals", None, ("oop", "object oriented programming", "ood")),
+    ("functional-programming", "Functional Programming", "fundamentals", None, ()),
+    ("design-patterns", "Design Patterns", "fundamentals", None, ()),
+    ("concurrency", "Concurrency", "fundamentals", None, ("multithreading", "parallel programming", "async programming")),
+    ("operating-systems", "Operating Systems", "fundamentals", None, ()),
+    ("embedded-systems", "Embedded Systems", "fundamentals", None, ("embedded", "firmware")),
+    ("iot", "IoT", "fundamentals", None, ("internet of things",)),
+    ("blockchain", "Blockchain", "fundamentals", None, ("web3", "smart contracts")),
+
+    # Practices
+    ("agile", "Agile", "practices", None, ("agile methodologies",)),
+    ("scrum", "Scrum", "practices", "agile", ()),
+    ("kanban", "Kanban", "practices", "agile", ()),
+    ("jira", "Jira", "practices", None, ()),
+    ("code-review", "Code Review", "practices", None, ("code reviews",)),
+    ("technical-writing", "Technical Writing", "practices", None, ("documentation",)),
+]
+
+# Aliases that are too ambiguous to match in free text ("I can go", "Grade: C").
+# They still normalize when given as a skill name.
+UNSCANNABLE = {
+    "c", "r", "go", "next", "rest", "auth", "shell", "sh", "py", "ts", "dl", "ml", "cv", "asm",
+    "stats", "cloud", "database", "containers", "spring", "express", "torch", "less", "gin",
+    "remix", "backbone", "chef", "helm", "julia", "argo", "excel", "networking", "embedded",
+    "documentation", "forecasting", "experimentation", "unreal", "lambda functions"
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_COMPACT = re.compile(r"[\s._\-]+")
+# Same-length whitespace mapping so scan offsets stay valid for the original text
+_SPACES = str.maketrans({ch: " " for ch in "\t\n\r\f\v\xa0"})
+
+
+def normalize_text(name: str) -> str:
+    """Case-fold, NFKC-normalize and collapse whitespace."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", name or "")).strip().lower()
+
+
+def _compact(name: str) -> str:
+    """Spelling-insensitive form: "React.js", "react js" and "reactjs" coincide."""
+    return _COMPACT.sub("", normalize_text(name))
+
+
+class _Automaton:
+    """
+    Aho-Corasick automaton over lowercase alias strings.
+
+    Built once; `find` reports every (start, end, skill_id) occurrence in a
+    single pass over the text, independent of the number of patterns.
+    """
+
+    def __init__(self, patterns: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]
+
+        for pattern, skill_id in patterns.items():
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(pattern), skill_id))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        matches = []
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, skill_id in out[node]:
+                matches.append((i - length + 1, i + 1, skill_id))
+        return matches
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills with alias normalization and free-text extraction.
+
+    `key` maps any spelling to a stable ID with one hash lookup, so
+    comparisons, dedup and cache keys agree on "React.js" vs "react".
+    Unknown skills keep their normalized text as the key. Parents model
+    the hierarchy (Next.js -> React -> JavaScript): knowing a skill
+    implies some knowledge of its ancestors.
+    """
+
+    def __init__(self, skills: Iterable[Tuple[str, str, str, Optional[str], Tuple[str, ...]]]):
+        self._skills: Dict[str, Dict[str, Any]] = {}
+        self._aliases: Dict[str, str] = {}
+        scan_patterns: Dict[str, str] = {}
+
+        for skill_id, name, category, parent, aliases in skills:
+            self._skills[skill_id] = {"id": skill_id, "name": name, "category": category, "parent": parent}
+            for alias in (skill_id, name) + tuple(aliases):
+                normalized = normalize_text(alias)
+                self._aliases.setdefault(normalized, skill_id)
+                self._aliases.setdefault(_compact(alias), skill_id)
+                if normalized not in UNSCANNABLE:
+                    scan_patterns.setdefault(normalized, skill_id)
+
+        for skill in self._skills.values():
+            if skill["parent"] and skill["parent"] not in self._skills:
+                raise ValueError(f"Skill {skill['id']} has unknown parent {skill['parent']}")
+
+        self._automaton = _Automaton(scan_patterns)
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Canonical ID for a skill name, or None when it is not in the taxonomy."""
+        normalized = normalize_text(name)
+        return self._aliases.get(normalized) or self._aliases.get(_compact(normalized))
+
+    def key(self, name: str) -> str:
+        """Comparison/cache key: canonical ID if known, else the normalized text."""
+        return self.resolve(name) or normalize_text(name)
+
+    def display_name(self, name: str) -> str:
+        """Canonical display name for known skills; unknown names are returned trimmed."""
+        skill_id = self.resolve(name)
+        return self._skills[skill_id]["name"] if skill_id else _WHITESPACE.sub(" ", (name or "").strip())
+
+    def get(self, skill_id: str) -> Optional[Dict[str, Any]]:
+        return self._skills.get(skill_id)
+
+    def canonicalize(self, names: Iterable[str]) -> List[str]:
+        """Display names, de-duplicated by key, in first-seen order."""
+        seen: Set[str] = set()
+        result = []
+        for name in names:
+            if not name or not str(name).strip():
+                continue
+            key = self.key(name)
+            if key not in seen:
+                seen.add(key)
+                result.append(self.display_name(name))
+        return result
+
+    def keys(self, names: Iterable[str]) -> Set[str]:
+        return {self.key(name) for name in names if name and str(name).strip()}
+
+    def ancestors(self, skill_id: str) -> List[str]:
+        """Parent chain of a skill, nearest first."""
+        chain = []
+        parent = (self._skills.get(skill_id) or {}).get("parent")
+        while parent and parent not in chain:
+            chain.append(parent)
+            parent = self._skills[parent]["parent"]
+        return chain
+
+    def implied(self, names: Iterable[str]) -> Set[str]:
+        """Keys of the given skills plus all their ancestors."""
+        keys = self.keys(names)
+        for key in list(keys):
+            keys.update(self.ancestors(key))
+        return keys
+
+    def scan(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find skill mentions in free text.
+
+        Matches must sit on word boundaries ("java" does not match inside
+        "javascript"); overlapping matches resolve to the leftmost, longest.
+
+        Returns:
+            (start, end, skill_id) spans in text order
+        """
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Rare characters whose lowercase form changes length; keep offsets aligned
+            lowered = "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+        lowered = lowered.translate(_SPACES)
+
+        candidates = [
+            (start, end, skill_id)
+            for start, end, skill_id in self._automaton.find(lowered)
+            if (start == 0 or not lowered[start - 1].isalnum())
+            and (end == len(lowered) or not lowered[end].isalnum())
+        ]
+        candidates.sort(key=lambda match: (match[0], match[0] - match[1]))
+
+        spans = []
+        last_end = -1
+        for start, end, skill_id in candidates:
+            if start >= last_end:
+                spans.append((start, end, skill_id))
+                last_end = end
+        return spans
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical IDs mentioned in text, de-duplicated in order of appearance."""
+        seen: Set[str] = set()
+        found = []
+        for _, _, skill_id in self.scan(text):
+            if skill_id not in seen:
+                seen.add(skill_id)
+                found.append(skill_id)
+        return found
+
+
+# Singleton instance
+skill_taxonomy = SkillTaxonomy(SKILLS)
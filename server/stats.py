@@ -0,0 +1,273 @@
+"""Materialized per-user dashboard statistics."""
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import UserStats, UserWeeklyStats, Memory, Milestone, Application
+from schemas import ApplicationStatus, MilestoneStatus
+
+# Window used for "recent feedback" in the memory summary
+FEEDBACK_WINDOW_DAYS = 30
+HIGH_IMPORTANCE = 0.7
+INTERVIEW_STATUSES = (ApplicationStatus.INTERVIEW.value, ApplicationStatus.SCREENING.value)
+
+
+def week_start_for(moment: datetime) -> datetime:
+    """Return midnight on the Monday of the week containing `moment`."""
+    monday = moment - timedelta(days=moment.weekday())
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class UserStatsManager:
+    """
+    Keeps `user_stats` and `user_weekly_stats` in step with source tables.
+
+    The record_* hooks run inside the caller's transaction, before its
+    commit, so counters and source rows are written atomically. Users
+    without a stats row are backfilled from the source tables once.
+    """
+
+    def record_memory(
+        self,
+        db: Session,
+        user_id: str,
+        memory_type: str,
+        importance: float,
+        created_at: Optional[datetime] = None
+    ) -> None:
+        """Account for a newly added memory."""
+        stats, backfilled = self._load_for_update(db, user_id)
+        if backfilled:
+            return
+
+        created_at = created_at or datetime.utcnow()
+
+        stats.total_memories = (stats.total_memories or 0) + 1
+        counts = dict(stats.memory_type_counts or {})
+        counts[memory_type] = counts.get(memory_type, 0) + 1
+        stats.memory_type_counts = counts
+
+        if importance is not None and importance >= HIGH_IMPORTANCE:
+            stats.high_importance_memories = (stats.high_importance_memories or 0) + 1
+
+        if memory_type == "feedback":
+            by_day = self._prune_days(stats.feedback_by_day)
+            day = created_at.date().isoformat()
+            by_day[day] = by_day.get(day, 0) + 1
+            stats.feedback_by_day = by_day
+
+        if stats.oldest_memory_at is None or created_at < stats.oldest_memory_at:
+            stats.oldest_memory_at = created_at
+        if stats.newest_memory_at is None or created_at > stats.newest_memory_at:
+            stats.newest_memory_at = created_at
+
+    def record_milestone_completed(self, db: Session, milestone: Milestone) -> None:
+        """Account for a milestone that just moved to completed."""
+        stats, backfilled = self._load_for_update(db, milestone.user_id)
+        if backfilled:
+            return
+
+        stats.completed_milestones = (stats.completed_milestones or 0) + 1
+
+        week = self._load_week(db, milestone.user_id, milestone.completed_at or datetime.utcnow())
+        week.milestones_completed = (week.milestones_completed or 0) + 1
+        week.hours_invested = (week.hours_invested or 0) + (
+            milestone.actual_hours or milestone.estimated_hours or 0
+        )
+        week.new_skills = sorted(set(week.new_skills or []) | set(milestone.skills_to_learn or []))
+        week.achievements = list(week.achievements or []) + [milestone.title]
+
+    def record_application(self, db: Session, application: Application) -> None:
+        """Account for a newly logged application."""
+        stats, backfilled = self._load_for_update(db, application.user_id)
+        if backfilled:
+            return
+
+        stats.total_applications = (stats.total_applications or 0) + 1
+
+        week = self._load_week(db, application.user_id, application.applied_date or datetime.utcnow())
+        week.applications_submitted = (week.applications_submitted or 0) + 1
+        if application.status in INTERVIEW_STATUSES:
+            week.interviews_attended = (week.interviews_attended or 0) + 1
+
+    def get_stats(self, db: Session, user_id: str) -> UserStats:
+        """Read a user's stats row, backfilling it on first access."""
+        stats = db.get(UserStats, user_id)
+        if stats is None:
+            stats, _ = self._load_for_update(db, user_id)
+            db.commit()
+        return stats
+
+    def memory_insights(self, stats: UserStats) -> Dict[str, Any]:
+        """Render a stats row as the memory summary returned by /agent/memory/summary."""
+        if not stats.total_memories:
+            return {"summary": "No memories yet", "insights": []}
+
+        # Day-granular: today plus the previous 29 calendar days
+        cutoff = (datetime.utcnow() - timedelta(days=FEEDBACK_WINDOW_DAYS)).date().isoformat()
+        recent_feedback = sum(
+            count for day, count in (stats.feedback_by_day or {}).items() if day > cutoff
+        )
+
+        return {
+            "total_memories": stats.total_memories,
+            "by_type": stats.memory_type_counts or {},
+            "recent_feedback_count": recent_feedback,
+            "high_importance_count": stats.high_importance_memories or 0,
+            "oldest_memory": stats.oldest_memory_at,
+            "newest_memory": stats.newest_memory_at
+        }
+
+    def get_weekly(self, db: Session, user_id: str, week_start: datetime) -> Optional[UserWeeklyStats]:
+        """Read one weekly bucket by primary key."""
+        # Make sure pre-existing history has been backfilled
+        self.get_stats(db, user_id)
+        return db.get(UserWeeklyStats, (user_id, week_start))
+
+    def _load_for_update(self, db: Session, user_id: str) -> Tuple[UserStats, bool]:
+        """
+        Lock the user's stats row, creating it from source tables if missing.
+
+        Returns:
+            (stats row, whether it was just backfilled)
+        """
+        # Make pending source rows visible to a possible backfill
+        db.flush()
+
+        stats = db.query(UserStats).filter(
+            UserStats.user_id == user_id
+        ).with_for_update().first()
+        if stats is not None:
+            return stats, False
+
+        savepoint = db.begin_nested()
+        try:
+            stats = self._backfill(db, user_id)
+            savepoint.commit()
+        except IntegrityError:
+            # A concurrent request created the row first
+            savepoint.rollback()
+            stats = db.query(UserStats).filter(
+                UserStats.user_id == user_id
+            ).with_for_update().one()
+            return stats, False
+
+        return stats, True
+
+    def _load_week(self, db: Session, user_id: str, moment: datetime) -> UserWeeklyStats:
+        """Get or create the weekly bucket containing `moment`."""
+        week_start = week_start_for(moment)
+        week = db.get(UserWeeklyStats, (user_id, week_start))
+        if week is None:
+            week = self._new_week(user_id, week_start)
+            db.add(week)
+        return week
+
+    def _backfill(self, db: Session, user_id: str) -> UserStats:
+        """Build stats and weekly buckets from the source tables."""
+        stats = UserStats(
+            user_id=user_id,
+            total_memories=0,
+            memory_type_counts={},
+            high_importance_memories=0,
+            feedback_by_day={},
+            completed_milestones=0,
+            total_applications=0
+        )
+
+        # Memory counters in a single aggregate pass (embeddings untouched)
+        rows = db.query(
+            Memory.memory_type,
+            func.count(Memory.id),
+            func.count(Memory.id).filter(Memory.importance >= HIGH_IMPORTANCE),
+            func.min(Memory.created_at),
+            func.max(Memory.created_at)
+        ).filter(Memory.user_id == user_id).group_by(Memory.memory_type).all()
+
+        if rows:
+            stats.total_memories = sum(row[1] for row in rows)
+            stats.memory_type_counts = {row[0]: row[1] for row in rows}
+            stats.high_importance_memories = sum(row[2] for row in rows)
+            stats.oldest_memory_at = min((row[3] for row in rows if row[3] is not None), default=None)
+            stats.newest_memory_at = max((row[4] for row in rows if row[4] is not None), default=None)
+
+        feedback_day = func.date(Memory.created_at)
+        feedback_rows = db.query(feedback_day, func.count(Memory.id)).filter(
+            Memory.user_id == user_id,
+            Memory.memory_type == "feedback",
+            Memory.created_at >= datetime.utcnow() - timedelta(days=FEEDBACK_WINDOW_DAYS + 1)
+        ).group_by(feedback_day).all()
+        stats.feedback_by_day = {str(day): count for day, count in feedback_rows}
+
+        weeks: Dict[datetime, UserWeeklyStats] = {}
+
+        def bucket(moment: datetime) -> UserWeeklyStats:
+            start = week_start_for(moment)
+            if start not in weeks:
+                weeks[start] = self._new_week(user_id, start)
+            return weeks[start]
+
+        completed = db.query(
+            Milestone.title,
+            Milestone.skills_to_learn,
+            Milestone.actual_hours,
+            Milestone.estimated_hours,
+            Milestone.completed_at
+        ).filter(
+            Milestone.user_id == user_id,
+            Milestone.status == MilestoneStatus.COMPLETED.value
+        ).all()
+        stats.completed_milestones = len(completed)
+
+        for title, skills, actual_hours, estimated_hours, completed_at in completed:
+            if completed_at is None:
+                continue
+            week = bucket(completed_at)
+            week.milestones_completed += 1
+            week.hours_invested += actual_hours or estimated_hours or 0
+            week.new_skills = sorted(set(week.new_skills) | set(skills or []))
+            week.achievements = week.achievements + [title]
+
+        applications = db.query(Application.applied_date, Application.status).filter(
+            Application.user_id == user_id
+        ).all()
+        stats.total_applications = len(applications)
+
+        for applied_date, status in applications:
+            if applied_date is None:
+                continue
+            week = bucket(applied_date)
+            week.applications_submitted += 1
+            if status in INTERVIEW_STATUSES:
+                week.interviews_attended += 1
+
+        db.add(stats)
+        for week in weeks.values():
+            db.merge(week)
+        db.flush()
+        return stats
+
+    @staticmethod
+    def _new_week(user_id: str, week_start: datetime) -> UserWeeklyStats:
+        return UserWeeklyStats(
+            user_id=user_id,
+            week_start=week_start,
+            milestones_completed=0,
+            applications_submitted=0,
+            interviews_attended=0,
+            hours_invested=0,
+            new_skills=[],
+            achievements=[]
+        )
+
+    @staticmethod
+    def _prune_days(by_day: Optional[Dict[str, int]]) -> Dict[str, int]:
+        """Drop daily feedback counts that fell out of the window."""
+        cutoff = (datetime.utcnow() - timedelta(days=FEEDBACK_WINDOW_DAYS + 1)).date().isoformat()
+        return {day: count for day, count in (by_day or {}).items() if day >= cutoff}
+
+
+# Singleton instance
+user_stats = UserStatsManager()
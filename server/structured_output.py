@@ -0,0 +1,294 @@
+"""Schema-validated JSON output from chat models, with bounded repair retries."""
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, Tuple, Union, get_args, get_origin
+import logging
+
+import orjson
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from pydantic import TypeAdapter
+
+from config import settings
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+STRUCTURED_OUTPUTS = registry.counter(
+    "llm_structured_outputs_total",
+    "Structured LLM outputs by call site and outcome (ok, repaired, failed)",
+    ["call_site", "outcome"]
+)
+STRUCTURED_REPAIRS = registry.counter(
+    "llm_structured_repairs_total", "Repair requests sent after unparseable output", ["call_site"]
+)
+
+_ADAPTERS: Dict[Any, TypeAdapter] = {}
+
+
+class StructuredOutputError(ValueError):
+    """Model output could not be parsed into the requested schema."""
+
+    def __init__(self, call_site: str, content: str, error: Exception):
+        super().__init__(f"{call_site}: unparseable LLM output ({str(error)[:200]})")
+        self.call_site = call_site
+        self.content = content
+        self.error = error
+
+
+def response_text(response: Any) -> str:
+    """Text content of a chat model response."""
+    content = getattr(response, "content", response)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for block in content:
+            if isinstance(block, dict):
+                parts.append(str(block.get("text", "")))
+            else:
+                parts.append(str(block))
+        return " ".join(parts)
+    return str(content)
+
+
+def extract_json(text: str, expect_array: bool = False) -> Any:
+    """
+    Decode JSON from model output.
+
+    Tries the text as-is, then without markdown fences, then the outermost
+    object (or array) found inside surrounding prose.
+
+    Raises:
+        ValueError: No decodable JSON was found
+    """
+    text = text.strip()
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+
+    opener, closer = ("[", "]") if expect_array else ("{", "}")
+    start, end = text.find(opener), text.rfind(closer)
+    if start == -1 or end <= start:
+        raise ValueError(f"No JSON {'array' if expect_array else 'object'} in output")
+    return orjson.loads(text[start:end + 1])
+
+
+def parse_structured(content: str, schema: Any) -> Any:
+    """
+    Parse and validate model output against a schema.
+
+    Args:
+        content: Raw model output
+        schema: Pydantic model or type (e.g. List[SomeModel])
+
+    Returns:
+        Validated instance of `schema`
+
+    Raises:
+        ValueError: Output is not valid JSON or does not match the schema
+    """
+    data = extract_json(content, expect_array=_is_array_schema(schema))
+    return _adapter(schema).validate_python(data)
+
+
+async def ainvoke_structured(
+    llm: Any,
+    prompt: Union[str, List[BaseMessage]],
+    schema: Any,
+    call_site: Optional[str] = None,
+    max_repairs: Optional[int] = None
+) -> Any:
+    """
+    Invoke a gateway chat model and return output validated against `schema`.
+
+    Object schemas use the provider's JSON mode. Output that still fails
+    to parse is sent back with the error for up to `max_repairs` attempts;
+    the outcome is counted per call site either way.
+
+    Args:
+        llm: GatedChatModel from llm_gateway
+        prompt: Prompt string or message list
+        schema: Pydantic model or type (e.g. List[SomeModel])
+        call_site: Metrics label (defaults to the handle's call site)
+        max_repairs: Repair attempts (defaults to LLM_STRUCTURED_MAX_REPAIRS)
+
+    Returns:
+        Validated instance of `schema`
+
+    Raises:
+        StructuredOutputError: Output was still invalid after all repairs
+    """
+    call_site = call_site or llm.call_site
+    if max_repairs is None:
+        max_repairs = settings.LLM_STRUCTURED_MAX_REPAIRS
+
+    kwargs: Dict[str, Any] = {}
+    if settings.LLM_JSON_MODE and not _is_array_schema(schema):
+        kwargs["response_format"] = {"type": "json_object"}
+
+    validated: Dict[str, Any] = {}
+
+    def validate(r: Any) -> None:
+        # Keep the result so the response is not parsed a second time below
+        validated["response"], validated["result"] = r, parse_structured(response_text(r), schema)
+
+    # Routed handles escalate to the large model when this check fails
+    response = await llm.ainvoke(prompt, call_site=call_site, validate=validate, **kwargs)
+    if validated.get("response") is response:
+        STRUCTURED_OUTPUTS.inc(call_site=call_site, outcome="ok")
+        return validated["result"]
+    return await _settle(llm, prompt, schema, call_site, response, max_repairs, kwargs)
+
+
+async def astream_structured(
+    llm: Any,
+    prompt: Union[str, List[BaseMessage]],
+    schema: Any,
+    call_site: Optional[str] = None,
+    max_repairs: Optional[int] = None
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Stream a structured response, yielding array items as they complete.
+
+    Yields ("item", dict) for every JSON object that closes inside an
+    array (e.g. each milestone of a plan) while tokens arrive, then
+    ("result", validated) once the whole output has been parsed, with the
+    same repair handling as `ainvoke_structured`. Items are previews; the
+    result is authoritative.
+
+    Raises:
+        StructuredOutputError: Output was still invalid after all repairs
+    """
+    call_site = call_site or llm.call_site
+    if max_repairs is None:
+        max_repairs = settings.LLM_STRUCTURED_MAX_REPAIRS
+
+    items = JsonItemStream()
+    full = None
+    async for chunk in llm.astream(prompt, call_site=call_site):
+        full = chunk if full is None else full + chunk
+        for item in items.feed(response_text(chunk)):
+            yield "item", item
+
+    result = await _settle(llm, prompt, schema, call_site, full, max_repairs, {})
+    yield "result", result
+
+
+class JsonItemStream:
+    """
+    Incremental scanner for JSON arriving in chunks.
+
+    `feed` returns each object that is an element of an array as soon as
+    its closing brace arrives. Prose and markdown around the JSON are
+    skipped, and brackets inside strings are ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._item_start: Optional[int] = None
+        self._item_depth = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        items = []
+        offset = len(self.text)
+        self.text += chunk
+
+        for i, ch in enumerate(chunk, start=offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = bool(self._stack)
+            elif ch in "{[":
+                if ch == "{" and self._item_start is None and self._stack and self._stack[-1] == "[":
+                    self._item_start, self._item_depth = i, len(self._stack)
+                self._stack.append(ch)
+            elif ch in "}]" and self._stack:
+                self._stack.pop()
+                if ch == "}" and self._item_start is not None and len(self._stack) == self._item_depth:
+                    try:
+                        items.append(orjson.loads(self.text[self._item_start:i + 1]))
+                    except orjson.JSONDecodeError:
+                        pass
+                    self._item_start = None
+        return items
+
+
+async def _settle(
+    llm: Any,
+    prompt: Union[str, List[BaseMessage]],
+    schema: Any,
+    call_site: str,
+    response: Any,
+    max_repairs: int,
+    kwargs: Dict[str, Any]
+) -> Any:
+    """Parse `response`, sending repair requests until it validates or attempts run out."""
+    attempt = 0
+    while True:
+        content = response_text(response) if response is not None else ""
+        try:
+            result = parse_structured(content, schema)
+        except ValueError as e:
+            error = e
+        else:
+            STRUCTURED_OUTPUTS.inc(call_site=call_site, outcome="ok" if attempt == 0 else "repaired")
+            return result
+
+        if attempt == 0:
+            # Keep the unusable answer out of the response cache
+            await llm.discard(prompt, **kwargs)
+        if attempt >= max_repairs:
+            break
+
+        attempt += 1
+        STRUCTURED_REPAIRS.inc(call_site=call_site)
+        response = await llm.ainvoke(_repair_messages(prompt, content, error), call_site=call_site, **kwargs)
+
+    STRUCTURED_OUTPUTS.inc(call_site=call_site, outcome="failed")
+    logger.warning(f"Structured output failed for {call_site}: {str(error)[:200]}")
+    raise StructuredOutputError(call_site, content, error)
+
+
+def _repair_messages(
+    prompt: Union[str, List[BaseMessage]],
+    content: str,
+    error: Exception
+) -> List[BaseMessage]:
+    messages = list(prompt) if isinstance(prompt, list) else [HumanMessage(content=prompt)]
+    return messages + [
+        AIMessage(content=content),
+        HumanMessage(content=(
+            f"That reply could not be used: {str(error)[:500]}\n"
+            "Respond again with ONLY the corrected JSON. No markdown fences or commentary."
+        ))
+    ]
+
+
+def _adapter(schema: Any) -> TypeAdapter:
+    adapter = _ADAPTERS.get(schema)
+    if adapter is None:
+        adapter = _ADAPTERS[schema] = TypeAdapter(schema)
+    return adapter
+
+
+def _is_array_schema(schema: Any) -> bool:
+    origin = get_origin(schema)
+    if origin is Annotated:
+        return _is_array_schema(get_args(schema)[0])
+    return schema is list or origin is list
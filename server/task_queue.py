@@ -0,0 +1,161 @@
+"""In-process background jobs with durable, pollable status."""
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal, BackgroundTask
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+TASKS = registry.counter(
+    "background_tasks_total", "Background tasks by kind and final status", ["kind", "status"]
+)
+TASK_DURATION = registry.histogram(
+    "background_task_duration_seconds", "Background task run time, excluding queueing", ["kind"]
+)
+
+# A job gets its own session (the request's is closed by the time it runs)
+# and returns a JSON-serializable result stored on the task row.
+Job = Callable[..., Awaitable[Optional[Dict[str, Any]]]]
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class TaskQueue:
+    """
+    Runs jobs on the event loop after the response has been sent.
+
+    Status lives in the background_tasks table rather than in memory, so
+    any worker can answer a status poll. A task still pending
+    BACKGROUND_TASK_TIMEOUT_SECONDS after submission, or still running that
+    long after it started (e.g. its worker restarted), is reported as
+    failed. Terminal statuses are final: a job that starts or finishes
+    after its task was marked failed does not overwrite it.
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Strong references keep tasks alive until they finish
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, kind: str, user_id: str, job: Job, **kwargs) -> str:
+        """
+        Record a pending task and schedule `job(db, user_id, **kwargs)`.
+
+        The row is inserted in a worker thread so the commit does not block
+        the event loop.
+
+        Returns:
+            Task id for GET /agent/tasks/{task_id}
+        """
+        task_id = str(uuid.uuid4())
+        await asyncio.to_thread(self._insert, task_id, kind, user_id)
+
+        task = asyncio.create_task(self._run(task_id, kind, job, user_id, kwargs))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        return task_id
+
+    async def _run(self, task_id: str, kind: str, job: Job, user_id: str, kwargs: Dict[str, Any]) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with self._semaphore:
+            db = SessionLocal()
+            if not self._update(db, task_id, status="running", started_at=datetime.utcnow()):
+                # Timed out while queued and already reported as failed
+                logger.warning(f"Background task {kind} {task_id} expired before it started")
+                db.close()
+                return
+            start = time.perf_counter()
+            try:
+                result = await job(db, user_id, **kwargs)
+                if self._update(db, task_id, status="succeeded", result=result, finished_at=datetime.utcnow()):
+                    TASKS.inc(kind=kind, status="succeeded")
+            except Exception as e:
+                logger.warning(f"Background task {kind} {task_id} failed: {str(e)[:200]}")
+                db.rollback()
+                if self._update(db, task_id, status="failed", error=str(e)[:500], finished_at=datetime.utcnow()):
+                    TASKS.inc(kind=kind, status="failed")
+            finally:
+                TASK_DURATION.observe(time.perf_counter() - start, kind=kind)
+                db.close()
+
+    @staticmethod
+    def _insert(task_id: str, kind: str, user_id: str) -> None:
+        db = SessionLocal()
+        try:
+            db.add(BackgroundTask(id=task_id, kind=kind, user_id=user_id, status="pending"))
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _update(db: Session, task_id: str, **fields) -> bool:
+        """Apply `fields` unless the task already has a terminal status; returns whether it did."""
+        updated = db.query(BackgroundTask).filter(
+            BackgroundTask.id == task_id,
+            BackgroundTask.status.notin_(TERMINAL_STATUSES)
+        ).update(fields, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+
+    def get(self, db: Session, task_id: str) -> Optional[Dict[str, Any]]:
+        """Current status of a task, or None if it does not exist."""
+        task = db.query(BackgroundTask).filter(BackgroundTask.id == task_id).first()
+        if not task:
+            return None
+
+        deadline = datetime.utcnow() - timedelta(seconds=settings.BACKGROUND_TASK_TIMEOUT_SECONDS)
+        # Queue wait counts against pending tasks only; running ones are timed from their start
+        since = task.started_at if task.status == "running" and task.started_at else task.created_at
+        if task.status not in TERMINAL_STATUSES and since < deadline:
+            # The worker that owned it is gone; stop clients polling forever
+            if self._update(db, task.id, status="failed", error="Task did not finish in time",
+                            finished_at=datetime.utcnow()):
+                TASKS.inc(kind=task.kind, status="failed")
+            # Re-read: the job may have finished just before the update
+            db.refresh(task)
+
+        return {
+            "task_id": task.id,
+            "kind": task.kind,
+            "user_id": task.user_id,
+            "status": task.status,
+            "result": task.result,
+            "error": task.error,
+            "created_at": task.created_at,
+            "started_at": task.started_at,
+            "finished_at": task.finished_at,
+        }
+
+    def prune(self) -> int:
+        """Delete finished tasks older than BACKGROUND_TASK_RETENTION_HOURS."""
+        cutoff = datetime.utcnow() - timedelta(hours=settings.BACKGROUND_TASK_RETENTION_HOURS)
+        db = SessionLocal()
+        try:
+            deleted = db.query(BackgroundTask).filter(
+                BackgroundTask.status.in_(TERMINAL_STATUSES),
+                BackgroundTask.created_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Wait (bounded) for in-flight tasks, e.g. on shutdown."""
+        if self._running:
+            await asyncio.wait(set(self._running), timeout=timeout)
+
+
+# Singleton instance
+task_queue = TaskQueue(settings.BACKGROUND_TASK_CONCURRENCY)
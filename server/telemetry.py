@@ -0,0 +1,144 @@
+"""OpenTelemetry tracing for the hot path, free when disabled."""
+from typing import Any, Dict, Optional
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest SQL statement kept on a db.query span
+_MAX_STATEMENT_CHARS = 500
+
+
+class _NoopSpan:
+    """Stands in for a span (and its context manager) when tracing is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException, **kwargs) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_tracer = None
+_provider = None
+
+
+def _configure() -> None:
+    """Install the tracer provider and OTLP exporter when TELEMETRY_ENABLED."""
+    global _tracer, _provider
+    if not settings.TELEMETRY_ENABLED:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError as e:
+        logger.warning(f"Telemetry disabled, OpenTelemetry packages missing: {e}")
+        return
+
+    _provider = TracerProvider(
+        resource=Resource.create({
+            "service.name": settings.OTEL_SERVICE_NAME,
+            "service.version": settings.APP_VERSION,
+            "deployment.environment": settings.ENVIRONMENT,
+        }),
+        sampler=ParentBased(TraceIdRatioBased(settings.TELEMETRY_SAMPLE_RATIO)),
+    )
+    endpoint = settings.OTEL_EXPORTER_OTLP_ENDPOINT.rstrip("/") + "/v1/traces"
+    _provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    trace.set_tracer_provider(_provider)
+    _tracer = trace.get_tracer("career-mentor")
+    logger.info(f"Telemetry exporting spans to {endpoint}")
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Context manager for a span that becomes the current parent.
+
+    With tracing off this returns a shared no-op object, so call sites
+    cost one function call and allocate nothing. Guard expensive
+    attribute computation with `s.is_recording()`.
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Start a span without making it current; the caller must `end()` it.
+
+    Used where a `with` block would straddle an async generator's yields.
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.start_span(name, attributes=attributes)
+
+
+def instrument_engine(engine) -> None:
+    """Emit a db.query span per statement. No listeners are added when tracing is off."""
+    if _tracer is None:
+        return
+    from sqlalchemy import event
+
+    system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        context._otel_span = _tracer.start_span(f"db.{operation.lower() or 'query'}", attributes={
+            "db.system": system,
+            "db.operation": operation,
+            "db.statement": statement[:_MAX_STATEMENT_CHARS],
+            "db.executemany": executemany,
+        })
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        db_span = getattr(context, "_otel_span", None)
+        if db_span is None:
+            return
+        # SELECT row counts are unknown until fetched (-1)
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            db_span.set_attribute("db.rows_affected", cursor.rowcount)
+        db_span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        db_span = getattr(context, "_otel_span", None) if context is not None else None
+        if db_span is not None:
+            db_span.record_exception(exception_context.original_exception)
+            db_span.set_attribute("error", True)
+            db_span.end()
+
+
+def shutdown() -> None:
+    """Flush buffered spans."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+_configure()
@@ -0,0 +1,30 @@
+"""Shared fixtures. Tests use throwaway SQLite databases and never call a provider."""
+import os
+import sys
+import tempfile
+
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+# Settings are read at import time; keep the developer's database out of reach
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="career_mentor_tests_"), "app.db")
+os.environ["LLM_CACHE_DURABLE"] = "false"
+
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, create_db_engine
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Session on a fresh SQLite database with all tables created."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
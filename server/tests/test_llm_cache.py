@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+import llm_cache as llm_cache_module
+from config import settings
+from database import init_db
+from llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def cache():
+    return LLMResponseCache()
+
+
+def test_make_key_is_stable_and_input_sensitive():
+    messages = [SystemMessage(content="Be brief"), HumanMessage(content="Hi")]
+    key = LLMResponseCache.make_key("m", 0, messages)
+
+    assert key == LLMResponseCache.make_key("m", 0.0, list(messages))
+    assert key != LLMResponseCache.make_key("other", 0, messages)
+    assert key != LLMResponseCache.make_key("m", 0, [HumanMessage(content="Hi")])
+    assert key != LLMResponseCache.make_key("m", 0, messages, {"response_format": {"type": "json_object"}})
+
+
+def test_only_temperature_zero_is_cacheable(cache, monkeypatch):
+    assert cache.is_cacheable(0)
+    assert not cache.is_cacheable(0.7)
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    assert not cache.is_cacheable(0)
+
+
+def test_round_trip_marks_hit(cache):
+    async def run():
+        await cache.set("k", "m", AIMessage(content="answer", usage_metadata={
+            "input_tokens": 7, "output_tokens": 5, "total_tokens": 12
+        }))
+        return await cache.get("k")
+
+    hit = asyncio.run(run())
+    assert hit.content == "answer"
+    assert hit.response_metadata == {"cache_hit": True, "cache_tier": "memory"}
+    assert asyncio.run(cache.get("missing")) is None
+
+
+def test_entries_expire_after_ttl(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache_module.time, "time", lambda: now[0])
+    monkeypatch.setattr(settings, "LLM_CACHE_TTL_SECONDS", 60)
+
+    asyncio.run(cache.set("k", "m", AIMessage(content="answer")))
+    now[0] += 59
+    assert asyncio.run(cache.get("k")) is not None
+    now[0] += 2
+    assert asyncio.run(cache.get("k")) is None
+
+
+def test_lru_evicts_least_recently_used(cache, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_MAX_ENTRIES", 2)
+
+    async def run():
+        await cache.set("a", "m", AIMessage(content="A"))
+        await cache.set("b", "m", AIMessage(content="B"))
+        await cache.get("a")  # "b" is now the oldest
+        await cache.set("c", "m", AIMessage(content="C"))
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    a, b, c = asyncio.run(run())
+    assert a is not None and c is not None
+    assert b is None
+
+
+def test_multipart_responses_are_not_cached(cache):
+    asyncio.run(cache.set("k", "m", AIMessage(content=[{"type": "text", "text": "x"}])))
+    assert asyncio.run(cache.get("k")) is None
+
+
+def test_discard_and_durable_tier(cache, monkeypatch):
+    init_db()
+    monkeypatch.setattr(settings, "LLM_CACHE_DURABLE", True)
+
+    asyncio.run(cache.set("k", "m", AIMessage(content="stored")))
+    cache.clear()
+    hit = asyncio.run(cache.get("k"))
+    assert hit.content == "stored"
+    assert hit.response_metadata["cache_tier"] == "durable"
+
+    asyncio.run(cache.discard("k"))
+    assert asyncio.run(cache.get("k")) is None
+
+
+def test_durable_read_failure_is_a_miss(cache, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_DURABLE", True)
+
+    def locked(key):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(cache, "_get_durable", locked)
+
+    assert asyncio.run(cache.get("k")) is None
@@ -0,0 +1,112 @@
+import json
+import os
+import time
+
+import pytest
+
+from metrics import MetricsRegistry, MultiprocessMetrics, merge_snapshots, registry, render_prometheus
+
+
+def worker(requests, in_flight, p95, latencies):
+    """Snapshot of one simulated worker process."""
+    worker_registry = MetricsRegistry()
+    counter = worker_registry.counter("requests_total", "Requests", ["route"])
+    worker_registry.gauge("in_flight", "In-flight requests").set(in_flight)
+    worker_registry.gauge("loop_lag_p95", "Loop lag p95", aggregate="max").set(p95)
+    histogram = worker_registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for route, count in requests.items():
+        counter.inc(count, route=route)
+    for value in latencies:
+        histogram.observe(value)
+    return worker_registry.snapshot()
+
+
+def by_name(metrics):
+    return {entry["name"]: entry["samples"] for entry in metrics}
+
+
+def test_labels_must_match():
+    counter = MetricsRegistry().counter("c", "C", ["route"])
+
+    with pytest.raises(ValueError):
+        counter.inc(method="GET")
+
+
+def test_registry_reuses_metric_on_reregistration():
+    metrics = MetricsRegistry()
+
+    assert metrics.counter("c", "C") is metrics.counter("c", "C again")
+
+
+def test_callback_gauge_and_failing_callback():
+    metrics = MetricsRegistry()
+    metrics.gauge("pool", "Pool", ["state"], callback=lambda: {("idle",): 3, ("busy",): 1})
+    metrics.gauge("broken", "Broken", callback=lambda: 1 / 0)
+
+    snapshot = by_name(metrics.snapshot()["metrics"])
+
+    assert sorted(snapshot["pool"]) == [[["busy"], 1.0], [["idle"], 3.0]]
+    assert "broken" not in snapshot
+
+
+def test_merge_sums_counters_histograms_and_gauges():
+    merged = by_name(merge_snapshots([
+        worker({"/a": 2, "/b": 1}, 3, 0.02, [0.05, 2.0]),
+        worker({"/a": 5}, 4, 0.09, [0.5])
+    ]))
+
+    assert merged["requests_total"] == {("/a",): 7.0, ("/b",): 1.0}
+    assert merged["in_flight"] == {(): 7.0}
+    assert merged["loop_lag_p95"] == {(): 0.09}
+    # [<=0.1, <=1.0, count, sum]
+    assert merged["latency_seconds"][()] == [1.0, 2.0, 3.0, pytest.approx(2.55)]
+
+
+def test_merge_drops_gauges_of_stale_workers():
+    stale = worker({"/a": 10}, 5, 0.5, [])
+    stale["written_at"] = time.time() - 60
+
+    merged = by_name(merge_snapshots([stale, worker({"/a": 1}, 2, 0.01, [])], gauge_max_age=15))
+
+    assert merged["requests_total"] == {("/a",): 11.0}
+    assert merged["in_flight"] == {(): 2.0}
+    assert merged["loop_lag_p95"] == {(): 0.01}
+
+
+def test_render_prometheus():
+    metrics = MetricsRegistry()
+    metrics.counter("requests_total", "Requests", ["route"]).inc(2, route='/a"b')
+    histogram = metrics.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(5)
+
+    text = render_prometheus(merge_snapshots([metrics.snapshot()]))
+
+    assert text.endswith("\n")
+    assert text.splitlines() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1.0',
+        'latency_seconds_bucket{le="1.0"} 1.0',
+        'latency_seconds_bucket{le="+Inf"} 2.0',
+        "latency_seconds_sum 5.05",
+        "latency_seconds_count 2.0",
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 2.0'
+    ]
+
+
+def test_multiprocess_collect_merges_worker_files(tmp_path):
+    requests = registry.counter("test_multiprocess_total", "Multiprocess test counter")
+    requests.inc(3)
+    with open(tmp_path / "metrics-99999.json", "w") as f:
+        json.dump({"pid": 99999, "written_at": time.time(), "metrics": [{
+            "name": "test_multiprocess_total", "kind": "counter", "help": "", "labelnames": [], "samples": [[[], 4.0]]
+        }]}, f)
+
+    merged = by_name(MultiprocessMetrics(str(tmp_path), interval=5).collect())
+
+    assert merged["test_multiprocess_total"] == {(): 7.0}
+    assert os.path.exists(tmp_path / f"metrics-{os.getpid()}.json")
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
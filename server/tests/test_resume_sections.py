@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from resume_sections import clean_lines, compact, estimate_tokens, heading_name, segment
+
+RESUMES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "resumes")
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 0100
+Page 1 of 2
+
+PROFESSIONAL SUMMARY
+Backend engineer.
+-----
+Work Experience
+Acme Corp - Senior Engineer (2021-now)
+- Built APIs
+
+Jane Doe
+jane@example.com | +1 555 0100
+Page 2 of 2
+Skills: Python, SQL
+Docker
+Experience
+Initech - Engineer (2018-2021)
+Hobbies & Interests
+Chess
+References available upon request
+"""
+
+
+def test_heading_name():
+    assert heading_name("WORK EXPERIENCE") == "experience"
+    assert heading_name("  Tools & Technologies: ") == "skills"
+    assert heading_name("Built the experience platform for ten teams") is None
+    assert heading_name("") is None
+
+
+def test_clean_lines_drops_layout_noise():
+    lines = clean_lines(RESUME)
+
+    assert lines.count("Jane Doe") == 1
+    assert not any(line.startswith("Page") or line == "-----" for line in lines)
+    assert "References available upon request" not in lines
+    assert "" not in (lines[0], lines[-1])
+
+
+def test_segment_splits_and_merges_sections():
+    sections = segment(RESUME)
+
+    assert [section["name"] for section in sections] == ["header", "summary", "experience", "skills", "interests"]
+    assert sections[0]["text"] == "Jane Doe\njane@example.com | +1 555 0100"
+    assert sections[2]["heading"] == "Work Experience"
+    assert sections[2]["text"].endswith("Initech - Engineer (2018-2021)")
+    assert sections[3] == {"name": "skills", "heading": "Skills", "text": "Python, SQL\nDocker"}
+
+
+def test_unstructured_text_is_all_header():
+    sections = segment("Taught maths for ten years.\nLearning Python now.")
+
+    assert sections == [{"name": "header", "heading": "", "text": "Taught maths for ten years.\nLearning Python now."}]
+
+
+def test_compact_drops_low_value_sections_and_orders_by_priority():
+    text = compact(segment(RESUME), 1000)
+
+    assert "Chess" not in text
+    assert text.index("## EXPERIENCE") < text.index("## SKILLS") < text.index("## SUMMARY")
+    assert "[...]" not in text
+
+
+def test_compact_truncates_at_line_boundaries():
+    sections = [
+        {"name": "header", "heading": "", "text": "Jane Doe"},
+        {"name": "experience", "heading": "Experience", "text": "\n".join(f"Role {i}: " + "x" * 60 for i in range(20))},
+        {"name": "skills", "heading": "Skills", "text": "Python, SQL"}
+    ]
+
+    text = compact(sections, 120)
+
+    assert "Jane Doe" in text and "Python, SQL" in text
+    assert "Role 0:" in text and "Role 19:" not in text
+    assert "[...]" in text
+
+
+@pytest.mark.parametrize("name", sorted(os.listdir(RESUMES_DIR)))
+def test_compact_respects_budget_on_sample_resumes(name):
+    with open(os.path.join(RESUMES_DIR, name), encoding="utf-8") as f:
+        raw = f.read()
+
+    for budget in (300, 1000):
+        # Section separators and cut markers add a little on top of the allotments
+        assert estimate_tokens(compact(segment(raw), budget)) <= budget + 25
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+import roadmap_templates as roadmap_templates_module
+from config import settings
+from database import init_db
+from roadmap_templates import RoadmapTemplateStore, template_key
+
+MILESTONES = [
+    {"title": "Containers", "skills": ["Docker", "Kubernetes"], "estimated_hours": 40},
+    {"title": "Frontend", "skills": ["React", "TypeScript", "CSS"], "estimated_hours": 30},
+    {"title": "Capstone", "skills": [], "estimated_hours": 10}
+]
+
+
+@pytest.fixture
+def store():
+    return RoadmapTemplateStore()
+
+
+def test_template_key_canonicalizes_inputs():
+    key, role, gaps = template_key("  Backend   Engineer ", ["k8s", "ReactJS"], 12)
+
+    assert role == "backend engineer"
+    assert gaps == ["kubernetes", "react"]
+    assert key == template_key("backend engineer", ["React", "Kubernetes"], 12)[0]
+    assert key != template_key("backend engineer", ["React", "Kubernetes"], 16)[0]
+    assert key != template_key("frontend engineer", ["React", "Kubernetes"], 12)[0]
+
+
+def test_personalize_drops_known_skills_and_scales_hours():
+    result = RoadmapTemplateStore.personalize(MILESTONES, ["k8s", "typescript"])
+
+    assert result[0]["skills"] == ["Docker"]
+    assert result[0]["estimated_hours"] == 20
+    assert result[1]["skills"] == ["React", "CSS"]
+    assert result[1]["estimated_hours"] == 20
+    assert result[2] == MILESTONES[2]
+
+
+def test_personalize_keeps_at_least_half_the_hours():
+    milestones = [{"skills": ["Docker", "Kubernetes", "Terraform", "Helm"], "estimated_hours": 40}]
+
+    result = RoadmapTemplateStore.personalize(milestones, ["Docker", "Kubernetes", "Terraform"])
+
+    assert result[0]["skills"] == ["Helm"]
+    assert result[0]["estimated_hours"] == 20
+
+
+def test_personalize_leaves_fully_known_milestones_and_input_alone():
+    result = RoadmapTemplateStore.personalize(MILESTONES, ["Docker", "Kubernetes"])
+
+    assert result[0] == MILESTONES[0]
+    assert result[0] is not MILESTONES[0]
+    assert MILESTONES[0]["skills"] == ["Docker", "Kubernetes"]
+
+
+def test_put_then_get_is_personalized(store, monkeypatch):
+    monkeypatch.setattr(store, "_put_durable", lambda *args: None)
+
+    async def run():
+        await store.put("Backend Engineer", ["Docker", "React"], 12, MILESTONES)
+        return await store.get("backend engineer", ["react", "docker"], 12, ["Docker"])
+
+    result = asyncio.run(run())
+
+    assert result[0]["skills"] == ["Kubernetes"]
+    assert store.stats()["entries"] == 1
+
+
+def test_miss_and_disabled(store, monkeypatch):
+    monkeypatch.setattr(store, "_get_durable", lambda key: None)
+    monkeypatch.setattr(store, "_put_durable", lambda *args: None)
+
+    assert asyncio.run(store.get("Backend Engineer", ["Docker"], 12)) is None
+
+    monkeypatch.setattr(settings, "ROADMAP_TEMPLATES_ENABLED", False)
+    asyncio.run(store.put("Backend Engineer", ["Docker"], 12, MILESTONES))
+    assert store.stats()["entries"] == 0
+
+
+def test_local_entries_expire(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(roadmap_templates_module.time, "time", lambda: now[0])
+    monkeypatch.setattr(store, "_get_durable", lambda key: None)
+    monkeypatch.setattr(store, "_put_durable", lambda *args: None)
+    asyncio.run(store.put("Backend Engineer", ["Docker"], 12, MILESTONES))
+
+    now[0] += settings.ROADMAP_TEMPLATE_TTL_DAYS * 86400 + 1
+    assert asyncio.run(store.get("Backend Engineer", ["Docker"], 12)) is None
+
+
+def test_local_tier_is_lru(store, monkeypatch):
+    monkeypatch.setattr(settings, "ROADMAP_TEMPLATE_MAX_ENTRIES", 2)
+    monkeypatch.setattr(store, "_get_durable", lambda key: None)
+    monkeypatch.setattr(store, "_put_durable", lambda *args: None)
+
+    async def run():
+        await store.put("Role", ["Docker"], 12, MILESTONES)
+        await store.put("Role", ["React"], 12, MILESTONES)
+        await store.get("Role", ["Docker"], 12)
+        await store.put("Role", ["Go"], 12, MILESTONES)
+        return [await store.get("Role", [gap], 12) is not None for gap in ("Docker", "React", "Go")]
+
+    assert asyncio.run(run()) == [True, False, True]
+
+
+def test_durable_tier_is_shared_between_stores():
+    init_db()
+    writer, reader = RoadmapTemplateStore(), RoadmapTemplateStore()
+
+    asyncio.run(writer.put("Data Engineer", ["Spark", "Airflow"], 8, MILESTONES))
+    result = asyncio.run(reader.get("data engineer", ["airflow", "spark"], 8))
+
+    assert result == MILESTONES
+    assert reader.stats()["entries"] == 1
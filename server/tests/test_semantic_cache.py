@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+import semantic_cache as semantic_cache_module
+from config import settings
+from memory import memory_manager
+from semantic_cache import SemanticResponseCache, context_fingerprint, normalize_message
+
+SKILLS = [{"name": "Python"}, {"name": "Docker"}]
+
+
+class FakeEmbeddings:
+    """Fixed vectors per normalized message; counts calls."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.calls = 0
+
+    async def aembed_query(self, text):
+        self.calls += 1
+        return self.vectors[text]
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    fake = FakeEmbeddings({
+        "how do i learn docker": [1.0, 0.0, 0.0],
+        "how can i learn docker": [0.99, 0.1, 0.0],
+        "what should i learn after python": [0.0, 1.0, 0.0]
+    })
+    monkeypatch.setattr(memory_manager, "_embedding_client", fake)
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_AUDIT_RATE", 0.0)
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_THRESHOLD", 0.92)
+    return fake
+
+
+@pytest.fixture
+def cache():
+    return SemanticResponseCache()
+
+
+def lookup(cache, message, skills=SKILLS, user_id="u1"):
+    return asyncio.run(cache.lookup(message, "Backend Engineer", skills, user_id))
+
+
+def test_normalize_message():
+    assert normalize_message("  How do I learn   DOCKER?! ") == "how do i learn docker"
+    assert normalize_message("C++ or C#, then .NET.") == "c++ or c# then .net"
+    assert normalize_message(None) == ""
+    assert len(normalize_message("a" * 5000)) == 1000
+
+
+def test_fingerprint_ignores_skill_order_and_aliases():
+    base = context_fingerprint("Backend Engineer", [{"name": "JavaScript"}, {"name": "Kubernetes"}], "u1")
+
+    assert base == context_fingerprint(" backend engineer ", [{"name": "k8s"}, {"name": "JS"}], "u1")
+    assert base != context_fingerprint("Data Engineer", [{"name": "JavaScript"}, {"name": "Kubernetes"}], "u1")
+    assert base != context_fingerprint("Backend Engineer", [{"name": "JavaScript"}], "u1")
+
+
+def test_fingerprint_includes_user_unless_shared(monkeypatch):
+    assert context_fingerprint("Backend Engineer", SKILLS, "u1") != context_fingerprint("Backend Engineer", SKILLS, "u2")
+
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_SHARED", True)
+    assert context_fingerprint("Backend Engineer", SKILLS, "u1") == context_fingerprint("Backend Engineer", SKILLS, "u2")
+
+
+def test_ttl_for_uses_intent_table(monkeypatch):
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_INTENT_TTLS", {"general_advice": 60, "other": 0})
+
+    assert SemanticResponseCache.ttl_for("general_advice") == 60
+    assert SemanticResponseCache.ttl_for("milestone_update") == 0
+    assert SemanticResponseCache.ttl_for(None) == 0
+
+
+def test_paraphrase_hits_after_store(cache, embeddings):
+    first = lookup(cache, "How do I learn Docker?")
+    assert not first["hit"]
+    cache.store(first, "general_advice", "Start with the official tutorial.", ["Try compose"], ["Install Docker"])
+
+    second = lookup(cache, "How can I learn docker")
+    assert second["hit"]
+    assert second["similarity"] >= 0.92
+    assert second["cached"]["response"] == "Start with the official tutorial."
+    assert second["cached"]["suggestions"] == ["Try compose"]
+
+    assert not lookup(cache, "What should I learn after Python?")["hit"]
+
+
+def test_exact_repeat_reuses_embedding(cache, embeddings):
+    lookup(cache, "How do I learn Docker?")
+    lookup(cache, "how do i learn docker")
+
+    assert embeddings.calls == 1
+
+
+def test_other_context_misses(cache, embeddings):
+    cache.store(lookup(cache, "How do I learn Docker?"), "general_advice", "answer", [], [])
+
+    assert not lookup(cache, "How can I learn docker", user_id="u2")["hit"]
+    assert not lookup(cache, "How can I learn docker", skills=[{"name": "Go"}])["hit"]
+
+
+def test_uncached_intent_is_not_stored(cache, embeddings):
+    cache.store(lookup(cache, "How do I learn Docker?"), "milestone_update", "Marked done.", [], [])
+
+    assert cache.stats()["entries"] == 0
+    assert not lookup(cache, "How can I learn docker")["hit"]
+
+
+def test_entries_expire(cache, embeddings, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache_module.time, "time", lambda: now[0])
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_INTENT_TTLS", {"general_advice": 60})
+    cache.store(lookup(cache, "How do I learn Docker?"), "general_advice", "answer", [], [])
+
+    now[0] += 59
+    assert lookup(cache, "How can I learn docker")["hit"]
+    now[0] += 2
+    assert not lookup(cache, "How can I learn docker")["hit"]
+    assert cache.stats()["entries"] == 0
+
+
+def test_audited_hit_is_replaced_and_sampled(cache, embeddings, monkeypatch):
+    cache.store(lookup(cache, "How do I learn Docker?"), "general_advice", "old answer", [], [])
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_AUDIT_RATE", 1.0)
+
+    audited = lookup(cache, "How can I learn docker")
+    assert audited["audit"] and not audited["hit"]
+    cache.store(audited, "job_search", "new answer", [], [])
+
+    assert cache.stats()["entries"] == 1
+    sample = cache.samples()[0]
+    assert sample["result"] == "intent_mismatch"
+    assert sample["cached_response"] == "old answer"
+    assert sample["fresh_response"] == "new answer"
+
+
+def test_evicts_least_recently_used_context(cache, embeddings, monkeypatch):
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_MAX_ENTRIES", 1)
+    cache.store(lookup(cache, "How do I learn Docker?", user_id="u1"), "general_advice", "a1", [], [])
+    cache.store(lookup(cache, "How do I learn Docker?", user_id="u2"), "general_advice", "a2", [], [])
+
+    assert cache.stats()["contexts"] == 1
+    assert not lookup(cache, "How can I learn docker", user_id="u1")["hit"]
+    assert lookup(cache, "How can I learn docker", user_id="u2")["hit"]
+
+
+def test_embedding_failure_is_a_miss(cache, monkeypatch):
+    class Failing:
+        async def aembed_query(self, text):
+            raise RuntimeError("provider down")
+
+    monkeypatch.setattr(memory_manager, "_embedding_client", Failing())
+    result = lookup(cache, "How do I learn Docker?")
+
+    assert not result["hit"]
+    assert result["embedding"] is None
+
+
+def test_endpoint_hides_samples_by_default(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    client = TestClient(app)
+    assert "samples" not in client.get("/agent/cache/semantic").json()
+
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_EXPOSE_SAMPLES", True)
+    assert "samples" in client.get("/agent/cache/semantic").json()
@@ -0,0 +1,98 @@
+import time
+import uuid
+
+import pytest
+
+from database import init_db
+from shared_state import DatabaseStateStore, MemoryStateStore, create_state_store
+
+
+@pytest.fixture(params=["memory", "database"])
+def store(request):
+    if request.param == "database":
+        init_db()
+    return create_state_store(request.param)
+
+
+@pytest.fixture
+def prefix():
+    # The database backend shares one table across tests
+    return f"test:{uuid.uuid4().hex}:"
+
+
+def test_backends():
+    assert isinstance(create_state_store("memory"), MemoryStateStore)
+    assert isinstance(create_state_store("database"), DatabaseStateStore)
+    assert not MemoryStateStore.shared and DatabaseStateStore.shared
+
+    with pytest.raises(ValueError):
+        create_state_store("redis")
+
+
+def test_set_get_delete(store, prefix):
+    key = prefix + "session"
+    assert store.get(key) is None
+
+    store.set(key, {"question": 1, "answers": ["a"]})
+    assert store.get(key) == {"question": 1, "answers": ["a"]}
+
+    store.set(key, {"question": 2, "answers": ["a", "b"]})
+    assert store.get(key)["question"] == 2
+
+    store.delete(key)
+    store.delete(key)
+    assert store.get(key) is None
+
+
+def test_values_are_copies(store, prefix):
+    value = {"answers": ["a"]}
+    store.set(prefix + "session", value)
+    value["answers"].append("b")
+
+    read = store.get(prefix + "session")
+    read["answers"].append("c")
+
+    assert store.get(prefix + "session") == {"answers": ["a"]}
+
+
+def test_entries_expire(store, prefix):
+    store.set(prefix + "short", 1, ttl_seconds=0.05)
+    store.set(prefix + "long", 2, ttl_seconds=60)
+    store.set(prefix + "forever", 3)
+    assert store.count(prefix) == 3
+
+    time.sleep(0.1)
+
+    assert store.get(prefix + "short") is None
+    assert store.get(prefix + "long") == 2
+    assert store.get(prefix + "forever") == 3
+    assert store.count(prefix) == 2
+
+
+def test_prune_removes_only_expired(store, prefix):
+    store.set(prefix + "a", 1, ttl_seconds=0.05)
+    store.set(prefix + "b", 2, ttl_seconds=0.05)
+    store.set(prefix + "c", 3, ttl_seconds=60)
+    time.sleep(0.1)
+
+    assert store.prune() >= 2
+    assert store.prune() == 0
+    assert store.count(prefix) == 1
+
+
+def test_count_treats_prefix_literally(store, prefix):
+    store.set(prefix + "interview:1", 1)
+    store.set(prefix + "interview:2", 2)
+    store.set(prefix + "interviewer", 3)
+    store.set(prefix + "x%_", 4)
+
+    assert store.count(prefix + "interview:") == 2
+    assert store.count(prefix + "x%") == 1
+    assert store.count(prefix + "%") == 0
+
+
+def test_database_store_is_shared_between_instances(prefix):
+    init_db()
+    DatabaseStateStore().set(prefix + "session", {"worker": 1})
+
+    assert DatabaseStateStore().get(prefix + "session") == {"worker": 1}
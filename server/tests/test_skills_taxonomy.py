@@ -0,0 +1,68 @@
+import pytest
+
+from skills_taxonomy import SKILLS, SkillTaxonomy, skill_taxonomy
+
+
+def mentions(text):
+    return [(text[start:end], skill_id) for start, end, skill_id in skill_taxonomy.scan(text)]
+
+
+def test_aliases_resolve_to_one_key():
+    assert {skill_taxonomy.key(name) for name in ("React", "react.js", "ReactJS", "react js")} == {"react"}
+    assert skill_taxonomy.key("K8s") == "kubernetes"
+    assert skill_taxonomy.resolve("Underwater Basket Weaving") is None
+    assert skill_taxonomy.key("  Underwater   Basket Weaving ") == "underwater basket weaving"
+
+
+def test_canonicalize_dedups_in_first_seen_order():
+    names = ["reactjs", "Kubernetes", "React", " My  Thing ", "", None, "k8s", "my thing"]
+
+    assert skill_taxonomy.canonicalize(names) == ["React", "Kubernetes", "My Thing"]
+
+
+def test_implied_includes_ancestors():
+    assert skill_taxonomy.implied(["Next.js"]) == {"nextjs", "react", "javascript"}
+    assert skill_taxonomy.ancestors("typescript") == ["javascript"]
+    assert skill_taxonomy.ancestors("unknown") == []
+
+
+def test_scan_respects_word_boundaries():
+    text = "Senior Java and JavaScript dev; Node.js, C++, C#, .NET and k8s."
+
+    assert mentions(text) == [
+        ("Java", "java"), ("JavaScript", "javascript"), ("Node.js", "nodejs"),
+        ("C++", "cpp"), ("C#", "csharp"), (".NET", "dotnet"), ("k8s", "kubernetes")
+    ]
+
+
+def test_scan_prefers_longest_match():
+    assert mentions("Built services in Spring Boot") == [("Spring Boot", "spring-boot")]
+    assert mentions("Machine Learning with PyTorch") == [
+        ("Machine Learning", "machine-learning"), ("PyTorch", "pytorch")
+    ]
+
+
+def test_scan_skips_ambiguous_aliases():
+    assert mentions("I can go to the store. Grade: C") == []
+
+
+def test_scan_offsets_survive_case_and_whitespace_changes():
+    text = "İstanbul team\tused\nDocker\xa0and Python"
+
+    assert mentions(text) == [("Docker", "docker"), ("Python", "python")]
+
+
+def test_extract_returns_ids_once_in_order():
+    assert skill_taxonomy.extract("Python, Docker, then more python") == ["python", "docker"]
+
+
+def test_unknown_parent_is_rejected():
+    with pytest.raises(ValueError):
+        SkillTaxonomy([("child", "Child", "language", "missing", ())])
+
+
+def test_builtin_aliases_are_unambiguous():
+    # Every alias must resolve to the skill that declares it
+    for skill_id, name, _, _, aliases in SKILLS:
+        for alias in (skill_id, name) + aliases:
+            assert skill_taxonomy.resolve(alias) == skill_id, alias
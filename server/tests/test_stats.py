@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from database import Application, Memory, Milestone, UserProfile
+from stats import user_stats, week_start_for
+
+
+def test_week_start_for_returns_monday_midnight():
+    assert week_start_for(datetime(2026, 10, 14, 15, 30)) == datetime(2026, 10, 12)
+    assert week_start_for(datetime(2026, 10, 18, 23, 59, 59)) == datetime(2026, 10, 12)
+    assert week_start_for(datetime(2026, 10, 12)) == datetime(2026, 10, 12)
+    assert week_start_for(datetime(2026, 10, 19, 0, 0, 1)) == datetime(2026, 10, 19)
+
+
+def _seed(db, user_id):
+    now = datetime.utcnow()
+    db.add(UserProfile(user_id=user_id, skills=[], career_goals=[]))
+    db.add_all([
+        Memory(id="m1", user_id=user_id, memory_type="episodic", content="a", importance=0.9,
+               created_at=now - timedelta(days=40)),
+        Memory(id="m2", user_id=user_id, memory_type="feedback", content="b", importance=0.8,
+               created_at=now - timedelta(days=2)),
+        Memory(id="m3", user_id=user_id, memory_type="feedback", content="c", importance=0.1,
+               created_at=now - timedelta(days=60)),
+    ])
+    completed_at = datetime(2026, 10, 14, 10)
+    db.add(Milestone(id="ms1", user_id=user_id, title="Learn Docker", status="completed",
+                     skills_to_learn=["Docker"], estimated_hours=6, completed_at=completed_at))
+    db.add(Milestone(id="ms2", user_id=user_id, title="Open", status="in_progress", estimated_hours=3))
+    db.add(Application(id="a1", user_id=user_id, company="Acme", position="Dev",
+                       status="interview", applied_date=datetime(2026, 10, 15, 9)))
+    db.commit()
+
+
+def test_backfill_builds_counters_from_source_tables(db):
+    _seed(db, "u1")
+
+    stats = user_stats.get_stats(db, "u1")
+
+    assert stats.total_memories == 3
+    assert stats.memory_type_counts == {"episodic": 1, "feedback": 2}
+    assert stats.high_importance_memories == 2
+    # Only feedback inside the window is kept per day
+    assert sum(stats.feedback_by_day.values()) == 1
+    assert stats.completed_milestones == 1
+    assert stats.total_applications == 1
+
+    week = user_stats.get_weekly(db, "u1", datetime(2026, 10, 12))
+    assert week.milestones_completed == 1
+    assert week.hours_invested == 6
+    assert week.new_skills == ["Docker"]
+    assert week.achievements == ["Learn Docker"]
+    assert week.applications_submitted == 1
+    assert week.interviews_attended == 1
+
+    insights = user_stats.memory_insights(stats)
+    assert insights["total_memories"] == 3
+    assert insights["recent_feedback_count"] == 1
+
+
+def test_record_memory_after_backfill_increments(db):
+    _seed(db, "u1")
+    user_stats.get_stats(db, "u1")
+
+    db.add(Memory(id="m4", user_id="u1", memory_type="feedback", content="d", importance=0.95))
+    user_stats.record_memory(db, "u1", "feedback", 0.95)
+    db.commit()
+
+    stats = user_stats.get_stats(db, "u1")
+    assert stats.total_memories == 4
+    assert stats.memory_type_counts["feedback"] == 3
+    assert stats.high_importance_memories == 3
+    assert user_stats.memory_insights(stats)["recent_feedback_count"] == 2
+
+
+def test_first_record_backfills_without_double_counting(db):
+    db.add(Memory(id="m1", user_id="new", memory_type="episodic", content="a", importance=0.5))
+    user_stats.record_memory(db, "new", "episodic", 0.5)
+    db.commit()
+
+    assert user_stats.get_stats(db, "new").total_memories == 1
+
+
+def test_memory_insights_for_user_without_memories(db):
+    db.add(UserProfile(user_id="empty", skills=[], career_goals=[]))
+    db.commit()
+
+    assert user_stats.memory_insights(user_stats.get_stats(db, "empty")) == {
+        "summary": "No memories yet", "insights": []
+    }
+
+
+def test_completing_a_milestone_twice_keeps_its_week(db, monkeypatch):
+    from memory import memory_manager
+    from services import CareerMentorService
+
+    class NoEmbeddings:
+        async def aembed_query(self, text):
+            return [1.0, 0.0]
+
+    monkeypatch.setattr(memory_manager, "_embedding_client", NoEmbeddings())
+    _seed(db, "u5")
+    user_stats.get_stats(db, "u5")
+    service = CareerMentorService(db)
+
+    assert asyncio.run(service.complete_milestone("u5", "ms1", reflection="Again"))
+
+    assert db.get(Milestone, "ms1").completed_at == datetime(2026, 10, 14, 10)
+    week = user_stats.get_weekly(db, "u5", datetime(2026, 10, 12))
+    assert week.milestones_completed == 1
+    assert user_stats.get_stats(db, "u5").completed_milestones == 1
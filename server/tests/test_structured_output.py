@@ -0,0 +1,154 @@
+import asyncio
+from typing import List
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from pydantic import BaseModel
+
+from llm_gateway import GatedChatModel
+from schemas import AnswerEvaluation, GeneratedJob
+from structured_output import (
+    JsonItemStream,
+    StructuredOutputError,
+    ainvoke_structured,
+    astream_structured,
+    extract_json,
+    parse_structured,
+)
+
+
+class Item(BaseModel):
+    name: str
+    weeks: int
+
+
+class FakeGateway:
+    """Replies from a script per model and records what was asked."""
+
+    def __init__(self, replies):
+        self.replies = {model: list(texts) for model, texts in replies.items()}
+        self.calls = []
+        self.discarded = []
+
+    async def ainvoke(self, input, model, temperature, call_site, **kwargs):
+        self.calls.append((model, input, kwargs))
+        return AIMessage(content=self.replies[model].pop(0))
+
+    async def astream(self, input, model, temperature, call_site, **kwargs):
+        self.calls.append((model, input, kwargs))
+        for piece in self.replies[model].pop(0):
+            yield AIMessageChunk(content=piece)
+
+    async def discard(self, input, model, temperature, **kwargs):
+        self.discarded.append(model)
+
+
+def handle(gateway, escalation_model=None):
+    return GatedChatModel(gateway, "small", 0, "test", escalation_model=escalation_model)
+
+
+def test_extract_json_variants():
+    assert extract_json('{"a": 1}') == {"a": 1}
+    assert extract_json('```json\n{"a": 1}\n```') == {"a": 1}
+    assert extract_json('Here you go: {"a": {"b": 2}} Hope that helps.') == {"a": {"b": 2}}
+    assert extract_json('Items:\n[{"a": 1}, {"a": 2}]\nDone', expect_array=True) == [{"a": 1}, {"a": 2}]
+
+
+def test_extract_json_without_json_raises():
+    with pytest.raises(ValueError):
+        extract_json("I cannot answer that.")
+    with pytest.raises(ValueError):
+        extract_json('Here: {"a": 1}', expect_array=True)
+
+
+def test_parse_structured_validates_schema():
+    assert parse_structured('[{"name": "SQL", "weeks": 2}]', List[Item]) == [Item(name="SQL", weeks=2)]
+
+    with pytest.raises(ValueError):
+        parse_structured('{"name": "SQL"}', Item)
+
+
+def test_scores_are_rounded():
+    assert parse_structured('{"score": 7.5, "feedback": "ok"}', AnswerEvaluation).score == 8
+    assert parse_structured('{"score": "82.0", "feedback": "ok"}', AnswerEvaluation).score == 82
+    assert GeneratedJob(company="A", title="B", match_score=64.4).match_score == 64
+
+    with pytest.raises(ValueError):
+        parse_structured('{"score": 101, "feedback": "ok"}', AnswerEvaluation)
+    with pytest.raises(ValueError):
+        AnswerEvaluation(score=float("inf"), feedback="ok")
+
+
+def test_valid_output_needs_one_call():
+    gateway = FakeGateway({"small": ['{"name": "SQL", "weeks": 2}']})
+
+    result = asyncio.run(ainvoke_structured(handle(gateway), "plan", Item))
+
+    assert result == Item(name="SQL", weeks=2)
+    assert len(gateway.calls) == 1
+    assert gateway.calls[0][2] == {"response_format": {"type": "json_object"}}
+    assert gateway.discarded == []
+
+
+def test_array_schema_skips_json_mode():
+    gateway = FakeGateway({"small": ['[{"name": "SQL", "weeks": 2}]']})
+
+    asyncio.run(ainvoke_structured(handle(gateway), "plan", List[Item]))
+
+    assert gateway.calls[0][2] == {}
+
+
+def test_invalid_output_is_repaired():
+    gateway = FakeGateway({"small": ["Sure! name: SQL", '{"name": "SQL", "weeks": 2}']})
+
+    result = asyncio.run(ainvoke_structured(handle(gateway), "plan", Item))
+
+    assert result.name == "SQL"
+    assert gateway.discarded == ["small"]
+    repair = gateway.calls[1][1]
+    assert isinstance(repair[0], HumanMessage) and repair[0].content == "plan"
+    assert repair[1].content == "Sure! name: SQL"
+    assert "could not be used" in repair[2].content
+
+
+def test_escalation_answer_is_used_without_repair():
+    gateway = FakeGateway({"small": ["not json"], "large": ['{"name": "SQL", "weeks": 2}']})
+
+    result = asyncio.run(ainvoke_structured(handle(gateway, "large"), "plan", Item))
+
+    assert result.weeks == 2
+    assert [model for model, _, _ in gateway.calls] == ["small", "large"]
+    assert gateway.discarded == []
+
+
+def test_gives_up_after_max_repairs():
+    gateway = FakeGateway({"small": ["nope", '{"name": "SQL"}', "still nope"]})
+
+    with pytest.raises(StructuredOutputError) as excinfo:
+        asyncio.run(ainvoke_structured(handle(gateway), "plan", Item, max_repairs=2))
+
+    assert excinfo.value.call_site == "test"
+    assert excinfo.value.content == "still nope"
+    assert len(gateway.calls) == 3
+    assert gateway.discarded == ["small"]
+
+
+def test_json_item_stream_yields_items_as_they_close():
+    stream = JsonItemStream()
+
+    assert stream.feed('Plan:\n```json\n{"milestones": [{"name": "a {x}", ') == []
+    assert stream.feed('"weeks": 1}, {"name": "b\\"]"') == [{"name": "a {x}", "weeks": 1}]
+    assert stream.feed(', "tags": [{"t": 1}]}]}\n```') == [{"name": "b\"]", "tags": [{"t": 1}]}]
+
+
+def test_astream_structured_previews_then_result():
+    pieces = ['[{"name": "SQL", "weeks": 2},', ' {"name": "Go", "weeks": 3}]']
+    gateway = FakeGateway({"small": [pieces]})
+
+    async def run():
+        return [event async for event in astream_structured(handle(gateway), "plan", List[Item])]
+
+    events = asyncio.run(run())
+
+    assert events[:2] == [("item", {"name": "SQL", "weeks": 2}), ("item", {"name": "Go", "weeks": 3})]
+    assert events[2] == ("result", [Item(name="SQL", weeks=2), Item(name="Go", weeks=3)])
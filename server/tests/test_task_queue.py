@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+from database import SessionLocal, init_db
+from task_queue import TaskQueue
+
+
+def run_jobs(queue, *jobs):
+    async def run():
+        task_ids = [await queue.submit("test", "u1", job) for job in jobs]
+        await queue.drain()
+        return task_ids
+
+    init_db()
+    return asyncio.run(run())
+
+
+def status(queue, task_id):
+    db = SessionLocal()
+    try:
+        return queue.get(db, task_id)
+    finally:
+        db.close()
+
+
+def test_submit_records_and_runs_jobs():
+    async def succeed(db, user_id):
+        return {"user": user_id}
+
+    async def fail(db, user_id):
+        raise RuntimeError("provider down")
+
+    queue = TaskQueue(concurrency=2)
+    ok_id, failed_id = run_jobs(queue, succeed, fail)
+
+    ok = status(queue, ok_id)
+    assert ok["status"] == "succeeded"
+    assert ok["result"] == {"user": "u1"}
+    assert ok["started_at"] and ok["finished_at"]
+
+    failed = status(queue, failed_id)
+    assert failed["status"] == "failed"
+    assert failed["error"] == "provider down"
+
+
+def test_submit_does_not_block_the_loop(monkeypatch):
+    ticks = []
+    seen_during_insert = []
+    original = TaskQueue._insert
+
+    def slow_insert(task_id, kind, user_id):
+        time.sleep(0.1)
+        seen_during_insert.append(len(ticks))
+        original(task_id, kind, user_id)
+
+    monkeypatch.setattr(TaskQueue, "_insert", staticmethod(slow_insert))
+
+    async def noop(db, user_id):
+        return None
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(None)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        queue = TaskQueue(concurrency=1)
+        await asyncio.gather(queue.submit("test", "u1", noop), ticker())
+        await queue.drain()
+
+    init_db()
+    asyncio.run(run())
+
+    assert seen_during_insert[0] > 0
@@ -0,0 +1,117 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+
+import uploads
+from uploads import DOCX_MIME, PDF_MIME, UploadLimitMiddleware, UploadTooLargeError, sniff_mime, spool_upload
+
+
+class CountingStream(io.BytesIO):
+    """BytesIO that records how much was read from it."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def zip_bytes(*names):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name in names:
+            archive.writestr(name, "<xml/>")
+    return buffer.getvalue()
+
+
+@pytest.fixture(params=["libmagic", "signatures"])
+def sniff_backend(request, monkeypatch):
+    if request.param == "libmagic" and uploads.magic is None:
+        pytest.skip("libmagic is not installed")
+    if request.param == "signatures":
+        monkeypatch.setattr(uploads, "magic", None)
+    return request.param
+
+
+def test_spool_copies_upload():
+    data = b"%PDF-1.4\n" + b"x" * 200_000
+    spooled = asyncio.run(spool_upload(UploadFile(io.BytesIO(data)), len(data)))
+
+    with spooled:
+        assert spooled.tell() == 0
+        assert spooled.read() == data
+
+
+def test_declared_size_over_limit_is_rejected_before_reading():
+    stream = CountingStream(b"x" * 2048)
+
+    with pytest.raises(UploadTooLargeError) as excinfo:
+        asyncio.run(spool_upload(UploadFile(stream, size=2048), 1024))
+
+    assert stream.bytes_read == 0
+    assert excinfo.value.max_bytes == 1024
+
+
+def test_undeclared_size_stops_copy_at_limit(monkeypatch):
+    monkeypatch.setattr(uploads, "_CHUNK_SIZE", 1024)
+    stream = CountingStream(b"x" * 1024 * 1024)
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(UploadFile(stream), 4096))
+
+    assert stream.bytes_read <= 4096 + 1024
+
+
+def test_error_message_is_in_megabytes():
+    assert str(UploadTooLargeError(5 * 1048576)) == "File too large. Maximum size is 5 MB"
+    assert str(UploadTooLargeError(1572864)) == "File too large. Maximum size is 1.5 MB"
+
+
+def test_sniff_detects_pdf_and_docx(sniff_backend):
+    assert sniff_mime(io.BytesIO(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n1 0 obj")) == PDF_MIME
+    assert sniff_mime(io.BytesIO(zip_bytes("[Content_Types].xml", "word/document.xml"))) == DOCX_MIME
+
+
+def test_sniff_ignores_misleading_content(sniff_backend):
+    assert sniff_mime(io.BytesIO(zip_bytes("payload.exe"))) != DOCX_MIME
+    assert sniff_mime(io.BytesIO(b"MZ\x90\x00 not a pdf")) not in (PDF_MIME, DOCX_MIME)
+    assert sniff_mime(io.BytesIO(b"")) is None
+
+
+def test_sniff_restores_position(sniff_backend):
+    file = io.BytesIO(zip_bytes("word/document.xml"))
+    file.seek(7)
+
+    sniff_mime(file)
+
+    assert file.tell() == 7
+
+
+def test_middleware_rejects_large_content_length():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload():
+        return {"ok": True}
+
+    @app.post("/other")
+    async def other():
+        return {"ok": True}
+
+    app.add_middleware(UploadLimitMiddleware, paths=["/upload"], max_bytes=1024)
+    client = TestClient(app)
+    body = b"x" * (1024 + uploads._MULTIPART_OVERHEAD + 1)
+
+    response = client.post("/upload", content=body)
+    assert response.status_code == 413
+    assert response.json() == {"detail": str(UploadTooLargeError(1024))}
+
+    assert client.post("/upload", content=b"x" * 1024).status_code == 200
+    assert client.post("/other", content=body).status_code == 200